@@ -1,23 +1,20 @@
 import logging
-from flask import Flask, request, render_template_string, redirect, url_for, session
-import joblib
-import pandas as pd
-import numpy as np
+from flask import Flask, request, render_template, redirect, url_for, session, jsonify, abort, g
+from markupsafe import escape
 import os
-import matplotlib
-matplotlib.use('Agg')  # Set backend before importing pyplot
-import matplotlib.pyplot as plt
 import io
 import base64
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s %(levelname)s %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+import functools
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+import metrics
+import model_store
+import structured_logging
+from feature_schema import FEATURES, VALID_RANGES, BINARY_FEATURES, UNITS, SCHEMA
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"
@@ -25,58 +22,374 @@ app.secret_key = "supersecretkey"
 # Simulated user database
 USERS = {"medecin@example.com": "password123"}
 
-# Model features
-FEATURES = ["age", "anaemia", "creatinine_phosphokinase", "diabetes", "ejection_fraction",
-            "high_blood_pressure", "platelets", "serum_creatinine", "serum_sodium",
-            "sex", "smoking", "time"]
-
-# Valid ranges for numeric inputs
-VALID_RANGES = {
-    "age": (18, 100),
-    "anaemia": (0, 1),  # Binary
-    "creatinine_phosphokinase": (10, 10000),  # U/L
-    "diabetes": (0, 1),  # Binary
-    "ejection_fraction": (10, 80),  # Percentage
-    "high_blood_pressure": (0, 1),  # Binary
-    "platelets": (50000, 500000),  # per µL
-    "serum_creatinine": (0.1, 10),  # mg/dL
-    "serum_sodium": (110, 150),  # mmol/L
-    "sex": (0, 1),  # Binary
-    "smoking": (0, 1),  # Binary
-    "time": (0, 365)  # Days
-}
+# Maximum number of patient records accepted by /api/predict in one call
+MAX_BATCH_SIZE = 10000
 
-# Units of measure for each feature
-UNITS = {
-    "age": "years",
-    "anaemia": "",
-    "creatinine_phosphokinase": "U/L",
-    "diabetes": "",
-    "ejection_fraction": "%",
-    "high_blood_pressure": "",
-    "platelets": "per µL",
-    "serum_creatinine": "mg/dL",
-    "serum_sodium": "mmol/L",
-    "sex": "",
-    "smoking": "",
-    "time": "days"
-}
+# Pie chart backend: "svg" (cached inline SVG) or "matplotlib" (base64 PNG)
+CHART_BACKEND = os.environ.get("CHART_BACKEND", "svg")
 
 # Model and scaler paths
 MODEL_PATH = "models/best_model.pkl"
 SCALER_PATH = "models/scaler.pkl"
 
-# Load model and scaler
-try:
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-except FileNotFoundError as e:
-    print(f"Model files not found: {e}")
-    model = None
-    scaler = None
+# Serving format: "pickle" (joblib model + scaler) or "compact" (the NumPy
+# arrays written by scripts/export_compact.py, evaluated by compact_model.py
+# without importing scikit-learn, XGBoost or LightGBM). The compact file is
+# looked up next to the store version, or at COMPACT_MODEL_PATH.
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "pickle")
+COMPACT_MODEL_PATH = "models/model.npz"
+COMPACT_FILE = "compact.npz"
+
+# Prediction cache (opt-in): maximum number of entries (0 disables) and
+# time-to-live of an entry in seconds
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+
+# Micro-batching (opt-in): concurrent small predictions are coalesced for up
+# to BATCH_WINDOW_MS milliseconds (0 disables) or BATCH_MAX_ROWS rows
+BATCH_WINDOW_MS = float(os.environ.get("BATCH_WINDOW_MS", "0"))
+BATCH_MAX_ROWS = int(os.environ.get("BATCH_MAX_ROWS", "64"))
+
+# Startup mode: with LAZY_STARTUP=1 importing this module does not load the
+# model; heavy imports and model loading happen in warm_up() instead
+LAZY_STARTUP = os.environ.get("LAZY_STARTUP", "0") == "1"
+
+# Versioned model store (see model_store.py). When it has a CURRENT version
+# that version is served; otherwise MODEL_PATH / SCALER_PATH are used.
+MODEL_STORE_DIR = os.environ.get("MODEL_STORE_DIR", model_store.STORE_DIR)
+
+# Hot reload: check the model store / model files every MODEL_WATCH_INTERVAL
+# seconds (0 disables) and swap new versions in without a restart
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
+
+# SHAP explanations: number of top feature contributions returned with each
+# prediction (0 disables them). The explainer of every model version is
+# cached on disk under the hash of its model file (see explanations.py).
+EXPLAIN_TOP_K = int(os.environ.get("EXPLAIN_TOP_K", "3"))
+EXPLAINER_CACHE_DIR = os.environ.get("EXPLAINER_CACHE_DIR", ".cache/explainers")
+
+# Request profiling (opt-in): PROFILE_SAMPLE_RATE of the requests to
+# PROFILE_ENDPOINTS are run under cProfile (0 disables it); dumps of requests
+# that took at least PROFILE_SLOW_MS are kept, the newest PROFILE_KEEP of
+# them, in PROFILE_DIR (see profiling.py)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", ".cache/profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "50"))
+PROFILE_ENDPOINTS = os.environ.get("PROFILE_ENDPOINTS", "predict").split(",")
+
+# Request metrics served on /metrics in the Prometheus text format. Stage
+# histograms split a request into validate / score / explain / chart /
+# render, so p50/p99 can be compared stage by stage.
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    "heart_request_seconds", "Request latency in seconds", ("endpoint", "method"))
+STAGE_SECONDS = metrics.REGISTRY.histogram(
+    "heart_stage_seconds", "Latency of one stage of a request in seconds", ("endpoint", "stage"))
+REQUESTS = metrics.REGISTRY.counter(
+    "heart_requests_total", "Requests by endpoint, method and status", ("endpoint", "method", "status"))
+ERRORS = metrics.REGISTRY.counter(
+    "heart_request_errors_total", "Failed requests by endpoint and kind (validation or server)",
+    ("endpoint", "kind"))
+
+# Logging: one JSON line per record, written by a background thread (see
+# structured_logging.py), and one "request" record per request with its
+# stage timings. The level follows APP_ENV (development, test, production)
+# unless LOG_LEVEL is set. Messages take %-style arguments, so they are only
+# formatted by the writer thread. The entry points (serve.py, `python
+# app.py`) call configure_logging(); importing the app leaves logging alone.
+APP_ENV = os.environ.get("APP_ENV", "production")
+LOG_DROPPED = metrics.REGISTRY.counter(
+    "heart_log_records_dropped_total", "Log records dropped because the log queue was full")
+logger = logging.getLogger("heart")
+request_log = logging.getLogger("heart.requests")
+
+def configure_logging(env=APP_ENV):
+    structured_logging.setup_logging(env=env, on_drop=LOG_DROPPED.inc)
+
+# Everything needed to serve one model version. Requests read the module
+# global `bundle` once, and reloads replace it with a single assignment, so a
+# request never sees a model paired with another version's scaler.
+ModelBundle = namedtuple("ModelBundle", ["version", "fingerprint", "model", "scaler", "predictor", "metadata", "explainer"])
+
+bundle = None
+_models_loaded = False
+_models_lock = threading.RLock()
+_warmed_up = False
+_batcher = None
+_watcher = None
+
+# Fingerprint of the model on disk: the CURRENT version of the model store,
+# or the size and modification time of the model and scaler files.
+def model_fingerprint():
+    version = model_store.current_version(MODEL_STORE_DIR)
+    if version is not None:
+        return ("store", version)
+    fingerprint = []
+    paths = (COMPACT_MODEL_PATH,) if MODEL_FORMAT == "compact" else (MODEL_PATH, SCALER_PATH)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            fingerprint.append(None)
+    return ("files", tuple(fingerprint))
+
+# Load the compact arrays of a version (or of COMPACT_MODEL_PATH). Returns
+# None when the version has not been exported, so the pickle is served instead.
+def load_compact_bundle(version, fingerprint):
+    from compact_model import CompactModel
+
+    if version is not None or fingerprint[0] == "store":
+        metadata = model_store.load_metadata(version, MODEL_STORE_DIR)
+        version = metadata["version"]
+        path = os.path.join(MODEL_STORE_DIR, version, COMPACT_FILE)
+        if not os.path.exists(path):
+            logger.warning("No %s for model version %s, serving the pickle (run scripts/export_compact.py)",
+                           COMPACT_FILE, version)
+            return None
+        compact = CompactModel.load(path)
+        fingerprint = ("store", version)
+    else:
+        compact = CompactModel.load(COMPACT_MODEL_PATH)
+        metadata = {"model_class": compact.model_class}
+    # SHAP needs the original model object, so compact bundles are not explained
+    return ModelBundle(version, fingerprint, compact, None, compact, metadata, None)
+
+# Load a model/scaler pair and build the precompiled predictor. joblib, NumPy
+# and scikit-learn are only imported here.
+def load_bundle(version=None):
+    fingerprint = model_fingerprint()
+    if MODEL_FORMAT == "compact":
+        compact_bundle = load_compact_bundle(version, fingerprint)
+        if compact_bundle is not None:
+            return compact_bundle
+
+    import joblib
+    from inference import FusedPredictor
+
+    if version is not None or fingerprint[0] == "store":
+        model, scaler, metadata = model_store.load_version(version, MODEL_STORE_DIR)
+        version = metadata["version"]
+        fingerprint = ("store", version)
+    else:
+        model = joblib.load(MODEL_PATH)
+        scaler = joblib.load(SCALER_PATH)
+        metadata = {}
+        # The two files are not replaced atomically; refuse a pair that
+        # changed while it was being read
+        if model_fingerprint() != fingerprint:
+            raise RuntimeError("Model files changed while loading, retry later")
+    # Precompiled single-pass predictor (scaler folded into NumPy)
+    predictor = FusedPredictor(model, scaler)
+    return ModelBundle(version, fingerprint, model, scaler, predictor, metadata,
+                       load_explanations(model, predictor, metadata))
+
+# Build the SHAP explanation service of a model, or load its explainer from
+# the disk cache. A model SHAP cannot explain only disables explanations.
+def load_explanations(model, predictor, metadata):
+    if EXPLAIN_TOP_K <= 0:
+        return None
+    try:
+        from explanations import ExplanationService, file_sha256, load_explainer
+        model_hash = metadata.get("model_sha256") or file_sha256(MODEL_PATH)
+        explainer = load_explainer(model, model_hash, EXPLAINER_CACHE_DIR)
+        return ExplanationService(explainer, predictor.transform, FEATURES, EXPLAIN_TOP_K)
+    except Exception as e:
+        logger.warning("SHAP explanations disabled: %s", e)
+        return None
+
+def load_models():
+    global bundle, _models_loaded
+    with _models_lock:
+        try:
+            bundle = load_bundle()
+        except FileNotFoundError as e:
+            print(f"Model files not found: {e}")
+            bundle = None
+        _models_loaded = True
+
+# Load a new version in the calling (background or admin) thread while the
+# current bundle keeps serving, then swap it in atomically. On failure the
+# current bundle stays in place. With activate=True the store's CURRENT only
+# moves to `version` once it has loaded, so a restart never picks up a
+# version that failed to load.
+def reload_models(version=None, activate=False):
+    global bundle, _models_loaded
+    new_bundle = load_bundle(version)
+    if activate and version is not None:
+        model_store.activate_version(new_bundle.version, MODEL_STORE_DIR)
+    with _models_lock:
+        bundle = new_bundle
+        _models_loaded = True
+    logger.info("Model reloaded: version=%s fingerprint=%s", new_bundle.version, new_bundle.fingerprint)
+    return new_bundle
+
+def get_bundle():
+    if not _models_loaded:
+        with _models_lock:
+            if not _models_loaded:
+                load_models()
+    return bundle
+
+def get_predictor():
+    current = get_bundle()
+    return current.predictor if current is not None else None
+
+# Poll the model fingerprint and reload when it changes
+def watch_models(interval):
+    while True:
+        time.sleep(interval)
+        current = get_bundle()
+        if model_fingerprint() != (current.fingerprint if current is not None else None):
+            try:
+                reload_models()
+            except Exception as e:
+                logger.warning("Model reload failed: %s", e)
+
+def start_model_watcher():
+    global _watcher
+    if MODEL_WATCH_INTERVAL > 0 and _watcher is None:
+        _watcher = threading.Thread(target=watch_models, args=(MODEL_WATCH_INTERVAL,),
+                                    name="model-watcher", daemon=True)
+        _watcher.start()
+
+# Background micro-batching worker, started on first use so that every
+# (possibly forked) worker process owns its own thread
+def get_batcher():
+    global _batcher
+    if _batcher is None:
+        with _models_lock:
+            if _batcher is None:
+                from inference import InferenceBatcher
+                _batcher = InferenceBatcher(lambda X: get_predictor().predict_risk(X),
+                                            max_wait=BATCH_WINDOW_MS / 1000,
+                                            max_rows=BATCH_MAX_ROWS)
+    return _batcher
+
+# Run the predictor on rows of FEATURES values. Small requests go through
+# the micro-batching worker when it is enabled.
+def predict_risk(rows, current=None):
+    current = current or get_bundle()
+    if current is None:
+        raise Exception("Model or scaler not loaded")
+    if BATCH_WINDOW_MS > 0 and len(rows) < BATCH_MAX_ROWS:
+        return get_batcher().predict_risk(rows)
+    return current.predictor.predict_risk(rows)
+
+# Warm-up hook: load the model and run one prediction so the first real
+# request does not pay for imports, unpickling or first-call overhead.
+def warm_up():
+    global _warmed_up
+    if _warmed_up:
+        return
+    warm_models()
+    start_model_watcher()
+    _warmed_up = True
+
+# The model half of warm_up(), without starting any thread: serve.py runs it
+# in the master process before forking the workers.
+def warm_models():
+    current = get_bundle()
+    if current is not None:
+        midpoint = [sum(VALID_RANGES[feature]) / 2 for feature in FEATURES]
+        current.predictor.predict_risk([midpoint])
+        if current.explainer is not None:
+            current.explainer.contributions([midpoint])
+
+if not LAZY_STARTUP:
+    load_models()
+
+profiler = None
+if PROFILE_SAMPLE_RATE > 0:
+    from profiling import RequestProfiler
+    profiler = RequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS, PROFILE_KEEP, PROFILE_ENDPOINTS)
+
+# Size-bounded LRU cache of (label, probability) keyed on the model
+# fingerprint plus the normalized tuple of FEATURES values, with TTL eviction.
+# Every entry is dropped as soon as a new model fingerprint is seen.
+class PredictionCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._current_fingerprint = None
+        self._lock = threading.Lock()
+
+    def _check_fingerprint(self, fingerprint):
+        if fingerprint != self._current_fingerprint:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._current_fingerprint = fingerprint
+
+    @staticmethod
+    def _row_key(row):
+        return tuple(float(value) for value in row)
+
+    def get_many(self, rows, fingerprint):
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+            for row in rows:
+                key = (fingerprint, self._row_key(row))
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] < now:
+                    del self._entries[key]
+                    self.evictions += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    results.append(entry[1])
+        return results
+
+    def put_many(self, rows, values, fingerprint):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+            for row, value in zip(rows, values):
+                key = (fingerprint, self._row_key(row))
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+
 
 # Generate pie chart
 def generate_pie_chart(probability):
+    import matplotlib
+    matplotlib.use('Agg')  # Set backend before importing pyplot
+    import matplotlib.pyplot as plt
+    buf = io.BytesIO()
     try:
         fig, ax = plt.subplots(figsize=(8, 6))
         labels = ['Risque élevé', 'Risque faible']
@@ -87,7 +400,6 @@ def generate_pie_chart(probability):
                autopct='%1.1f%%', shadow=True, startangle=90)
         ax.axis('equal')
         ax.set_title('Probabilité de risque cardiaque', fontsize=16)
-        buf = io.BytesIO()
         plt.savefig(buf, format='png', bbox_inches='tight')
         buf.seek(0)
         image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
@@ -96,6 +408,170 @@ def generate_pie_chart(probability):
         plt.close('all')
         buf.close()
 
+# Generate pie chart as inline SVG. Rendering is cached on the probability
+# rounded to 0.1%, so at most 1001 distinct charts ever get built.
+def generate_pie_chart_svg(probability):
+    return _render_pie_chart_svg(round(min(max(probability, 0.0), 1.0) * 1000))
+
+def _pie_point(cx, cy, r, angle):
+    return cx + r * math.cos(math.radians(angle)), cy - r * math.sin(math.radians(angle))
+
+def _pie_slice(cx, cy, r, start, sweep, color):
+    if sweep >= 360:
+        return f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="{r}" fill="{color}"/>'
+    x0, y0 = _pie_point(cx, cy, r, start)
+    x1, y1 = _pie_point(cx, cy, r, start + sweep)
+    large_arc = 1 if sweep > 180 else 0
+    return (f'<path d="M{cx:.1f},{cy:.1f} L{x0:.1f},{y0:.1f} '
+            f'A{r},{r} 0 {large_arc} 0 {x1:.1f},{y1:.1f} Z" fill="{color}"/>')
+
+@functools.lru_cache(maxsize=1024)
+def _render_pie_chart_svg(permille):
+    cx, cy, r = 200, 170, 110
+    slices = [('Risque élevé', permille / 10, '#ff6b6b', 0.1),
+              ('Risque faible', 100 - permille / 10, '#4ecdc4', 0.0)]
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 320" '
+             'width="400" height="320" role="img" aria-label="Graphique de Risque" '
+             'font-family="sans-serif">',
+             '<text x="200" y="24" text-anchor="middle" font-size="18">'
+             'Probabilité de risque cardiaque</text>']
+    start = 90  # first slice starts at the top, counter-clockwise like matplotlib
+    for label, percent, color, explode in slices:
+        sweep = percent * 3.6
+        if sweep > 0:
+            # Offset ("explode") the slice along its middle angle
+            ox, oy = _pie_point(0, 0, explode * r, start + sweep / 2)
+            parts.append(_pie_slice(cx + ox, cy + oy, r, start, sweep, color))
+            tx, ty = _pie_point(cx + ox, cy + oy, r * 0.6, start + sweep / 2)
+            lx, ly = _pie_point(cx + ox, cy + oy, r * 1.15, start + sweep / 2)
+            anchor = 'start' if lx >= cx else 'end'
+            parts.append(f'<text x="{tx:.1f}" y="{ty:.1f}" text-anchor="middle" '
+                         f'dominant-baseline="middle" font-size="14">{percent:.1f}%</text>')
+            parts.append(f'<text x="{lx:.1f}" y="{ly:.1f}" text-anchor="{anchor}" '
+                         f'dominant-baseline="middle" font-size="14">{label}</text>')
+        start += sweep
+    parts.append('</svg>')
+    return ''.join(parts)
+
+# Score rows of FEATURES values, returning a (label, probability) tuple per
+# row. Cached rows are served from the prediction cache when it is enabled;
+# the remaining rows go through the predictor in a single pass. Cache keys
+# combine the served model version with the model files on disk.
+def score_rows(rows):
+    current = get_bundle()
+    if prediction_cache is None or current is None:
+        labels, probabilities = predict_risk(rows, current)
+        return [(int(label), float(probability)) for label, probability in zip(labels, probabilities)]
+
+    fingerprint = (current.fingerprint, model_fingerprint())
+    results = prediction_cache.get_many(rows, fingerprint)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        missing_rows = [rows[i] for i in missing]
+        labels, probabilities = predict_risk(missing_rows, current)
+        scored = [(int(label), float(probability)) for label, probability in zip(labels, probabilities)]
+        for i, result in zip(missing, scored):
+            results[i] = result
+        prediction_cache.put_many(missing_rows, scored, fingerprint)
+    return results
+
+# Score a list of patient records with a single scaling step and a
+# single probability pass over every valid row. With explain=True every
+# valid row also gets its top SHAP contributions, from one batched call.
+def predict_batch(records, explain=False):
+    with stage("validate"):
+        validation = SCHEMA.validate_records(records)
+    results = [{"index": index, "prediction": None, "probability": None,
+                "errors": validation.errors.get(index, {})}
+               for index in range(len(records))]
+
+    valid_index = validation.valid.nonzero()[0]
+    if len(valid_index):
+        with stage("score"):
+            scored = score_rows(validation.X[valid_index])
+        for index, (label, probability) in zip(valid_index, scored):
+            results[index]["prediction"] = label
+            results[index]["probability"] = probability
+        explainer = get_bundle().explainer if explain else None
+        if explainer is not None:
+            with stage("explain"):
+                explanations = explainer.explain(validation.X[valid_index])
+            for index, explanation in zip(valid_index, explanations):
+                results[index]["explanation"] = explanation
+
+    return results
+
+# Top SHAP contributions of one form row; a failing explanation never
+# hides the prediction itself.
+def explain_row(row):
+    current = get_bundle()
+    if current is None or current.explainer is None:
+        return None
+    try:
+        return current.explainer.explain([row])[0]
+    except Exception as e:
+        logger.warning("Explanation failed: %s", e)
+        return None
+
+# Time one stage of the current request: recorded in the stage histogram and
+# in g.stage_timings (seconds by stage name)
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, request.endpoint, name)
+        g.stage_timings[name] = elapsed
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.stage_timings = {}
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request.endpoint or "unknown"
+    elapsed = time.perf_counter() - g.request_start
+    REQUEST_SECONDS.observe(elapsed, endpoint, request.method)
+    REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    kind = g.get("error_kind") or ("server" if response.status_code >= 500 else None)
+    if kind:
+        ERRORS.inc(endpoint, kind)
+    if request_log.isEnabledFor(logging.INFO):
+        request_log.info("request", extra={"fields": {
+            "endpoint": endpoint, "method": request.method, "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "stage_ms": {name: round(seconds * 1000, 3) for name, seconds in g.stage_timings.items()},
+            "error": kind,
+        }})
+    return response
+
+@app.before_request
+def start_request_profile():
+    if profiler is not None:
+        g.profile = profiler.start(request.endpoint)
+
+# Runs even when the view raised, so a profile is never left enabled
+@app.teardown_request
+def finish_request_profile(exc):
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.finish(profile, {
+            "endpoint": request.endpoint, "method": request.method, "path": request.path,
+            "elapsed_ms": (time.perf_counter() - g.request_start) * 1000,
+            "stage_ms": {name: seconds * 1000 for name, seconds in g.stage_timings.items()},
+            "error": repr(exc) if exc is not None else g.get("error_kind"),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+
+@app.before_request
+def warm_up_on_first_request():
+    if not _warmed_up:
+        warm_up()
+
 @app.route('/', methods=['GET', 'POST'])
 def login():
     try:
@@ -103,14 +579,14 @@ def login():
             email = request.form.get('email')
             password = request.form.get('password')
             if not email or not password:
-                return render_template_string(LOGIN_TEMPLATE, error="Email et mot de passe requis.")
+                return render_template(LOGIN_PAGE, error="Email et mot de passe requis.")
             if email in USERS and USERS[email] == password:
                 session['logged_in'] = True
                 return redirect(url_for('predict'))
-            return render_template_string(LOGIN_TEMPLATE, error="Identifiants incorrects.")
-        return render_template_string(LOGIN_TEMPLATE)
+            return render_template(LOGIN_PAGE, error="Identifiants incorrects.")
+        return render_template(LOGIN_PAGE)
     except Exception as e:
-        return render_template_string(LOGIN_TEMPLATE, error="Une erreur s'est produite.")
+        return render_template(LOGIN_PAGE, error="Une erreur s'est produite.")
 
 @app.route('/predict', methods=['GET', 'POST'])
 def predict():
@@ -120,120 +596,257 @@ def predict():
     prediction = None
     probability = None
     pie_chart_image = None
+    pie_chart_svg = None
+    explanation = None
     form_values = {feature: "" for feature in FEATURES}
 
     if request.method == 'POST':
         try:
-            input_data = {}
-            for feature in FEATURES:
-                value = request.form.get(feature)
-                if not value:
-                    raise ValueError(f"Missing value for {feature}")
-                if feature == 'sex':
-                    input_data[feature] = 1 if value == '1' else 0
-                elif feature in ['anaemia', 'diabetes', 'high_blood_pressure', 'smoking']:
-                    input_data[feature] = int(value)
+            with stage("validate"):
+                validation = SCHEMA.validate_records([request.form])
+                errors = validation.errors.get(0)
+                if errors:
+                    raise ValueError("; ".join(f"{feature}: {message}" for feature, message in errors.items()))
+
+                row = validation.X[0]
+                form_values = {feature: int(value) if feature in BINARY_FEATURES else value
+                               for feature, value in zip(FEATURES, row.tolist())}
+
+            with stage("score"):
+                prediction, probability = score_rows([row])[0]
+            with stage("explain"):
+                explanation = explain_row(row)
+            with stage("chart"):
+                if CHART_BACKEND == "matplotlib":
+                    pie_chart_image = generate_pie_chart(probability)
                 else:
-                    value = float(value)
-                    logging.debug(f"Received {feature} value: {value}")
-                    if feature in VALID_RANGES:
-                        min_val, max_val = VALID_RANGES[feature]
-                        if value < min_val or value > max_val:
-                            raise ValueError(f"{feature} must be between {min_val} and {max_val}")
-                    input_data[feature] = value
+                    pie_chart_svg = generate_pie_chart_svg(probability)
 
-            form_values = input_data
-            input_df = pd.DataFrame([input_data])
+        except Exception as e:
+            g.error_kind = "validation" if isinstance(e, ValueError) else "server"
+            with stage("render"):
+                return render_template(PREDICT_PAGE,
+                                       error=f"Erreur: {str(e)}",
+                                       form_values=form_values,
+                                       prediction=prediction,
+                                       probability=probability,
+                                       pie_chart_image=pie_chart_image,
+                                       pie_chart_svg=pie_chart_svg,
+                                       explanation=explanation)
+
+    with stage("render"):
+        return render_template(PREDICT_PAGE,
+                               prediction=prediction, probability=probability,
+                               pie_chart_image=pie_chart_image,
+                               pie_chart_svg=pie_chart_svg,
+                               explanation=explanation,
+                               form_values=form_values)
 
-            if model is None or scaler is None:
-                raise Exception("Model or scaler not loaded")
+@app.route('/api/predict', methods=['POST'])
+def api_predict():
+    if not session.get('logged_in'):
+        return jsonify(error="Authentification requise."), 401
 
-            input_scaled = scaler.transform(input_df)
-            prediction = model.predict(input_scaled)[0]
-            probability = model.predict_proba(input_scaled)[0, 1]
-            pie_chart_image = generate_pie_chart(probability)
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        return jsonify(error="Le corps doit être un tableau JSON de patients."), 400
+    if len(records) > MAX_BATCH_SIZE:
+        return jsonify(error=f"Maximum {MAX_BATCH_SIZE} patients par requête."), 413
 
-        except Exception as e:
-            return render_template_string(PREDICT_TEMPLATE, features=FEATURES,
-                                          error=f"Erreur: {str(e)}",
-                                          form_values=form_values,
-                                          valid_ranges=VALID_RANGES,
-                                          units=UNITS,
-                                          prediction=prediction,
-                                          probability=probability,
-                                          pie_chart_image=pie_chart_image)
-
-    return render_template_string(PREDICT_TEMPLATE, features=FEATURES,
-                                  prediction=prediction, probability=probability,
-                                  pie_chart_image=pie_chart_image,
-                                  form_values=form_values,
-                                  valid_ranges=VALID_RANGES,
-                                  units=UNITS)
+    try:
+        results = predict_batch(records, explain=request.args.get("explain") == "1")
+    except Exception as e:
+        return jsonify(error=f"Erreur: {str(e)}"), 500
+
+    return jsonify(count=len(results), results=results)
+
+@app.route('/api/cache', methods=['GET'])
+def api_cache():
+    if not session.get('logged_in'):
+        return jsonify(error="Authentification requise."), 401
+    if prediction_cache is None:
+        return jsonify(enabled=False)
+    return jsonify(enabled=True, **prediction_cache.stats())
+
+@app.route('/api/explanations', methods=['GET'])
+def api_explanations():
+    if not session.get('logged_in'):
+        return jsonify(error="Authentification requise."), 401
+    current = get_bundle()
+    if current is None or current.explainer is None:
+        return jsonify(enabled=False)
+    return jsonify(enabled=True, **current.explainer.stats())
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return app.response_class(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/assets/<name>.css')
+def stylesheet(name):
+    if name not in STYLESHEETS:
+        abort(404)
+    css, etag = STYLESHEETS[name]
+    response = app.response_class(css, mimetype='text/css')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    if not session.get('logged_in'):
+        return jsonify(error="Authentification requise."), 401
+
+    # Optionally activate another stored version (e.g. a rollback)
+    version = (request.get_json(silent=True) or {}).get("version")
+    try:
+        new_bundle = reload_models(version, activate=True)
+    except Exception as e:
+        return jsonify(error=f"Erreur: {str(e)}"), 500
+
+    if prediction_cache is not None:
+        prediction_cache.clear()
+    return jsonify(version=new_bundle.version, fingerprint=new_bundle.fingerprint,
+                   model_class=new_bundle.metadata.get("model_class", type(new_bundle.model).__name__))
 
 @app.route('/logout')
 def logout():
     session.clear()
     return redirect(url_for('login'))
 
+LOGIN_CSS = """
+body {
+  font-family: 'Roboto', sans-serif;
+  background: url('https://via.placeholder.com/1920x1080?text=Medicine+Background') no-repeat center center fixed;
+  background-size: cover;
+  margin: 0;
+  padding: 0;
+}
+.login-container {
+  max-width: 400px;
+  margin: 100px auto;
+  padding: 20px;
+  background: rgba(255, 255, 255, 0.9);
+  border-radius: 10px;
+  box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
+}
+h1 {
+  text-align: center;
+  color: #333;
+  margin-bottom: 20px;
+}
+.form-group {
+  margin-bottom: 15px;
+}
+label {
+  display: block;
+  margin-bottom: 5px;
+  font-weight: bold;
+}
+input[type="email"], input[type="password"] {
+  width: 100%;
+  padding: 10px;
+  border: 1px solid #ddd;
+  border-radius: 5px;
+}
+button {
+  width: 100%;
+  padding: 10px;
+  background-color: #007bff;
+  color: white;
+  border: none;
+  border-radius: 5px;
+  cursor: pointer;
+}
+button:hover {
+  background-color: #0056b3;
+}
+.error {
+  color: red;
+  margin-top: 10px;
+  text-align: center;
+}
+"""
+
+PREDICT_CSS = """
+body {
+  font-family: 'Roboto', sans-serif;
+  background: url('https://via.placeholder.com/1920x1080?text=Medicine+Background') no-repeat center center fixed;
+  background-size: cover;
+  margin: 0;
+  padding: 0;
+}
+.container {
+  max-width: 800px;
+  margin: 50px auto;
+  padding: 20px;
+  background: rgba(255, 255, 255, 0.9);
+  border-radius: 10px;
+  box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
+}
+h1 {
+  text-align: center;
+  color: #333;
+  margin-bottom: 30px;
+}
+.form-grid {
+  display: grid;
+  grid-template-columns: repeat(2, 1fr);
+  gap: 20px;
+}
+.form-group {
+  margin-bottom: 15px;
+}
+label {
+  display: block;
+  margin-bottom: 5px;
+  font-weight: bold;
+}
+input[type="number"], select {
+  width: 100%;
+  padding: 10px;
+  border: 1px solid #ddd;
+  border-radius: 5px;
+}
+button {
+  grid-column: span 2;
+  padding: 12px;
+  background-color: #007bff;
+  color: white;
+  border: none;
+  border-radius: 5px;
+  cursor: pointer;
+}
+button:hover {
+  background-color: #0056b3;
+}
+.results {
+  margin-top: 30px;
+  padding: 20px;
+  background-color: #f8f9fa;
+  border-radius: 5px;
+}
+.error {
+  color: red;
+  margin-top: 10px;
+}
+.logout {
+  text-align: right;
+  margin-top: 20px;
+}
+.logout a {
+  color: #007bff;
+  text-decoration: none;
+}
+"""
+
 LOGIN_TEMPLATE = """
 <!doctype html>
 <html lang="fr">
 <head>
   <meta charset="utf-8">
   <title>Connexion Médecin</title>
-  <style>
-    body {
-      font-family: 'Roboto', sans-serif;
-      background: url('https://via.placeholder.com/1920x1080?text=Medicine+Background') no-repeat center center fixed;
-      background-size: cover;
-      margin: 0;
-      padding: 0;
-    }
-    .login-container {
-      max-width: 400px;
-      margin: 100px auto;
-      padding: 20px;
-      background: rgba(255, 255, 255, 0.9);
-      border-radius: 10px;
-      box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-    }
-    h1 {
-      text-align: center;
-      color: #333;
-      margin-bottom: 20px;
-    }
-    .form-group {
-      margin-bottom: 15px;
-    }
-    label {
-      display: block;
-      margin-bottom: 5px;
-      font-weight: bold;
-    }
-    input[type="email"], input[type="password"] {
-      width: 100%;
-      padding: 10px;
-      border: 1px solid #ddd;
-      border-radius: 5px;
-    }
-    button {
-      width: 100%;
-      padding: 10px;
-      background-color: #007bff;
-      color: white;
-      border: none;
-      border-radius: 5px;
-      cursor: pointer;
-    }
-    button:hover {
-      background-color: #0056b3;
-    }
-    .error {
-      color: red;
-      margin-top: 10px;
-      text-align: center;
-    }
-  </style>
+  <link rel="stylesheet" href="{{ url_for('stylesheet', name='login') }}?v={{ stylesheet_version('login') }}">
 </head>
 <body>
   <div class="login-container">
@@ -263,105 +876,14 @@ PREDICT_TEMPLATE = """
 <head>
   <meta charset="utf-8">
   <title>Prédiction de Risque Cardiaque</title>
-  <style>
-    body {
-      font-family: 'Roboto', sans-serif;
-      background: url('https://via.placeholder.com/1920x1080?text=Medicine+Background') no-repeat center center fixed;
-      background-size: cover;
-      margin: 0;
-      padding: 0;
-    }
-    .container {
-      max-width: 800px;
-      margin: 50px auto;
-      padding: 20px;
-      background: rgba(255, 255, 255, 0.9);
-      border-radius: 10px;
-      box-shadow: 0 4px 10px rgba(0, 0, 0, 0.2);
-    }
-    h1 {
-      text-align: center;
-      color: #333;
-      margin-bottom: 30px;
-    }
-    .form-grid {
-      display: grid;
-      grid-template-columns: repeat(2, 1fr);
-      gap: 20px;
-    }
-    .form-group {
-      margin-bottom: 15px;
-    }
-    label {
-      display: block;
-      margin-bottom: 5px;
-      font-weight: bold;
-    }
-    input[type="number"], select {
-      width: 100%;
-      padding: 10px;
-      border: 1px solid #ddd;
-      border-radius: 5px;
-    }
-    button {
-      grid-column: span 2;
-      padding: 12px;
-      background-color: #007bff;
-      color: white;
-      border: none;
-      border-radius: 5px;
-      cursor: pointer;
-    }
-    button:hover {
-      background-color: #0056b3;
-    }
-    .results {
-      margin-top: 30px;
-      padding: 20px;
-      background-color: #f8f9fa;
-      border-radius: 5px;
-    }
-    .error {
-      color: red;
-      margin-top: 10px;
-    }
-    .logout {
-      text-align: right;
-      margin-top: 20px;
-    }
-    .logout a {
-      color: #007bff;
-      text-decoration: none;
-    }
-  </style>
+  <link rel="stylesheet" href="{{ url_for('stylesheet', name='predict') }}?v={{ stylesheet_version('predict') }}">
 </head>
 <body>
   <div class="container">
     <h1>Prédiction de Risque Cardiaque</h1>
     <form method="POST">
       <div class="form-grid">
-        {% for feature in features %}
-        <div class="form-group">
-          <label for="{{ feature }}">{{ feature.replace('_', ' ').title() }} ({{ valid_ranges[feature][0] }} - {{ valid_ranges[feature][1] }} {{ units.get(feature, '') }}):</label>
-          {% if feature == 'sex' %}
-            <select id="{{ feature }}" name="{{ feature }}" required>
-              <option value="1" {% if form_values[feature] == 1 %}selected{% endif %}>Male</option>
-              <option value="0" {% if form_values[feature] == 0 %}selected{% endif %}>Female</option>
-            </select>
-          {% elif feature in ['anaemia', 'diabetes', 'high_blood_pressure', 'smoking'] %}
-            <select id="{{ feature }}" name="{{ feature }}" required>
-              <option value="1" {% if form_values[feature] == 1 %}selected{% endif %}>Yes</option>
-              <option value="0" {% if form_values[feature] == 0 %}selected{% endif %}>No</option>
-            </select>
-          {% else %}
-            <input type="number" id="{{ feature }}" name="{{ feature }}" 
-                   value="{{ form_values[feature] }}" 
-                   min="{{ valid_ranges[feature][0] }}" 
-                   max="{{ valid_ranges[feature][1] }}" 
-                   step="any" required>
-          {% endif %}
-        </div>
-        {% endfor %}
+__FORM_FIELDS__
       </div>
       <button type="submit">Prédire le Risque</button>
     </form>
@@ -379,7 +901,19 @@ PREDICT_TEMPLATE = """
           {% endif %}
         </p>
         <p>Probabilité: {{ (probability * 100)|round(2) }}%</p>
-        {% if pie_chart_image %}
+        {% if explanation %}
+          <h3>Principaux facteurs:</h3>
+          <ul>
+            {% for item in explanation.contributions %}
+              <li>{{ item.feature }} = {{ item.value|round(2) }} :
+                <span style="color: {{ 'red' if item.contribution > 0 else 'green' }};">{{ '%+.3f'|format(item.contribution) }}</span></li>
+            {% endfor %}
+          </ul>
+          <p>Contributions SHAP ({{ 'probabilité' if explanation.units == 'probability' else 'log-odds' }}, base {{ '%.3f'|format(explanation.base_value) }})</p>
+        {% endif %}
+        {% if pie_chart_svg %}
+          <div style="max-width: 100%;">{{ pie_chart_svg|safe }}</div>
+        {% elif pie_chart_image %}
           <img src="data:image/png;base64,{{ pie_chart_image }}" 
                alt="Graphique de Risque" style="max-width: 100%;">
         {% endif %}
@@ -390,5 +924,45 @@ PREDICT_TEMPLATE = """
 </html>
 """
 
+# Stylesheets served from /assets/<name>.css with an ETag and a long
+# Cache-Control lifetime, instead of being inlined into every response
+STYLESHEETS = {
+    name: (css, hashlib.sha1(css.encode('utf-8')).hexdigest()[:16])
+    for name, css in (('login', LOGIN_CSS), ('predict', PREDICT_CSS))
+}
+
+@app.template_global()
+def stylesheet_version(name):
+    return STYLESHEETS[name][1]
+
+# Pre-render the form fields. Labels, ranges and units never change, so only
+# the parts that depend on form_values are left as Jinja expressions.
+def prerender_form_fields():
+    fields = []
+    for feature in FEATURES:
+        min_val, max_val = VALID_RANGES[feature]
+        label = escape(f"{feature.replace('_', ' ').title()} ({min_val} - {max_val} {UNITS.get(feature, '')}):")
+        value = f"form_values['{feature}']"
+        fields.append('        <div class="form-group">')
+        fields.append(f'          <label for="{feature}">{label}</label>')
+        if feature in BINARY_FEATURES:
+            yes, no = ('Male', 'Female') if feature == 'sex' else ('Yes', 'No')
+            fields.append(f'            <select id="{feature}" name="{feature}" required>')
+            fields.append(f'              <option value="1" {{% if {value} == 1 %}}selected{{% endif %}}>{yes}</option>')
+            fields.append(f'              <option value="0" {{% if {value} == 0 %}}selected{{% endif %}}>{no}</option>')
+            fields.append('            </select>')
+        else:
+            fields.append(f'            <input type="number" id="{feature}" name="{feature}"')
+            fields.append(f'                   value="{{{{ {value} }}}}"')
+            fields.append(f'                   min="{min_val}" max="{max_val}" step="any" required>')
+        fields.append('        </div>')
+    return '\n'.join(fields)
+
+# Templates are compiled once at startup rather than on every request
+LOGIN_PAGE = app.jinja_env.from_string(LOGIN_TEMPLATE)
+PREDICT_PAGE = app.jinja_env.from_string(PREDICT_TEMPLATE.replace('__FORM_FIELDS__', prerender_form_fields()))
+
 if __name__ == '__main__':
+    # The debug server logs at the development level unless APP_ENV is set
+    configure_logging(os.environ.get("APP_ENV", "development"))
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Compact inference format for tree ensembles: the scaler and every tree of
+# the model flattened into a handful of NumPy arrays in one .npz file.
+# Evaluating it needs NumPy only (no scikit-learn, XGBoost or LightGBM), and
+# loading it is a plain array read instead of unpickling Python objects.
+#
+# Nodes of all trees are concatenated; `roots` holds the index of each
+# tree's root. An internal node sends a row left when
+# x[feature] <= threshold (float32, compared on float32 inputs like
+# scikit-learn does); a leaf points to itself on both sides so that every
+# tree can be walked for exactly `depth` steps. Leaves hold the positive
+# class probability ("mean" models, averaged over trees) or a margin ("logit"
+# models, summed with `base` and passed through a sigmoid).
+FORMAT_VERSION = 1
+
+# Rows evaluated per block, bounding the (rows x trees) index matrix
+BLOCK_ROWS = 4096
+
+class CompactModel:
+    """Standalone evaluator of an exported model (see scripts/export_compact.py).
+
+    Offers the same predict_proba / predict_risk interface as
+    inference.FusedPredictor, so app.py can serve either.
+    """
+
+    def __init__(self, arrays):
+        version = int(arrays["format_version"])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact model format {version} (expected {FORMAT_VERSION})")
+        self.mean = arrays["mean"]
+        self.scale = arrays["scale"]
+        # Index arrays are widened to intp once here instead of on every gather
+        self.feature = arrays["feature"].astype(np.intp)
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"].astype(np.intp)
+        self.right = arrays["right"].astype(np.intp)
+        self.value = arrays["value"]
+        self.roots = arrays["roots"].astype(np.intp)
+        # children[2 * node + 1] is the right child: one gather per step, no np.where
+        self.children = np.column_stack([self.left, self.right]).ravel()
+        self.depth = int(arrays["depth"])
+        self.aggregate = str(arrays["aggregate"])
+        self.base = float(arrays["base"])
+        self.classes = arrays["classes"]
+        self.model_class = str(arrays["model_class"])
+        self.n_features = len(self.mean)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        return (X - self.mean) / self.scale
+
+    def leaves(self, X_scaled):
+        """Leaf index reached in every tree, shape (rows, trees)."""
+        X32 = np.ascontiguousarray(X_scaled, dtype=np.float32)
+        flat = X32.ravel()
+        node = np.tile(self.roots, len(X32))
+        row_start = np.repeat(np.arange(len(X32)) * self.n_features, len(self.roots))
+        for _ in range(self.depth):
+            go_right = flat[row_start + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+        return node.reshape(len(X32), len(self.roots))
+
+    def predict_proba(self, X):
+        X_scaled = self.transform(X)
+        positive = np.empty(len(X_scaled))
+        for start in range(0, len(X_scaled), BLOCK_ROWS):
+            values = self.value[self.leaves(X_scaled[start:start + BLOCK_ROWS])]
+            if self.aggregate == "mean":
+                positive[start:start + BLOCK_ROWS] = values.mean(axis=1, dtype=np.float64)
+            else:
+                margin = self.base + values.sum(axis=1, dtype=np.float64)
+                positive[start:start + BLOCK_ROWS] = 1.0 / (1.0 + np.exp(-margin))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict_risk(self, X):
+        """Return (labels, probability of the positive class) for each row of X."""
+        proba = self.predict_proba(X)
+        labels = self.classes.take(np.argmax(proba, axis=1))
+        return labels, proba[:, 1]
+
+def load_compact(path="models/model.npz"):
+    return CompactModel.load(path)
@@ -0,0 +1,269 @@
+import json
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+
+# Columnar dataset store: data/<name>.csv is mirrored by a data/<name>.cols
+# directory holding one .npy file per column plus schema.json. Columns keep
+# the compact dtypes chosen by optimize_memory() and plain columns are
+# memory-mapped on load, so only the pages that are actually read are
+# brought into memory. Two storage encodings shrink the files further:
+#   bits   - bool columns, bit-packed (8 rows per byte)
+#   scaled - float64 columns with few decimals, stored as integers
+#            (value * scale); decoding gives back the exact same floats
+# A store can also be a view: row positions into another store (e.g. a
+# balanced sample), so resampled rows are never duplicated on disk.
+#
+# Stores are derived files: schema.json records the size and modification
+# time of the CSV next to the store when it was written, and load_dataset()
+# reads the CSV instead of a store that no longer matches it.
+STORE_SUFFIX = ".cols"
+SCHEMA_FILE = "schema.json"
+
+# Largest number of decimals tried for the scaled encoding
+MAX_DECIMALS = 6
+
+def store_path(path):
+    """Column store directory for a dataset path (data/x.csv -> data/x.cols)."""
+    root, ext = os.path.splitext(path)
+    return path if ext == STORE_SUFFIX else root + STORE_SUFFIX
+
+def csv_stamp(path):
+    """Size and modification time of the CSV that a store mirrors, or None when it does not exist."""
+    csv = os.path.splitext(store_path(path))[0] + ".csv"
+    try:
+        stat = os.stat(csv)
+    except FileNotFoundError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def int_storage(lo, hi):
+    """Smallest signed integer dtype holding [lo, hi]."""
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return None
+
+def scaled_decimals(values, max_decimals=MAX_DECIMALS):
+    """Fewest decimals d such that round(values * 10**d) / 10**d == values, or None."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0 or not np.isfinite(values).all():
+        return None
+    for decimals in range(max_decimals + 1):
+        scale = 10 ** decimals
+        if np.array_equal(np.round(values * scale) / scale, values):
+            return decimals
+    return None
+
+def column_spec(name, values):
+    """Storage description of one column (see the encodings above)."""
+    if values.dtype == object:
+        raise TypeError(f"Column {name!r} is not numeric; the column store only holds NumPy dtypes")
+    spec = {"name": str(name), "dtype": values.dtype.str, "encoding": "plain"}
+    if values.dtype == bool:
+        spec["encoding"] = "bits"
+    elif values.dtype == np.float64:
+        decimals = scaled_decimals(values)
+        if decimals is not None:
+            scaled = np.round(values * 10 ** decimals)
+            storage = int_storage(scaled.min(), scaled.max())
+            if storage is not None and storage.itemsize < values.dtype.itemsize:
+                spec.update(encoding="scaled", scale=10 ** decimals, storage=storage.str)
+    return spec
+
+class DatasetWriter:
+    """Write a column store chunk by chunk for a known number of rows.
+
+    Columns are pre-allocated as .npy memory maps in a temporary directory;
+    close() writes schema.json and renames the directory into place, so
+    readers see either the old or the new dataset, never a mix of both.
+    A CSV copy has to be complete before close(), which records its stamp.
+    """
+
+    def __init__(self, path, rows, columns):
+        self.target = store_path(path)
+        self.rows = rows
+        self.parent = os.path.dirname(self.target) or "."
+        os.makedirs(self.parent, exist_ok=True)
+        self.tmp_dir = tempfile.mkdtemp(dir=self.parent, prefix=".tmp-")
+        self.columns = []
+        self.arrays = []
+        self.pending_bits = {}
+        self.offset = 0
+        for i, spec in enumerate(columns):
+            spec = dict(spec, file=f"{i:04d}.npy")
+            if spec["encoding"] == "bits":
+                dtype, shape = np.uint8, ((rows + 7) // 8,)
+                self.pending_bits[spec["name"]] = np.zeros(0, dtype=bool)
+            else:
+                dtype, shape = np.dtype(spec.get("storage", spec["dtype"])), (rows,)
+            self.columns.append(spec)
+            self.arrays.append(np.lib.format.open_memmap(
+                os.path.join(self.tmp_dir, spec["file"]), mode="w+", dtype=dtype, shape=shape))
+
+    def write(self, df):
+        end = self.offset + len(df)
+        if end > self.rows:
+            raise ValueError(f"Dataset writer expected {self.rows} rows, got more")
+        for spec, array in zip(self.columns, self.arrays):
+            values = df[spec["name"]].to_numpy()
+            if spec["encoding"] == "bits":
+                # Only whole bytes are written; the last <8 rows wait for the next chunk
+                pending = self.pending_bits[spec["name"]]
+                start = (self.offset - len(pending)) // 8
+                bits = np.concatenate([pending, values.astype(bool)])
+                full = len(bits) if end == self.rows else len(bits) // 8 * 8
+                packed = np.packbits(bits[:full])
+                array[start:start + len(packed)] = packed
+                self.pending_bits[spec["name"]] = bits[full:]
+            elif spec["encoding"] == "scaled":
+                array[self.offset:end] = np.round(values.astype(np.float64) * spec["scale"])
+            else:
+                array[self.offset:end] = values
+        self.offset = end
+
+    def close(self):
+        if self.offset != self.rows:
+            raise ValueError(f"Dataset writer expected {self.rows} rows, got {self.offset}")
+        for array in self.arrays:
+            array.flush()
+        self.arrays = []
+        with open(os.path.join(self.tmp_dir, SCHEMA_FILE), "w") as f:
+            json.dump({"rows": self.rows, "columns": self.columns, "csv": csv_stamp(self.target)}, f, indent=2)
+        return _publish(self.tmp_dir, self.target)
+
+    def abort(self):
+        self.arrays = []
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def _publish(tmp_dir, target):
+    if os.path.isdir(target):
+        old_dir = tempfile.mkdtemp(dir=os.path.dirname(target) or ".", prefix=".old-")
+        os.rename(target, os.path.join(old_dir, "store"))
+        os.rename(tmp_dir, target)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.rename(tmp_dir, target)
+    return target
+
+def csv_frame(df):
+    """df with bool columns as 0/1, the way the CSV files have always stored flags."""
+    flags = [name for name in df.columns if df[name].dtype == bool]
+    return df.astype({name: np.int8 for name in flags}) if flags else df
+
+def save_dataset(df, path, csv=True):
+    """Write df as a column store next to `path` (and as CSV at `path` if csv)."""
+    columns = [column_spec(name, df[name].to_numpy()) for name in df.columns]
+    if csv and not path.endswith(STORE_SUFFIX):
+        csv_frame(df).to_csv(path, index=False)
+    with DatasetWriter(path, len(df), columns) as writer:
+        writer.write(df)
+    return writer.target
+
+def save_view(path, source, index):
+    """Store the rows `index` (positions) of the dataset at `source` as a view at `path`."""
+    target = store_path(path)
+    parent = os.path.dirname(target) or "."
+    index = np.asarray(index)
+    rows = read_schema(source)["rows"]
+    if len(index) and (index.min() < 0 or index.max() >= rows):
+        raise IndexError(f"View index out of range for {store_path(source)} ({rows} rows)")
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+    try:
+        np.save(os.path.join(tmp_dir, "index.npy"), index.astype(int_storage(0, max(rows - 1, 0))))
+        with open(os.path.join(tmp_dir, SCHEMA_FILE), "w") as f:
+            json.dump({"rows": len(index), "view": {
+                "source": os.path.relpath(store_path(source), parent), "index": "index.npy"},
+                "csv": csv_stamp(target)}, f, indent=2)
+        return _publish(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+def has_store(path):
+    return os.path.isfile(os.path.join(store_path(path), SCHEMA_FILE))
+
+def read_schema(path):
+    with open(os.path.join(store_path(path), SCHEMA_FILE)) as f:
+        return json.load(f)
+
+def is_current(path):
+    """Whether the store still matches its CSV (and, for a view, its source store does too).
+
+    A store whose CSV has been deleted is still current: it is then the
+    only copy of the data.
+    """
+    target = store_path(path)
+    schema = read_schema(target)
+    stamp = csv_stamp(target)
+    if stamp is not None and stamp != schema.get("csv"):
+        return False
+    if "view" in schema:
+        return is_current(os.path.join(os.path.dirname(target), schema["view"]["source"]))
+    return True
+
+def load_columns(path, columns=None, mmap=True):
+    """{column: array} read from the column store.
+
+    Plain columns are memory-mapped by default; bit-packed and scaled
+    columns are decoded into memory, and so are the selected rows of a view.
+    """
+    target = store_path(path)
+    schema = read_schema(path)
+    if "view" in schema:
+        source = os.path.join(os.path.dirname(target), schema["view"]["source"])
+        index = np.load(os.path.join(target, schema["view"]["index"]))
+        return {name: values[index] for name, values in load_columns(source, columns, mmap).items()}
+    by_name = {column["name"]: column for column in schema["columns"]}
+    names = list(by_name) if columns is None else list(columns)
+    missing = [name for name in names if name not in by_name]
+    if missing:
+        raise KeyError(f"Columns not found in {target}: {missing}")
+
+    arrays = {}
+    for name in names:
+        spec = by_name[name]
+        encoding = spec.get("encoding", "plain")
+        stored = np.load(os.path.join(target, spec["file"]),
+                         mmap_mode="r" if mmap and encoding == "plain" else None, allow_pickle=False)
+        if encoding == "bits":
+            arrays[name] = np.unpackbits(stored, count=schema["rows"]).astype(bool)
+        elif encoding == "scaled":
+            arrays[name] = stored.astype(np.float64) / spec["scale"]
+        else:
+            arrays[name] = stored
+    return arrays
+
+def load_dataset(path, columns=None, mmap=True):
+    """Load a dataset as a DataFrame, preferring its column store over the CSV.
+
+    With mmap=True the DataFrame wraps the read-only memory maps of the plain
+    columns without copying them. Falls back to pandas.read_csv when no
+    store exists or the store is out of date with the CSV.
+    """
+    import pandas as pd
+
+    stale = has_store(path) and not is_current(path)
+    if stale and not os.path.isfile(path):
+        raise RuntimeError(f"{store_path(path)} was built from a CSV that has changed since; rebuild it")
+    if stale:
+        warnings.warn(f"{store_path(path)} does not match {path} any more; reading the CSV instead")
+    if stale or not has_store(path):
+        df = pd.read_csv(path, usecols=columns)
+        return df if columns is None else df[list(columns)]
+    # Plain ndarray views of the maps: no copy, but no np.memmap subclass either
+    arrays = {name: np.asarray(values) for name, values in load_columns(path, columns, mmap).items()}
+    return pd.DataFrame(arrays, copy=False)
@@ -1,3 +1,6 @@
 #!/bin/bash
-echo "🚀 Starting local server..."
-python app.py
+# Production server: the model is loaded once, then WEB_WORKERS processes
+# (default: CPU count) x WEB_THREADS threads share it (see serve.py).
+# `python app.py` is the single-process debug server for development.
+echo "🚀 Starting server..."
+python serve.py "$@"
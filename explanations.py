@@ -0,0 +1,160 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import numpy as np
+
+# Per-prediction SHAP explanations for the served model. The explainer is
+# built once per model version and pickled to CACHE_DIR under the hash of the
+# model file, so restarts and workers serving the same model load it instead
+# of rebuilding it. Contributions are for the positive class: probabilities
+# for scikit-learn forests, log-odds for XGBoost, LightGBM and logistic
+# regression.
+CACHE_DIR = ".cache/explainers"
+
+# Models explained exactly and fast by shap's TreeExplainer
+TREE_MODELS = ("RandomForestClassifier", "ExtraTreesClassifier", "DecisionTreeClassifier",
+               "GradientBoostingClassifier", "XGBClassifier", "LGBMClassifier")
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class LinearExplainer:
+    """Closed-form SHAP values of a logistic regression, in log-odds.
+
+    With independent features the SHAP value of feature j is
+    coef_j * (x_j - E[x_j]), so a whole batch is one vectorized expression.
+    Inputs are the model's own (StandardScaler-transformed) rows. The
+    expectation is taken over `background` rows, by default the zero vector:
+    the mean of the standardized training data. Because the scaler is affine
+    per feature, these values equal coef_j / scale_j * (raw x_j - mean_j),
+    i.e. they are also the contributions of the raw features.
+    """
+
+    def __init__(self, model, background=None):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.shape[0] != 1:
+            raise ValueError("LinearExplainer only supports binary logistic regressions")
+        self.coef = coef[0]
+        self.mean = np.zeros_like(self.coef) if background is None \
+            else np.asarray(background, dtype=np.float64).mean(axis=0)
+        self.expected_value = float(model.intercept_[0] + self.coef @ self.mean)
+
+    def shap_values(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean) * self.coef
+
+def make_explainer(model, background=None):
+    """The fastest exact explainer for the type of `model`.
+
+    TreeExplainer for tree ensembles, LinearExplainer for logistic
+    regression; any other model (e.g. SVC) falls back to shap's generic
+    permutation explainer, which needs background rows and is much slower.
+    """
+    name = type(model).__name__
+    if name == "LogisticRegression":
+        return LinearExplainer(model, background)
+
+    import shap
+
+    if name in TREE_MODELS:
+        return shap.TreeExplainer(model)
+    if background is None:
+        raise ValueError(f"No fast explainer for {name}; background rows are needed for the generic one")
+    background = np.asarray(background, dtype=np.float64)
+    explainer = shap.explainers.Permutation(model.predict_proba, background)
+    # shap_values() of this explainer does not report the base value
+    explainer.expected_value = model.predict_proba(background).mean(axis=0)
+    return explainer
+
+def load_explainer(model, model_hash, cache_dir=CACHE_DIR):
+    """Explainer of `model`, read from the disk cache when it holds one for `model_hash`."""
+    import shap
+
+    path = os.path.join(cache_dir, f"{model_hash[:16]}-shap-{shap.__version__}.pkl")
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    explainer = make_explainer(model)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(explainer, f)
+    os.replace(tmp_path, path)
+    return explainer
+
+class ExplanationService:
+    """Top SHAP contributions for rows of raw feature values.
+
+    `transform` maps raw rows to the model's input space (the scaler), so
+    callers pass the same rows they score. Every call explains all of its
+    rows with a single shap_values() pass; its latency is recorded apart from
+    the prediction itself.
+    """
+
+    def __init__(self, explainer, transform, features, top_k=3):
+        self.explainer = explainer
+        self.transform = transform
+        self.features = list(features)
+        self.top_k = top_k
+        self.units = "probability" if np.size(explainer.expected_value) > 1 else "log-odds"
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+    @property
+    def base_value(self):
+        # Read after the fact: for XGBoost models shap only settles the
+        # expected value on the first shap_values() call
+        return float(np.atleast_1d(self.explainer.expected_value)[-1])
+
+    def contributions(self, X):
+        """SHAP values of the positive class, shape (rows, features)."""
+        values = self.explainer.shap_values(self.transform(X))
+        # Forests return one matrix per class (a list of them before shap
+        # 0.45, a (rows, features, classes) array since), boosters only the
+        # positive margin
+        if isinstance(values, list):
+            values = np.stack(values, axis=-1)
+        values = np.asarray(values)
+        if values.ndim == 3:
+            values = values[:, :, -1]
+        return values
+
+    def explain(self, X):
+        """One {"base_value", "units", "contributions"} dict per row, largest |contribution| first."""
+        start = time.perf_counter()
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        values = self.contributions(X)
+        top = np.argsort(-np.abs(values), axis=1)[:, :self.top_k]
+        base_value = self.base_value
+        explanations = [{
+            "base_value": base_value,
+            "units": self.units,
+            "contributions": [{"feature": self.features[j], "value": float(X[i, j]),
+                               "contribution": float(values[i, j])} for j in top[i]],
+        } for i in range(len(X))]
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.rows += len(X)
+            self.seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+        return explanations
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "rows": self.rows,
+                    "mean_ms": 1000 * self.seconds / self.calls if self.calls else 0.0,
+                    "max_ms": 1000 * self.max_seconds, "top_k": self.top_k, "units": self.units}
@@ -0,0 +1,128 @@
+from collections import namedtuple
+import numpy as np
+
+# Model features
+FEATURES = ["age", "anaemia", "creatinine_phosphokinase", "diabetes", "ejection_fraction",
+            "high_blood_pressure", "platelets", "serum_creatinine", "serum_sodium",
+            "sex", "smoking", "time"]
+
+# Valid ranges for numeric inputs
+VALID_RANGES = {
+    "age": (18, 100),
+    "anaemia": (0, 1),  # Binary
+    "creatinine_phosphokinase": (10, 10000),  # U/L
+    "diabetes": (0, 1),  # Binary
+    "ejection_fraction": (10, 80),  # Percentage
+    "high_blood_pressure": (0, 1),  # Binary
+    "platelets": (50000, 500000),  # per µL
+    "serum_creatinine": (0.1, 10),  # mg/dL
+    "serum_sodium": (110, 150),  # mmol/L
+    "sex": (0, 1),  # Binary
+    "smoking": (0, 1),  # Binary
+    "time": (0, 365)  # Days
+}
+
+# Binary (0/1) features
+BINARY_FEATURES = ["anaemia", "diabetes", "high_blood_pressure", "sex", "smoking"]
+
+# Units of measure for each feature
+UNITS = {
+    "age": "years",
+    "anaemia": "",
+    "creatinine_phosphokinase": "U/L",
+    "diabetes": "",
+    "ejection_fraction": "%",
+    "high_blood_pressure": "",
+    "platelets": "per µL",
+    "serum_creatinine": "mg/dL",
+    "serum_sodium": "mmol/L",
+    "sex": "",
+    "smoking": "",
+    "time": "days"
+}
+
+# X: float64 matrix in FEATURES order (NaN where a value is missing or invalid)
+# valid: boolean mask of rows without any error
+# errors: {row index: {feature: message}} for the invalid rows only
+ValidationResult = namedtuple("ValidationResult", ["X", "valid", "errors"])
+
+class FeatureSchema:
+    """Declarative description of the model inputs.
+
+    Validation is done on a whole batch at once with NumPy masks (missing,
+    unparsable, non-binary and out-of-range cells) and reports every error of
+    every row. Python only loops over the cells that actually failed.
+    """
+
+    def __init__(self, features, valid_ranges, units, binary_features):
+        self.features = list(features)
+        self.units = dict(units)
+        self.lower = np.array([valid_ranges[f][0] for f in self.features], dtype=np.float64)
+        self.upper = np.array([valid_ranges[f][1] for f in self.features], dtype=np.float64)
+        self.binary = np.array([f in binary_features for f in self.features])
+        self.messages = [
+            f"must be between {valid_ranges[f][0]} and {valid_ranges[f][1]}"
+            + (f" {units[f]}" if units.get(f) else "")
+            for f in self.features
+        ]
+
+    def validate(self, X, unparsable=None, row_errors=None):
+        """Validate a float matrix in FEATURES order (NaN marks a missing value)."""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        if unparsable is None:
+            unparsable = np.zeros(X.shape, dtype=bool)
+        missing = np.isnan(X) & ~unparsable
+        not_binary = self.binary & ~np.isnan(X) & (X != 0) & (X != 1)
+        out_of_range = (X < self.lower) | (X > self.upper)
+        invalid = missing | unparsable | not_binary | out_of_range
+
+        valid = ~invalid.any(axis=1)
+        errors = {}
+        for row, col in zip(*np.nonzero(invalid)):
+            if unparsable[row, col]:
+                message = "Invalid number"
+            elif missing[row, col]:
+                message = "Missing value"
+            elif not_binary[row, col]:
+                message = "must be 0 or 1"
+            else:
+                message = self.messages[col]
+            errors.setdefault(int(row), {})[self.features[col]] = message
+
+        # A row-level error (e.g. not an object) replaces the per-feature
+        # ones, which would only report every feature as missing
+        for row, row_error in (row_errors or {}).items():
+            valid[row] = False
+            errors[row] = dict(row_error)
+        return ValidationResult(X, valid, errors)
+
+    def validate_records(self, records):
+        """Validate a list of mappings (JSON objects, form data) keyed by feature."""
+        X = np.full((len(records), len(self.features)), np.nan)
+        unparsable = np.zeros(X.shape, dtype=bool)
+        row_errors = {}
+        for i, record in enumerate(records):
+            if not hasattr(record, "get"):
+                row_errors[i] = {"record": "must be a JSON object"}
+                continue
+            for j, feature in enumerate(self.features):
+                value = record.get(feature)
+                if value is None or value == "":
+                    continue
+                try:
+                    X[i, j] = float(value)
+                except (TypeError, ValueError):
+                    unparsable[i, j] = True
+        return self.validate(X, unparsable, row_errors)
+
+    def validate_frame(self, df):
+        """Validate a pandas DataFrame with one column per feature."""
+        import pandas as pd
+
+        columns = df.reindex(columns=self.features)
+        numeric = columns.apply(pd.to_numeric, errors="coerce")
+        X = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+        unparsable = numeric.isna().to_numpy() & columns.notna().to_numpy()
+        return self.validate(X, unparsable)
+
+SCHEMA = FeatureSchema(FEATURES, VALID_RANGES, UNITS, BINARY_FEATURES)
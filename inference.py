@@ -0,0 +1,138 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+class FusedPredictor:
+    """Scaler and model fused into a single NumPy inference step.
+
+    The StandardScaler's mean/scale are folded into plain array arithmetic and
+    the model's probabilities are computed once; the label is derived from
+    them instead of running a second predict() pass over the trees.
+    For scikit-learn forests the trees are called directly, which skips the
+    forest's input validation and joblib dispatch.
+    """
+
+    def __init__(self, model, scaler):
+        self.model = model
+        self.classes = np.asarray(model.classes_)
+        self.n_features = int(scaler.n_features_in_)
+
+        if hasattr(scaler, "mean_") and hasattr(scaler, "scale_"):
+            self.mean = np.asarray(scaler.mean_ if scaler.mean_ is not None else 0.0, dtype=np.float64)
+            self.scale = np.asarray(scaler.scale_ if scaler.scale_ is not None else 1.0, dtype=np.float64)
+            self.scaler = None
+        else:
+            # Unknown scaler type: fall back to its own transform
+            self.mean = self.scale = None
+            self.scaler = scaler
+
+        self.trees = None
+        if type(model).__name__ in ("RandomForestClassifier", "ExtraTreesClassifier") \
+                and getattr(model, "n_outputs_", 1) == 1:
+            self.trees = list(model.estimators_)
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, self.n_features)
+        if self.scaler is not None:
+            return self.scaler.transform(X)
+        return (X - self.mean) / self.scale
+
+    def predict_proba(self, X):
+        X_scaled = self.transform(X)
+        if self.trees is None:
+            return self.model.predict_proba(X_scaled)
+
+        X_scaled = np.ascontiguousarray(X_scaled, dtype=np.float32)
+        proba = self.trees[0].predict_proba(X_scaled, check_input=False)
+        for tree in self.trees[1:]:
+            proba += tree.predict_proba(X_scaled, check_input=False)
+        proba /= len(self.trees)
+        return proba
+
+    def predict_risk(self, X):
+        """Return (labels, probability of the positive class) for each row of X."""
+        proba = self.predict_proba(X)
+        labels = self.classes.take(np.argmax(proba, axis=1))
+        return labels, proba[:, 1]
+
+class InferenceBatcher:
+    """Coalesce concurrent small predictions into one matrix call.
+
+    Callers submit a few rows and block on a Future. A background thread
+    collects pending submissions for up to ``max_wait`` seconds or until
+    ``max_rows`` rows are queued, runs ``predict_fn`` once over the stacked
+    matrix and fans the (labels, probabilities) slices back out.
+    """
+
+    def __init__(self, predict_fn, max_wait=0.002, max_rows=64):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        future = Future()
+        self._queue.put((np.asarray(rows, dtype=np.float64).reshape(len(rows), -1), future))
+        return future
+
+    def predict_risk(self, rows):
+        return self.submit(rows).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            count = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while count < self.max_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                pending.append(item)
+                count += len(item[0])
+            self._process(pending)
+            if stop:
+                return
+
+    def _process(self, pending):
+        try:
+            X = np.vstack([rows for rows, _ in pending])
+            labels, probabilities = self.predict_fn(X)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(X)
+        start = 0
+        for rows, future in pending:
+            end = start + len(rows)
+            future.set_result((labels[start:end], probabilities[start:end]))
+            start = end
+
+def load_predictor(model_path="models/best_model.pkl", scaler_path="models/scaler.pkl"):
+    """Load the saved model and scaler and fuse them into a FusedPredictor."""
+    import joblib
+
+    return FusedPredictor(joblib.load(model_path), joblib.load(scaler_path))
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+# Versioned model store: every version is a directory holding the model, the
+# scaler it was trained with and a metadata.json file. CURRENT names the
+# version to serve.
+STORE_DIR = "models/store"
+CURRENT_FILE = "CURRENT"
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def save_version(model, scaler, metadata=None, store_dir=STORE_DIR, activate=True):
+    """Save model and scaler together as a new version and return its name.
+
+    The version directory is written under a temporary name and renamed into
+    place, and CURRENT is replaced atomically, so readers never see a
+    half-written version or a model paired with the wrong scaler.
+    """
+    import joblib
+
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=store_dir, prefix=".tmp-")
+    try:
+        joblib.dump(model, os.path.join(tmp_dir, "model.pkl"))
+        joblib.dump(scaler, os.path.join(tmp_dir, "scaler.pkl"))
+        model_sha = _file_sha256(os.path.join(tmp_dir, "model.pkl"))
+        scaler_sha = _file_sha256(os.path.join(tmp_dir, "scaler.pkl"))
+        version = base_version = time.strftime("%Y%m%d-%H%M%S") + "-" + model_sha[:8]
+        suffix = 1
+        while os.path.exists(os.path.join(store_dir, version)):
+            suffix += 1
+            version = f"{base_version}-{suffix}"
+
+        metadata = dict(metadata or {})
+        metadata.update({
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model_class": type(model).__name__,
+            "model_sha256": model_sha,
+            "scaler_sha256": scaler_sha,
+        })
+        with open(os.path.join(tmp_dir, "metadata.json"), "w") as f:
+            json.dump(metadata, f, indent=2, default=str)
+
+        os.rename(tmp_dir, os.path.join(store_dir, version))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if activate:
+        activate_version(version, store_dir)
+    return version
+
+def activate_version(version, store_dir=STORE_DIR):
+    """Point CURRENT at an existing version (also used to roll back)."""
+    if not os.path.isfile(os.path.join(store_dir, version, "metadata.json")):
+        raise FileNotFoundError(f"Model version not found: {version}")
+    _write_atomic(os.path.join(store_dir, CURRENT_FILE), version + "\n")
+
+def current_version(store_dir=STORE_DIR):
+    try:
+        with open(os.path.join(store_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def list_versions(store_dir=STORE_DIR):
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(name for name in os.listdir(store_dir)
+                  if os.path.isfile(os.path.join(store_dir, name, "metadata.json")))
+
+def load_metadata(version=None, store_dir=STORE_DIR):
+    """metadata.json of a version, CURRENT by default."""
+    version = version or current_version(store_dir)
+    if version is None:
+        raise FileNotFoundError(f"No current model version in {store_dir}")
+    with open(os.path.join(store_dir, version, "metadata.json")) as f:
+        return json.load(f)
+
+def load_version(version=None, store_dir=STORE_DIR):
+    """Load (model, scaler, metadata) of a version, CURRENT by default."""
+    import joblib
+
+    metadata = load_metadata(version, store_dir)
+    version_dir = os.path.join(store_dir, metadata["version"])
+    model = joblib.load(os.path.join(version_dir, "model.pkl"))
+    scaler = joblib.load(os.path.join(version_dir, "scaler.pkl"))
+    return model, scaler, metadata
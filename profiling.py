@@ -0,0 +1,64 @@
+import cProfile
+import json
+import os
+import random
+import threading
+import time
+
+class RequestProfiler:
+    """Profile a sample of requests with cProfile and dump them to disk.
+
+    A request to one of `endpoints` is profiled with probability
+    `sample_rate`; its dump is kept when the request took at least `slow_ms`
+    milliseconds (0 keeps every sampled request). Each dump is a .prof file
+    (pstats format: snakeviz, flameprof, gprof2dot or `python -m pstats`)
+    next to a .json file holding the request's stage timings. Only the
+    newest `keep` dumps are kept in `directory`.
+    """
+
+    def __init__(self, directory, sample_rate=1.0, slow_ms=0.0, keep=50, endpoints=("predict",)):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.keep = keep
+        self.endpoints = frozenset(endpoints)
+        self._lock = threading.Lock()
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, endpoint):
+        """An enabled cProfile.Profile if this request is sampled, else None."""
+        if endpoint not in self.endpoints or random.random() >= self.sample_rate:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active (Python 3.12+ allows only one)
+            return None
+        return profile
+
+    def finish(self, profile, info):
+        """Stop `profile` and dump it with `info` (a dict with "elapsed_ms"); returns the path or None."""
+        profile.disable()
+        if info["elapsed_ms"] < self.slow_ms:
+            return None
+        with self._lock:
+            self._sequence += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence:06d}"
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(path + ".prof")
+        with open(path + ".json", "w") as f:
+            json.dump(info, f, indent=2)
+        self.rotate()
+        return path + ".prof"
+
+    def rotate(self):
+        with self._lock:
+            dumps = sorted(name[:-len(".prof")] for name in os.listdir(self.directory) if name.endswith(".prof"))
+            for name in dumps[:max(len(dumps) - self.keep, 0)]:
+                for suffix in (".prof", ".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name + suffix))
+                    except FileNotFoundError:
+                        pass
@@ -1,31 +1,110 @@
+import argparse
+import os
+import sys
+import numpy as np
 import pandas as pd
-from sklearn.utils import resample
+from sklearn.utils import check_random_state, resample
+from sklearn.utils.class_weight import compute_sample_weight
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import csv_frame, has_store, is_current, load_dataset, save_dataset, save_view
+from scripts.data_processing import optimize_memory
+
+def balance_index(y, random_state=42):
+    """Row positions of a balanced sample: every majority row plus an upsampled minority.
+
+    Only integer positions are resampled and shuffled, never the rows
+    themselves; df.iloc[balance_index(df.DEATH_EVENT)] equals the balanced
+    frame the CSV pipeline has always produced.
+    """
+    y = np.asarray(y)
+    positions = np.int32 if len(y) < 2**31 else np.int64
+    majority = np.flatnonzero(y == 0).astype(positions)
+    minority = np.flatnonzero(y == 1).astype(positions)
 
-def balance_data():
-    # Load the optimized dataset
-    df = pd.read_csv("data/heart_failure_optimized.csv")
-    
-    # Separate majority and minority classes
-    df_majority = df[df.DEATH_EVENT == 0]
-    df_minority = df[df.DEATH_EVENT == 1]
-    
     # Upsample minority class
-    df_minority_upsampled = resample(
-        df_minority, 
+    minority_upsampled = resample(
+        minority,
         replace=True,     # sample with replacement
-        n_samples=len(df_majority),    # to match majority class
-        random_state=42   # reproducible results
+        n_samples=len(majority),    # to match majority class
+        random_state=random_state   # reproducible results
     )
-    
-    # Combine majority class with upsampled minority class
-    df_balanced = pd.concat([df_majority, df_minority_upsampled])
-    
-    # Shuffle the dataset
-    df_balanced = df_balanced.sample(frac=1, random_state=42).reset_index(drop=True)
-    
-    # Save the balanced dataset
-    df_balanced.to_csv("data/heart_failure_balanced.csv", index=False)
-    print("✅ Balanced dataset saved as 'data/heart_failure_balanced.csv'!")
+
+    # Combine majority class with upsampled minority class, then shuffle
+    # (the same permutation DataFrame.sample(frac=1) draws)
+    index = np.concatenate([majority, minority_upsampled])
+    return index[check_random_state(random_state).permutation(len(index))]
+
+def balance(df, random_state=42):
+    return df.iloc[balance_index(df.DEATH_EVENT, random_state)].reset_index(drop=True)
+
+def balanced_weights(y):
+    """Per-row training weights that give both classes the same total weight."""
+    return compute_sample_weight('balanced', np.asarray(y))
+
+def undersample_index(y, random_state=42):
+    """Row positions kept by imblearn's RandomUnderSampler (majority rows dropped)."""
+    from imblearn.under_sampling import RandomUnderSampler
+
+    y = np.asarray(y).astype(int)
+    # The sampler only needs positions to pick from, not the feature columns
+    sampler = RandomUnderSampler(random_state=random_state)
+    sampler.fit_resample(np.arange(len(y)).reshape(-1, 1), y)
+    return np.sort(sampler.sample_indices_)
+
+def smote(df, random_state=42):
+    """Oversample the minority class with synthetic rows (SMOTENC when there are 0/1 flags)."""
+    from imblearn.over_sampling import SMOTE, SMOTENC
+
+    X = df.drop(columns=['DEATH_EVENT'])
+    y = df['DEATH_EVENT'].astype(int)
+    # Interpolating 0/1 flags would invent values like 0.4, so they are
+    # treated as categories
+    binary = [i for i, column in enumerate(X.columns) if X[column].isin((0, 1)).all()]
+    sampler = SMOTENC(categorical_features=binary, random_state=random_state) if binary \
+        else SMOTE(random_state=random_state)
+    X_resampled, y_resampled = sampler.fit_resample(X, y)
+    X_resampled = X_resampled.astype(X.dtypes.to_dict())
+    return X_resampled.assign(DEATH_EVENT=y_resampled.astype(df['DEATH_EVENT'].dtype))
+
+# Rows per chunk when the balanced rows are exported as CSV
+CSV_CHUNK_ROWS = 100000
+
+def export_csv_rows(df, index, path, chunk_rows=CSV_CHUNK_ROWS):
+    """Write the rows `index` (positions) of df as CSV, one chunk of positions at a time."""
+    with open(path, 'w', newline='') as f:
+        for start in range(0, max(len(index), 1), chunk_rows):
+            csv_frame(df.iloc[index[start:start + chunk_rows]]).to_csv(f, header=start == 0, index=False)
+
+def balance_data(method='index', export_csv=False, source="data/heart_failure_optimized.csv",
+                 target="data/heart_failure_balanced.csv"):
+    # The optimized column store is a gitignored derived file: on a fresh
+    # checkout (or after the CSV changed) it is rebuilt from the CSV, since
+    # the balanced view points into it
+    if not has_store(source) or not is_current(source):
+        save_dataset(optimize_memory(pd.read_csv(source)), source, csv=False)
+    # Load the optimized dataset
+    df = load_dataset(source)
+
+    if method == 'smote':
+        # Synthetic rows are new data and have to be stored
+        balanced = smote(df)
+        save_dataset(balanced, target, csv=export_csv)
+        rows = len(balanced)
+    else:
+        # Save the balanced dataset as row positions into the optimized one;
+        # rows are only copied, a chunk at a time, for an exported CSV
+        index = undersample_index(df.DEATH_EVENT) if method == 'undersample' else balance_index(df.DEATH_EVENT)
+        if export_csv:
+            export_csv_rows(df, index, target)
+        save_view(target, source, index)
+        rows = len(index)
+    print(f"✅ Balanced dataset ({method}, {rows} rows) saved as '{target}'!")
 
 if __name__ == "__main__":
-    balance_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Balance the optimized dataset.")
+    parser.add_argument('--method', default='index', choices=['index', 'smote', 'undersample'],
+                        help="index: upsampled row positions (no rows copied); smote/undersample: imblearn")
+    parser.add_argument('--export-csv', action='store_true', help="also write the balanced rows as CSV")
+    args = parser.parse_args()
+    balance_data(args.method, args.export_csv)
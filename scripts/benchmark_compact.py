@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compact_model import CompactModel
+from inference import FusedPredictor
+from scripts.export_compact import export_model
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so that load time includes the imports each
+# format needs (joblib + scikit-learn for the pickle, NumPy for the arrays).
+# Peak RSS is read from VmHWM: ru_maxrss would include the parent's peak.
+PROBE = """
+import json, sys, time
+def peak_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+start = time.perf_counter()
+base = peak_kb()
+if sys.argv[1] == 'pickle':
+    import joblib
+    from inference import FusedPredictor
+    predictor = FusedPredictor(joblib.load(sys.argv[2]), joblib.load(sys.argv[3]))
+else:
+    from compact_model import CompactModel
+    predictor = CompactModel.load(sys.argv[2])
+elapsed = time.perf_counter() - start
+peak = peak_kb()
+print(json.dumps({'load': elapsed, 'rss_mb': (peak - base) / 1024,
+                  'modules': sorted({'sklearn', 'xgboost', 'lightgbm'} & set(sys.modules))}))
+"""
+
+def measure_load(*args):
+    output = subprocess.run([sys.executable, '-c', PROBE, *args], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def latency(predict, X, repeat):
+    """Median seconds of predict(X) over `repeat` calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+def main(model_path="models/best_model.pkl", scaler_path="models/scaler.pkl", max_depth=None, repeat=50):
+    model, scaler = joblib.load(model_path), joblib.load(scaler_path)
+    X = pd.read_csv("data/heart_failure.csv").drop(columns=['DEATH_EVENT']).to_numpy(dtype=np.float64)
+    batch = X[np.arange(1000) % len(X)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        compact_path = os.path.join(tmp_dir, 'model.npz')
+        nodes, size = export_model(model, scaler, compact_path, max_depth=max_depth)
+        fused, compact = FusedPredictor(model, scaler), CompactModel.load(compact_path)
+        expected = model.predict_proba(scaler.transform(X))[:, 1]
+        difference = np.abs(compact.predict_risk(X)[1] - expected).max()
+
+        print(f"{type(model).__name__}: {nodes} nodes, max |Δ probability| = {difference:.2e}")
+        print(f"{'format':<10}{'size':>10}{'load':>10}{'RSS':>9}{'1 row':>11}{'1000 rows':>12}  imports")
+        pickle_size = os.path.getsize(model_path) + os.path.getsize(scaler_path)
+        for name, predictor, size_bytes, args in (
+                ('pickle', fused, pickle_size, ('pickle', model_path, scaler_path)),
+                ('compact', compact, size, ('compact', compact_path))):
+            load = measure_load(*args)
+            one = latency(predictor.predict_risk, X[:1], repeat)
+            many = latency(predictor.predict_risk, batch, max(1, repeat // 5))
+            print(f"{name:<10}{size_bytes / 1024:>7.0f} KB{load['load'] * 1000:>7.0f} ms"
+                  f"{load['rss_mb']:>6.0f} MB{one * 1e6:>8.0f} µs{many * 1000:>9.1f} ms  "
+                  f"{', '.join(load['modules']) or 'numpy only'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the pickled model with its compact NumPy export.")
+    parser.add_argument('--max-depth', type=int, default=None, help="prune the compact export to this depth")
+    parser.add_argument('--repeat', type=int, default=50, help="timed calls per measurement")
+    args = parser.parse_args()
+    main(max_depth=args.max_depth, repeat=args.repeat)
@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import load_dataset, save_dataset
+from scripts.data_processing import optimize_memory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so that peak RSS only covers one loader: load
+# the dataset, then touch one column the way a training script would.
+PROBE = """
+import json, resource, sys, time
+import pandas as pd
+from dataset import load_dataset
+path, mode = sys.argv[1], sys.argv[2]
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+df = pd.read_csv(path) if mode == 'csv' else load_dataset(path)
+loaded = time.perf_counter()
+mean_age = float(df['age'].mean())
+done = time.perf_counter()
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'load': loaded - start, 'first_column': done - loaded,
+                  'rss_mb': (peak - base) / 1024, 'frame_mb': df.memory_usage().sum() / 2**20}))
+"""
+
+def measure(path, mode):
+    output = subprocess.run([sys.executable, '-c', PROBE, path, mode], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(rows=1_000_000):
+    df = optimize_memory(load_dataset("data/heart_failure.csv"))
+    df = df.iloc[np.arange(rows) % len(df)].reset_index(drop=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "patients.csv")
+        save_dataset(df, path)
+        print(f"Loading {rows:,} rows ({os.path.getsize(path) / 2**20:.0f} MB as CSV):")
+        print(f"{'format':<14}{'load':>10}{'first column':>16}{'RSS growth':>14}{'frame':>10}")
+        for mode in ('csv', 'column store'):
+            result = measure(path, 'csv' if mode == 'csv' else 'store')
+            print(f"{mode:<14}{result['load'] * 1000:>7.0f} ms{result['first_column'] * 1000:>13.1f} ms"
+                  f"{result['rss_mb']:>11.0f} MB{result['frame_mb']:>7.0f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CSV and column store load time and memory.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="rows of the synthetic patient table")
+    args = parser.parse_args()
+    main(args.rows)
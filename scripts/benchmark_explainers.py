@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+import shap
+from lightgbm import LGBMClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from explanations import make_explainer
+from feature_schema import FEATURES
+
+warnings.filterwarnings('ignore')
+
+# Same model types as train.py, fitted on standardized rows like the served model
+MODELS = {
+    "RandomForest": RandomForestClassifier(n_estimators=100, random_state=42),
+    "XGBoost": XGBClassifier(eval_metric="logloss", random_state=42),
+    "LightGBM": LGBMClassifier(random_state=42, verbose=-1),
+    "LogisticRegression": LogisticRegression(max_iter=1000, random_state=42),
+}
+
+def timed(explain, X):
+    start = time.perf_counter()
+    explain(X)
+    return time.perf_counter() - start
+
+def main(rows=50, background=100):
+    df = pd.read_csv("data/heart_failure.csv")
+    X = StandardScaler().fit_transform(df[FEATURES].to_numpy(dtype=np.float64))
+    y = df["DEATH_EVENT"].to_numpy()
+    X_background, X_explain = X[:background], X[:rows]
+
+    print(f"Explaining {rows} rows (generic = shap permutation explainer, {background} background rows):")
+    print(f"{'model':<20}{'dispatched':<20}{'generic':>12}{'dispatched':>12}{'speedup':>10}")
+    for name, model in MODELS.items():
+        model.fit(X, y)
+        generic = shap.explainers.Permutation(model.predict_proba, X_background)
+        generic_time = timed(lambda rows: generic(rows, silent=True), X_explain)
+        fast = make_explainer(model, X_background)
+        fast_time = timed(fast.shap_values, X_explain)
+        print(f"{name:<20}{type(fast).__name__:<20}{generic_time * 1000:>9.0f} ms"
+              f"{fast_time * 1000:>9.1f} ms{generic_time / fast_time:>9.0f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the dispatched explainers against shap's generic one.")
+    parser.add_argument('--rows', type=int, default=50, help="rows explained per model")
+    parser.add_argument('--background', type=int, default=100, help="background rows of the generic explainer")
+    args = parser.parse_args()
+    main(args.rows, args.background)
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import FusedPredictor, InferenceBatcher
+
+warnings.filterwarnings('ignore')
+
+def time_calls(fn, rows, repeat):
+    timings = []
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+def throughput(fn, rows, threads, per_thread=100):
+    def worker(offset):
+        for i in range(per_thread):
+            fn(rows[(offset + i) % len(rows)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return threads * per_thread / (time.perf_counter() - start)
+
+def benchmark_concurrency(predictor, rows, levels=(1, 8, 32)):
+    batcher = InferenceBatcher(predictor.predict_risk, max_wait=0.002, max_rows=64)
+    print("\nConcurrent single-row throughput (predictions/s):")
+    print(f"{'threads':>8}{'direct':>12}{'micro-batched':>16}")
+    try:
+        for threads in levels:
+            direct = throughput(lambda row: predictor.predict_risk([row]), rows, threads)
+            batched = throughput(lambda row: batcher.predict_risk([row]), rows, threads)
+            print(f"{threads:>8}{direct:>12.0f}{batched:>16.0f}")
+    finally:
+        batcher.close()
+
+def main(repeat=500):
+    model = joblib.load('models/best_model.pkl')
+    scaler = joblib.load('models/scaler.pkl')
+    predictor = FusedPredictor(model, scaler)
+
+    X = pd.read_csv('data/heart_failure.csv').drop(columns=['DEATH_EVENT'])
+    records = X.to_dict(orient='records')
+    rows = X.to_numpy().tolist()
+
+    # Current /predict path: one-row DataFrame, scaler.transform, predict + predict_proba
+    def legacy(record):
+        input_scaled = scaler.transform(pd.DataFrame([record]))
+        model.predict(input_scaled)[0]
+        model.predict_proba(input_scaled)[0, 1]
+
+    def fused(row):
+        predictor.predict_risk([row])
+
+    # Warm up both paths
+    legacy(records[0])
+    fused(rows[0])
+
+    results = {
+        'legacy (DataFrame + predict + predict_proba)': time_calls(legacy, records, repeat),
+        'fused (NumPy scaling + single pass)': time_calls(fused, rows, repeat),
+    }
+
+    print(f"Single-row latency over {repeat} calls ({model.__class__.__name__}):")
+    for name, timings in results.items():
+        print(f"{name:<48} mean {timings.mean():7.3f} ms   "
+              f"p50 {np.percentile(timings, 50):7.3f} ms   p99 {np.percentile(timings, 99):7.3f} ms")
+
+    legacy_mean, fused_mean = (t.mean() for t in results.values())
+    print(f"\n✅ Speedup: {legacy_mean / fused_mean:.1f}x")
+
+    benchmark_concurrency(predictor, rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import http.cookiejar
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATIENT = {"age": 75, "anaemia": 0, "creatinine_phosphokinase": 582, "diabetes": 0,
+           "ejection_fraction": 20, "high_blood_pressure": 1, "platelets": 265000,
+           "serum_creatinine": 1.9, "serum_sodium": 130, "sex": 1, "smoking": 0, "time": 4}
+
+def process_tree(pid):
+    """pid and all its descendants (from /proc)."""
+    parents = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            try:
+                with open(f"/proc/{name}/stat") as f:
+                    parents[int(name)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError):
+                pass
+    tree, frontier = [pid], [pid]
+    while frontier:
+        children = [child for child, parent in parents.items() if parent in frontier]
+        tree.extend(children)
+        frontier = children
+    return tree
+
+def memory_kb(pid):
+    """(RSS, PSS) of a process in kB; PSS splits shared pages between the processes sharing them."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1])
+    return values["Rss:"], values["Pss:"]
+
+def login(base_url):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    credentials = urllib.parse.urlencode({"email": "medecin@example.com", "password": "password123"}).encode()
+    opener.open(base_url + "/", data=credentials, timeout=5)
+    return opener
+
+def wait_until_ready(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+def load_test(base_url, requests, concurrency):
+    """(requests per second, p50 ms, p99 ms) of /api/predict calls from `concurrency` clients."""
+    body = json.dumps([PATIENT]).encode()
+    latencies, lock = [], threading.Lock()
+
+    def client(count):
+        opener = login(base_url)
+        for _ in range(count):
+            request = urllib.request.Request(base_url + "/api/predict", data=body,
+                                             headers={"Content-Type": "application/json"})
+            start = time.perf_counter()
+            opener.open(request, timeout=30).read()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(requests // concurrency,)) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return (len(latencies) / elapsed, statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.99) - 1] * 1000)
+
+def measure(name, command, port, requests, concurrency):
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, start_new_session=True)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url)
+        load_test(base_url, 4 * concurrency, concurrency)
+        throughput, p50, p99 = load_test(base_url, requests, concurrency)
+        # The debug server's reloader and the serve.py master do not handle requests
+        processes = process_tree(server.pid)
+        memory = [memory_kb(pid) for pid in processes]
+        rss = sum(m[0] for m in memory) / 1024
+        pss = sum(m[1] for m in memory) / 1024
+        print(f"{name:<28}{len(processes):>6}{rss:>10.0f} MB{pss:>10.0f} MB"
+              f"{throughput:>10.0f}/s{p50:>9.1f} ms{p99:>9.1f} ms")
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+def main(workers=2, threads=8, requests=400, concurrency=8):
+    print(f"{requests} /api/predict requests from {concurrency} concurrent clients")
+    print(f"{'server':<28}{'procs':>6}{'RSS':>13}{'PSS':>13}{'throughput':>12}{'p50':>12}{'p99':>12}")
+    measure("python app.py (debug)", [sys.executable, "app.py"], 5000, requests, concurrency)
+    serve = [sys.executable, "serve.py", "--port", "5061", "--workers", str(workers), "--threads", str(threads)]
+    measure(f"serve.py {workers}x{threads} preloaded", serve, 5061, requests, concurrency)
+    measure(f"serve.py {workers}x{threads} per-worker load", serve + ["--no-preload"], 5061, requests, concurrency)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare memory and throughput of the debug server and serve.py.")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+    main(args.workers, args.threads, args.requests, args.concurrency)
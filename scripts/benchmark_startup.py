@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import json
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter: time the import of app.py, then the first
+# prediction through the Flask test client (which triggers the warm-up hook
+# in lazy mode).
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+with client.session_transaction() as sess:
+    sess['logged_in'] = True
+record = {f: sum(app.VALID_RANGES[f]) / 2 for f in app.FEATURES}
+response = client.post('/api/predict', json=[record])
+assert response.status_code == 200, response.get_data(as_text=True)
+first_prediction = time.perf_counter()
+print(json.dumps({'import': imported - start, 'first_prediction': first_prediction - imported}))
+"""
+
+def measure(lazy, runs):
+    env = dict(os.environ, LAZY_STARTUP='1' if lazy else '0', PYTHONWARNINGS='ignore')
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) * 1000 for key in samples[0]}
+
+def main(runs=5):
+    print(f"Startup time of app.py (median of {runs} fresh interpreters):")
+    print(f"{'mode':<8}{'import':>12}{'first prediction':>20}{'total':>12}")
+    for name, lazy in (('eager', False), ('lazy', True)):
+        result = measure(lazy, runs)
+        total = result['import'] + result['first_prediction']
+        print(f"{name:<8}{result['import']:>9.0f} ms{result['first_prediction']:>17.0f} ms{total:>9.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,132 @@
+import argparse
+import os
+import sys
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import DatasetWriter, csv_frame, int_storage, scaled_decimals
+
+def column_stats(values):
+    """Per-chunk statistics of one numeric column; merged across chunks by merge_stats."""
+    present = values[~np.isnan(values)] if values.dtype.kind == 'f' else values
+    stats = {
+        'source': values.dtype.str,
+        'nan': int(len(values) - len(present)),
+        'lo': float(present.min()) if len(present) else np.inf,
+        'hi': float(present.max()) if len(present) else -np.inf,
+        'integral': bool(np.array_equal(present, np.round(present))),
+        'binary': bool(np.isin(present, (0, 1)).all()),
+        'decimals': scaled_decimals(present) if len(present) else 0,
+        'float32_error': 0.0,
+    }
+    if len(present):
+        as_float = present.astype(np.float64)
+        stats['float32_error'] = float(np.abs(as_float.astype(np.float32).astype(np.float64) - as_float).max())
+    return stats
+
+def merge_stats(a, b):
+    return {
+        'source': np.promote_types(a['source'], b['source']).str,
+        'nan': a['nan'] + b['nan'],
+        'lo': min(a['lo'], b['lo']),
+        'hi': max(a['hi'], b['hi']),
+        'integral': a['integral'] and b['integral'],
+        'binary': a['binary'] and b['binary'],
+        'decimals': None if a['decimals'] is None or b['decimals'] is None else max(a['decimals'], b['decimals']),
+        'float32_error': max(a['float32_error'], b['float32_error']),
+    }
+
+def compact_spec(name, stats):
+    """Pick the compact dtype (and storage encoding) a column can take without losing values.
+
+    bool for 0/1 flags, the smallest integer for whole numbers, float32 when
+    rounding it back to the column's decimals gives the original values, and
+    float64 otherwise, stored as scaled integers when it has few decimals.
+    """
+    spec = {'name': name, 'encoding': 'plain', 'source': stats['source']}
+    decimals = stats['decimals']
+    if stats['nan'] == 0 and stats['binary']:
+        spec.update(dtype=np.dtype(bool).str, encoding='bits')
+    elif stats['nan'] == 0 and stats['integral'] and int_storage(stats['lo'], stats['hi']) is not None:
+        spec['dtype'] = int_storage(stats['lo'], stats['hi']).str
+    elif decimals is not None and stats['float32_error'] < 0.4 * 10.0 ** -decimals:
+        spec['dtype'] = np.dtype(np.float32).str
+    else:
+        spec['dtype'] = np.dtype(np.float64).str
+        if stats['nan'] == 0 and decimals is not None:
+            scale = 10 ** decimals
+            storage = int_storage(round(stats['lo'] * scale), round(stats['hi'] * scale))
+            if storage is not None and storage.itemsize < 8:
+                spec.update(encoding='scaled', scale=scale, storage=storage.str)
+    return spec
+
+def infer_schema(chunks):
+    """Column specs stable across all chunks (a list of DataFrames or a chunk iterator).
+
+    Returns (specs, rows).
+    """
+    stats = {}
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        for name in chunk.columns:
+            values = chunk[name].to_numpy()
+            if values.dtype.kind not in 'biuf':
+                raise TypeError(f"Column {name!r} is not numeric")
+            chunk_stats = column_stats(values)
+            stats[name] = merge_stats(stats[name], chunk_stats) if name in stats else chunk_stats
+    return [compact_spec(name, column) for name, column in stats.items()], rows
+
+def apply_schema(df, specs):
+    return df.astype({spec['name']: np.dtype(spec['dtype']) for spec in specs})
+
 def optimize_memory(df):
-    for col in df.select_dtypes(include=["int64"]).columns:
-        df[col] = pd.to_numeric(df[col], downcast="integer")
+    specs, _ = infer_schema([df])
+    return apply_schema(df, specs)
+
+def memory_report(specs, rows):
+    """Print the per-column size as read by pandas, in memory after optimization and on disk."""
+    print(f"\n{'column':<26}{'before':>16}{'after':>16}{'stored':>22}")
+    totals = np.zeros(3)
+    for spec in specs:
+        before = np.dtype(spec['source']).itemsize * rows
+        after = np.dtype(spec['dtype']).itemsize * rows
+        if spec['encoding'] == 'bits':
+            stored, layout = (rows + 7) // 8, 'bits'
+        elif spec['encoding'] == 'scaled':
+            stored, layout = np.dtype(spec['storage']).itemsize * rows, f"{np.dtype(spec['storage'])} x1/{spec['scale']}"
+        else:
+            stored, layout = after, str(np.dtype(spec['dtype']))
+        totals += (before, after, stored)
+        print(f"{spec['name']:<26}{np.dtype(spec['source'])!s:>8}{before / 1024:>7.1f}K"
+              f"{np.dtype(spec['dtype'])!s:>8}{after / 1024:>7.1f}K{layout:>14}{stored / 1024:>7.1f}K")
+    print(f"{'total':<26}{totals[0] / 1024:>15.1f}K{totals[1] / 1024:>15.1f}K{totals[2] / 1024:>21.1f}K")
 
-    for col in df.select_dtypes(include=["float64"]).columns:
-        df[col] = pd.to_numeric(df[col], downcast="float")
+def optimize_csv(input_path, output_path, chunksize=100000):
+    """Out-of-core optimize_memory: two streaming passes over the CSV.
 
-    return df
+    The first pass infers one schema for all chunks, the second converts each
+    chunk and appends it to the column store and the CSV copy, so memory use
+    is bounded by the chunk size rather than the file size.
+    """
+    specs, rows = infer_schema(pd.read_csv(input_path, chunksize=chunksize))
+    header = True
+    # The CSV file is closed first, so the store records its final stamp
+    with DatasetWriter(output_path, rows, specs) as writer, open(output_path, 'w', newline='') as csv_file:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            chunk = apply_schema(chunk, specs)
+            writer.write(chunk)
+            csv_frame(chunk).to_csv(csv_file, header=header, index=False)
+            header = False
+    memory_report(specs, rows)
+    return specs
 
 if __name__ == "__main__":
-    df = pd.read_csv("data/heart_failure.csv")
-    df = optimize_memory(df)
-    df.to_csv("data/heart_failure_optimized.csv", index=False)
+    parser = argparse.ArgumentParser(description="Downcast the raw dataset into compact dtypes, chunk by chunk.")
+    parser.add_argument('--input', default="data/heart_failure.csv")
+    parser.add_argument('--output', default="data/heart_failure_optimized.csv")
+    parser.add_argument('--chunksize', type=int, default=100000, help="rows per chunk")
+    args = parser.parse_args()
+    optimize_csv(args.input, args.output, args.chunksize)
     print("✅ Memory optimization complete!")
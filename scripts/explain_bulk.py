@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_store
+from dataset import load_dataset
+from explanations import ExplanationService, file_sha256, load_explainer
+from feature_schema import FEATURES
+
+# SHAP values of a whole dataset, computed chunk by chunk across a process
+# pool and written straight into a memory-mapped .npy file. Results live in
+# CACHE_DIR/<model hash>-<data hash>/ next to a meta.json that records the
+# finished chunks, so a rerun with the same model and data only maps the file
+# (and an interrupted run resumes where it stopped).
+CACHE_DIR = ".cache/shap"
+VALUES_FILE = "values.npy"
+META_FILE = "meta.json"
+
+MODEL_PATH = "models/best_model.pkl"
+SCALER_PATH = "models/scaler.pkl"
+
+def data_hash(X):
+    return hashlib.sha256(np.ascontiguousarray(X, dtype=np.float64).tobytes()).hexdigest()
+
+def result_dir(model_hash, X_hash, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{model_hash[:16]}-{X_hash[:16]}")
+
+def _write_meta(directory, meta):
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, META_FILE))
+
+# Every worker loads the explainer once (from the explanations disk cache)
+_service = None
+
+def _init_worker(model, model_hash, explainer_dir):
+    global _service
+    explainer = load_explainer(model, model_hash, explainer_dir)
+    _service = ExplanationService(explainer, lambda X: X, FEATURES)
+
+def _explain_chunk(values_path, start, X_scaled):
+    # Workers write their rows into the shared file; only indices travel back
+    values = np.load(values_path, mmap_mode="r+")
+    values[start:start + len(X_scaled)] = _service.contributions(X_scaled)
+    values.flush()
+    return start, _service.base_value
+
+def explain_bulk(model, scaler, X, model_hash, chunk_size=1000, n_jobs=None,
+                 cache_dir=CACHE_DIR, explainer_dir=".cache/explainers"):
+    """SHAP values of the positive class for every row of X, shape (rows, features).
+
+    Returns a read-only memory map; only missing chunks are computed.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    directory = result_dir(model_hash, data_hash(X), cache_dir)
+    values_path = os.path.join(directory, VALUES_FILE)
+    chunks = list(range(0, len(X), chunk_size))
+
+    meta = None
+    if os.path.exists(os.path.join(directory, META_FILE)):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        if meta["chunk_size"] != chunk_size:
+            meta = None
+    if meta is None:
+        os.makedirs(directory, exist_ok=True)
+        np.lib.format.open_memmap(values_path, mode="w+", dtype=np.float64, shape=X.shape).flush()
+        meta = {"model_hash": model_hash, "rows": len(X), "features": FEATURES,
+                "chunk_size": chunk_size, "done": [], "base_value": None}
+        _write_meta(directory, meta)
+
+    done = set(meta["done"])
+    missing = [start for start in chunks if start not in done]
+    if missing:
+        # Built (or loaded) once here so that workers only read the cached pickle
+        explainer = load_explainer(model, model_hash, explainer_dir)
+        X_scaled = scaler.transform(X)
+        meta["units"] = ExplanationService(explainer, None, FEATURES).units
+        n_jobs = n_jobs or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(missing)), initializer=_init_worker,
+                                 initargs=(model, model_hash, explainer_dir)) as pool:
+            futures = [pool.submit(_explain_chunk, values_path, start, X_scaled[start:start + chunk_size])
+                       for start in missing]
+            for future in as_completed(futures):
+                start, base_value = future.result()
+                meta["done"].append(start)
+                meta["base_value"] = base_value
+                _write_meta(directory, meta)
+    return np.load(values_path, mmap_mode="r")
+
+def load_bulk(model_hash, X, cache_dir=CACHE_DIR):
+    """(values memory map, meta) of a finished bulk run, or None."""
+    directory = result_dir(model_hash, data_hash(X), cache_dir)
+    try:
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if len(meta["done"]) < -(-meta["rows"] // meta["chunk_size"]):
+        return None
+    return np.load(os.path.join(directory, VALUES_FILE), mmap_mode="r"), meta
+
+def cohort_importance(values, mask):
+    """Mean |SHAP| of every feature over the rows selected by mask."""
+    return dict(zip(FEATURES, np.abs(np.asarray(values)[mask]).mean(axis=0).round(4).tolist()))
+
+def served_model(store_dir=model_store.STORE_DIR):
+    """(model, scaler, model hash) currently served."""
+    if model_store.current_version(store_dir):
+        model, scaler, metadata = model_store.load_version(store_dir=store_dir)
+        return model, scaler, metadata["model_sha256"]
+    import joblib
+    return joblib.load(MODEL_PATH), joblib.load(SCALER_PATH), file_sha256(MODEL_PATH)
+
+def main(input_path="data/heart_failure.csv", chunk_size=1000, n_jobs=None, plot=False):
+    df = load_dataset(input_path)
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    model, scaler, model_hash = served_model()
+
+    start = time.perf_counter()
+    values = explain_bulk(model, scaler, X, model_hash, chunk_size, n_jobs)
+    print(f"✅ SHAP values of {len(X)} rows ready in {time.perf_counter() - start:.2f} s "
+          f"({result_dir(model_hash, data_hash(X))})")
+
+    if 'DEATH_EVENT' in df:
+        died = df['DEATH_EVENT'].to_numpy().astype(bool)
+        for name, mask in (("DEATH_EVENT=1", died), ("DEATH_EVENT=0", ~died)):
+            top = sorted(cohort_importance(values, mask).items(), key=lambda item: -item[1])[:5]
+            print(f"Top features for {name}: {top}")
+
+    if plot:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import shap
+
+        shap.summary_plot(np.asarray(values), df[FEATURES], show=False)
+        plt.savefig("models/shap_summary.png")
+        plt.close()
+        print("✅ SHAP summary plot saved to models/shap_summary.png")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute (or reload) SHAP values for a whole dataset.")
+    parser.add_argument('--input', default="data/heart_failure.csv", help="CSV or column store to explain")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="rows explained per task")
+    parser.add_argument('--n-jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--plot', action='store_true', help="write models/shap_summary.png from the values")
+    args = parser.parse_args()
+    main(args.input, args.chunk_size, args.n_jobs, args.plot)
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_store
+from compact_model import FORMAT_VERSION
+
+# Every exported tree is a dict of per-node lists:
+#   feature, threshold (float64, "go left if x <= threshold"), left, right
+#   (-1 for leaves), value (leaf output) and weight (training samples/cover)
+
+def float32_at_most(values):
+    """Largest float32 <= each value: for float32 x, x <= t32 exactly when x <= value."""
+    values = np.asarray(values, dtype=np.float64)
+    as32 = values.astype(np.float32)
+    above = as32.astype(np.float64) > values
+    as32[above] = np.nextafter(as32[above], np.float32(-np.inf))
+    return as32
+
+def sklearn_trees(model):
+    """Trees of a scikit-learn forest; leaves hold the positive class probability."""
+    trees = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :]
+        positive = value[:, 1] / value.sum(axis=1)
+        trees.append({
+            'feature': tree.feature.tolist(),
+            'threshold': tree.threshold.tolist(),
+            'left': tree.children_left.tolist(),
+            'right': tree.children_right.tolist(),
+            'value': positive.tolist(),
+            'weight': tree.weighted_n_node_samples.tolist(),
+        })
+    return trees
+
+def _flatten(root, nodes_of):
+    """Number the nodes of a nested JSON tree depth-first and return the per-node lists."""
+    tree = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'value', 'weight')}
+    stack = [(root, None, None)]
+    while stack:
+        node, parent, side = stack.pop()
+        index = len(tree['value'])
+        if parent is not None:
+            tree[side][parent] = index
+        feature, threshold, value, weight, left, right = nodes_of(node)
+        tree['feature'].append(feature)
+        tree['threshold'].append(threshold)
+        tree['value'].append(value)
+        tree['weight'].append(weight)
+        tree['left'].append(-1)
+        tree['right'].append(-1)
+        if left is not None:
+            stack.append((right, index, 'right'))
+            stack.append((left, index, 'left'))
+    return tree
+
+def xgboost_trees(model):
+    """Trees of a binary:logistic XGBClassifier; returns (trees, base margin)."""
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())['learner']
+    if config['objective']['name'] != 'binary:logistic':
+        raise ValueError(f"Unsupported XGBoost objective: {config['objective']['name']}")
+    base_score = float(config['learner_model_param']['base_score'].strip('[]'))
+    names = booster.feature_names
+
+    try:
+        rounds = model.best_iteration + 1
+    except AttributeError:
+        rounds = booster.num_boosted_rounds()
+
+    def nodes_of(node):
+        if 'leaf' in node:
+            return 0, 0.0, node['leaf'], node.get('cover', 1.0), None, None
+        feature = names.index(node['split']) if names else int(node['split'][1:])
+        children = {child['nodeid']: child for child in node['children']}
+        # XGBoost goes to "yes" when x < split_condition (both float32); for
+        # float32 inputs that is x <= the float32 just below the condition
+        threshold = float(np.nextafter(np.float32(node['split_condition']), np.float32(-np.inf)))
+        return (feature, threshold, 0.0, node.get('cover', 1.0),
+                children[node['yes']], children[node['no']])
+
+    dumps = booster.get_dump(dump_format='json', with_stats=True)[:rounds]
+    trees = [_flatten(json.loads(dump), nodes_of) for dump in dumps]
+    return trees, float(np.log(base_score / (1.0 - base_score)))
+
+def lightgbm_trees(model):
+    """Trees of a binary LGBMClassifier; the sigmoid factor is folded into the leaves."""
+    dump = model.booster_.dump_model()
+    objective = dump['objective'].split()
+    if objective[0] != 'binary':
+        raise ValueError(f"Unsupported LightGBM objective: {dump['objective']}")
+    sigmoid = next((float(part.split(':')[1]) for part in objective if part.startswith('sigmoid:')), 1.0)
+    rounds = model.best_iteration_ or len(dump['tree_info'])
+
+    def nodes_of(node):
+        if 'leaf_value' in node:
+            return 0, 0.0, node['leaf_value'] * sigmoid, node.get('leaf_count', 1), None, None
+        if node['decision_type'] != '<=':
+            raise ValueError("Categorical LightGBM splits are not supported")
+        return (node['split_feature'], node['threshold'], 0.0, node.get('internal_count', 1),
+                node['left_child'], node['right_child'])
+
+    return [_flatten(info['tree_structure'], nodes_of) for info in dump['tree_info'][:rounds]]
+
+def prune(tree, tolerance=0.0, max_depth=None):
+    """Shrink a tree: cut it at `max_depth` and merge sibling leaves whose
+    outputs differ by at most `tolerance`, bottom-up.
+
+    A node that becomes a leaf takes the weighted mean output of the leaves
+    below it. Returns a renumbered tree.
+    """
+    left, right, value, weight = (list(tree[key]) for key in ('left', 'right', 'value', 'weight'))
+    order, depth = [], {0: 0}
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if left[node] >= 0:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+            stack.extend((left[node], right[node]))
+    for node in reversed(order):
+        l, r = left[node], right[node]
+        if l < 0:
+            continue
+        total = weight[l] + weight[r]
+        value[node] = (value[l] * weight[l] + value[r] * weight[r]) / total if total else value[l]
+        if (max_depth is not None and depth[node] >= max_depth) or \
+                (left[l] < 0 and left[r] < 0 and abs(value[l] - value[r]) <= tolerance):
+            left[node] = right[node] = -1
+
+    # Keep only the nodes still reachable from the root
+    mapping = {}
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        mapping[node] = len(mapping)
+        if left[node] >= 0:
+            stack.extend((right[node], left[node]))
+    kept = sorted(mapping, key=mapping.get)
+    return {
+        'feature': [tree['feature'][n] for n in kept],
+        'threshold': [tree['threshold'][n] for n in kept],
+        'left': [mapping[left[n]] if left[n] >= 0 else -1 for n in kept],
+        'right': [mapping[right[n]] if right[n] >= 0 else -1 for n in kept],
+        'value': [value[n] for n in kept],
+        'weight': [weight[n] for n in kept],
+    }
+
+def tree_depth(tree):
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        if tree['left'][node] >= 0:
+            stack.extend(((tree['left'][node], level + 1), (tree['right'][node], level + 1)))
+    return depth
+
+def export_arrays(model, scaler, prune_tolerance=0.0, max_depth=None):
+    """Flatten a fitted model and its StandardScaler into the compact_model arrays."""
+    name = type(model).__name__
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary classifiers can be exported")
+    base = 0.0
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        trees, aggregate = sklearn_trees(model), 'mean'
+    elif name == 'XGBClassifier':
+        (trees, base), aggregate = xgboost_trees(model), 'logit'
+    elif name == 'LGBMClassifier':
+        trees, aggregate = lightgbm_trees(model), 'logit'
+    else:
+        raise ValueError(f"Compact export is not supported for {name}")
+    if prune_tolerance > 0 or max_depth is not None:
+        trees = [prune(tree, prune_tolerance, max_depth) for tree in trees]
+
+    roots, offset = [], 0
+    columns = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'value')}
+    for tree in trees:
+        roots.append(offset)
+        n = len(tree['value'])
+        leaf = np.asarray(tree['left']) < 0
+        own = np.arange(offset, offset + n)
+        columns['feature'].append(np.where(leaf, 0, tree['feature']))
+        columns['threshold'].append(np.where(leaf, 0.0, tree['threshold']))
+        # Leaves point to themselves so that every tree can be walked a fixed number of steps
+        columns['left'].append(np.where(leaf, own, np.asarray(tree['left']) + offset))
+        columns['right'].append(np.where(leaf, own, np.asarray(tree['right']) + offset))
+        columns['value'].append(tree['value'])
+        offset += n
+
+    return {
+        'format_version': np.array(FORMAT_VERSION),
+        'model_class': np.array(name),
+        'aggregate': np.array(aggregate),
+        'base': np.array(base),
+        'classes': np.asarray(model.classes_),
+        'mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'feature': np.concatenate(columns['feature']).astype(np.int32),
+        'threshold': float32_at_most(np.concatenate(columns['threshold'])),
+        'left': np.concatenate(columns['left']).astype(np.int32),
+        'right': np.concatenate(columns['right']).astype(np.int32),
+        'value': np.concatenate(columns['value']).astype(np.float32),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'depth': np.array(max(tree_depth(tree) for tree in trees)),
+    }
+
+def export_model(model, scaler, path, prune_tolerance=0.0, max_depth=None):
+    """Write the compact .npz atomically; returns (number of nodes, file size in bytes)."""
+    arrays = export_arrays(model, scaler, prune_tolerance, max_depth)
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.npz')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return len(arrays['value']), os.path.getsize(path)
+
+def main(output=None, prune_tolerance=0.0, max_depth=None, store_dir=model_store.STORE_DIR):
+    version = model_store.current_version(store_dir)
+    if version:
+        # Exported next to the version it was built from, where app.py looks for it
+        model, scaler, _ = model_store.load_version(version, store_dir)
+        output = output or os.path.join(store_dir, version, 'compact.npz')
+    else:
+        model, scaler = joblib.load('models/best_model.pkl'), joblib.load('models/scaler.pkl')
+        output = output or 'models/model.npz'
+    nodes, size = export_model(model, scaler, output, prune_tolerance, max_depth)
+    print(f"✅ {type(model).__name__} exported to {output}: {nodes} nodes, {size / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the served model to the compact NumPy format.")
+    parser.add_argument('--output', default=None, help="output .npz (default: next to the served model)")
+    parser.add_argument('--prune', type=float, default=0.0,
+                        help="merge sibling leaves whose outputs differ by at most this much")
+    parser.add_argument('--max-depth', type=int, default=None, help="cut every tree at this depth")
+    args = parser.parse_args()
+    main(args.output, args.prune, args.max_depth)
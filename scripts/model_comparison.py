@@ -1,50 +1,150 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
 import warnings
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
 from xgboost import XGBClassifier  # Import XGBoost
 from lightgbm import LGBMClassifier  # Import LightGBM
-from sklearn.model_selection import cross_val_score, train_test_split
+from sklearn.base import clone
+from sklearn.model_selection import check_cv, train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score
 import pandas as pd
 import joblib
 import numpy as np
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_store
+from dataset import load_dataset
+from scripts.balance_data import balanced_weights
 
 # Suppress warnings globally
 warnings.filterwarnings('ignore')
 
-def main():
-    # Load balanced dataset
-    data = pd.read_csv('data/heart_failure_balanced.csv')
+def candidate_models(tuned=None):
+    # Models to compare; `tuned` maps a model name to the parameters found by
+    # scripts/tune_models.py, which override the defaults
+    tuned = tuned or {}
+    return {
+        'RandomForest': RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42,
+                                                  **tuned.get('RandomForest', {})}),
+        'LogisticRegression': LogisticRegression(max_iter=1000, random_state=42),
+        'SVM': SVC(probability=True, random_state=42),
+        'XGBoost': XGBClassifier(**{'use_label_encoder': False, 'eval_metric': "logloss", 'random_state': 42,
+                                    **tuned.get('XGBoost', {})}),
+        'LightGBM': LGBMClassifier(**{'random_state': 42, 'verbose': -1, **tuned.get('LightGBM', {})})
+    }
+
+def fit_job(name, model, fold, X, y, train_idx, val_idx, threads, sample_weight=None):
+    """Fit and score one (model, fold) job in a worker process.
+
+    Native thread pools (OpenMP/BLAS) and the estimator's own n_jobs are
+    capped at `threads` to avoid oversubscription; the returned estimator
+    gets its original n_jobs back, so a saved model does not keep the cap.
+    """
+    start = time.time()
+    with threadpool_limits(limits=threads):
+        estimator = clone(model)
+        params = estimator.get_params()
+        if 'n_jobs' in params:
+            estimator.set_params(n_jobs=threads)
+        if sample_weight is None:
+            estimator.fit(X[train_idx], y[train_idx])
+        else:
+            estimator.fit(X[train_idx], y[train_idx], sample_weight=sample_weight[train_idx])
+        score = accuracy_score(y[val_idx], estimator.predict(X[val_idx]))
+        if 'n_jobs' in params:
+            estimator.set_params(n_jobs=params['n_jobs'])
+    end = time.time()
+    return name, fold, score, start, end, estimator
+
+def compare_models(models, X, y, cv=5, n_jobs=None, sample_weight=None):
+    """Cross-validate every model in parallel over (model, fold) jobs.
+
+    The training matrix is dumped once and memory-mapped read-only into the
+    worker processes. Nothing is refitted afterwards: the winner (best mean
+    fold score) is returned as its best-scoring fold model, fitted on
+    (cv - 1) / cv of the rows. A fold ensemble would change the model's
+    class, which the explainers and the compact export dispatch on.
+    `sample_weight`, if given, weights the training rows of every fit.
+
+    Returns ({name: fold scores}, {winner name: fitted model}, {name: (fit seconds, wall seconds)}).
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // n_jobs)
+    y = np.asarray(y)
+    cv = check_cv(cv, y, classifier=True)
+    folds = list(cv.split(X, y))
+
+    tmp_dir = tempfile.mkdtemp(prefix='model-comparison-')
+    try:
+        data_path = os.path.join(tmp_dir, 'train.joblib')
+        joblib.dump((np.asarray(X), y, sample_weight), data_path)
+        X_shared, y_shared, weight_shared = joblib.load(data_path, mmap_mode='r')
+
+        jobs = [(name, model, fold, train_idx, val_idx)
+                for name, model in models.items()
+                for fold, (train_idx, val_idx) in enumerate(folds)]
+        results = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(fit_job)(name, model, fold, X_shared, y_shared, train_idx, val_idx, threads, weight_shared)
+            for name, model, fold, train_idx, val_idx in jobs
+        )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    scores = {name: np.zeros(len(folds)) for name in models}
+    estimators = {}
+    spans = {}
+    for name, fold, score, start, end, estimator in results:
+        scores[name][fold] = score
+        estimators[name, fold] = estimator
+        fit_time, first, last = spans.get(name, (0.0, start, end))
+        spans[name] = (fit_time + end - start, min(first, start), max(last, end))
+    timings = {name: (fit_time, last - first) for name, (fit_time, first, last) in spans.items()}
+
+    # First best on ties, like the selection in run_comparison()
+    winner = max(models, key=lambda name: np.mean(scores[name]))
+    fitted = {winner: estimators[winner, int(np.argmax(scores[winner]))]}
+    return scores, fitted, timings
+
+def run_comparison(data, n_jobs=None, cv=5, test_size=0.2, random_state=42, tuned=None, weighted=False):
+    """Compare the candidates on a balanced dataset and evaluate the winner.
+
+    With weighted=True the data is used as is and the classes are balanced
+    with per-row sample weights instead of resampled rows.
+
+    Returns (best_model, scaler, model_scores, test_accuracy).
+    """
     X = data.drop('DEATH_EVENT', axis=1)
-    y = data['DEATH_EVENT']
+    y = data['DEATH_EVENT'].astype(int)  # 0/1 labels even when the flag is stored as bool
 
     # Split data into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
 
     # Scale the features
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
 
-    # Initialize models to compare
-    models = {
-        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
-        'LogisticRegression': LogisticRegression(max_iter=1000, random_state=42),
-        'SVM': SVC(probability=True, random_state=42),
-        'XGBoost': XGBClassifier(use_label_encoder=False, eval_metric="logloss", random_state=42),
-        'LightGBM': LGBMClassifier(random_state=42, verbose=-1)
-    }
+    # Compare models: every (model, fold) job runs in a process pool
+    start = time.perf_counter()
+    sample_weight = balanced_weights(y_train) if weighted else None
+    cv_scores, fitted_models, timings = compare_models(candidate_models(tuned), X_train_scaled, y_train,
+                                                       cv=cv, n_jobs=n_jobs, sample_weight=sample_weight)
+    elapsed = time.perf_counter() - start
 
-    # Compare models
     best_model = None
     best_score = 0
     model_scores = {}
 
-    for name, model in models.items():
-        # Perform cross-validation on the training set
-        scores = cross_val_score(model, X_train_scaled, y_train, cv=5, scoring='accuracy')
+    for name, scores in cv_scores.items():
         mean_score = np.mean(scores)
         model_scores[name] = mean_score
 
@@ -54,10 +154,12 @@ def main():
         # Track the best model
         if mean_score > best_score:
             best_score = mean_score
-            best_model = model
+            best_model = fitted_models[name]
 
-    # Train the best model on the training set
-    best_model.fit(X_train_scaled, y_train)
+    print("\nTraining time per candidate (fit = summed job time, wall = first start to last end):")
+    for name, (fit_time, wall_time) in timings.items():
+        print(f"{name:<20} fit {fit_time:7.2f} s   wall {wall_time:7.2f} s")
+    print(f"Total comparison wall-clock: {elapsed:.2f} s")
 
     # Evaluate the best model on the test set
     y_pred = best_model.predict(X_test_scaled)
@@ -76,11 +178,42 @@ def main():
         print("\nFeature Importances:")
         print(importance_df)
 
+    return best_model, scaler, model_scores, test_accuracy
+
+def save_artifacts(best_model, scaler, model_scores, test_accuracy):
     # Save the best model and scaler
     joblib.dump(best_model, 'models/best_model.pkl')
     joblib.dump(scaler, 'models/scaler.pkl')
 
-    print("\n✅ Best model and scaler saved!")
+    # Publish the pair as a new version; running apps with a model watcher
+    # (or POST /admin/reload) swap it in without a restart
+    version = model_store.save_version(best_model, scaler, {
+        'cv_scores': model_scores,
+        'test_accuracy': test_accuracy,
+    })
+
+    print(f"\n✅ Best model and scaler saved! (model store version {version})")
+    return version
+
+def main(n_jobs=None, cv=5, tuned_path=None, weighted=False):
+    # Load balanced dataset, or the unbalanced one when balancing with weights
+    data = load_dataset('data/heart_failure_optimized.csv' if weighted else 'data/heart_failure_balanced.csv')
+    tuned = None
+    if tuned_path:
+        from scripts.tune_models import best_params
+        tuned = best_params(tuned_path)
+        print(f"Using tuned parameters for: {', '.join(tuned) or 'none'}")
+    best_model, scaler, model_scores, test_accuracy = run_comparison(data, n_jobs=n_jobs, cv=cv, tuned=tuned,
+                                                                     weighted=weighted)
+    save_artifacts(best_model, scaler, model_scores, test_accuracy)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Compare candidate models with parallel cross-validation.")
+    parser.add_argument('--n-jobs', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--cv', type=int, default=5, help="number of cross-validation folds")
+    parser.add_argument('--tuned', nargs='?', const="models/tuning.json", default=None,
+                        help="use the best parameters saved by scripts/tune_models.py")
+    parser.add_argument('--weighted', action='store_true',
+                        help="train on the unbalanced data with balanced sample weights")
+    args = parser.parse_args()
+    main(n_jobs=args.n_jobs, cv=args.cv, tuned_path=args.tuned, weighted=args.weighted)
\ No newline at end of file
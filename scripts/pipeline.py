@@ -0,0 +1,184 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+import joblib
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts import balance_data, data_processing, model_comparison
+from dataset import save_dataset
+
+warnings.filterwarnings('ignore')
+
+# Stage outputs are cached here as joblib files named after the stage key;
+# only the CACHE_KEEP most recently used outputs of each stage are kept
+CACHE_DIR = ".cache/pipeline"
+CACHE_KEEP = 3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_files(paths, root=ROOT):
+    """`paths` plus every module under `root` they import, transitively.
+
+    Imports are read from the source (also those inside functions), so an
+    edit to a helper such as dataset.py changes the key of every stage that
+    uses it.
+    """
+    found = []
+    pending = [os.path.abspath(path) for path in paths]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # `from scripts import balance_data` imports a module too
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for name in names:
+                module = os.path.join(root, *name.split(".")) + ".py"
+                if os.path.isfile(module):
+                    pending.append(module)
+    return sorted(found)
+
+class StageResult:
+    """Key of a stage output plus a lazy, memoized loader for its value."""
+
+    def __init__(self, key, load):
+        self.key = key
+        self._load = load
+        self._value = None
+        self._loaded = False
+
+    @property
+    def value(self):
+        if not self._loaded:
+            self._value = self._load()
+            self._loaded = True
+        return self._value
+
+class Pipeline:
+    """Runs stages whose key (code, parameters and input keys) is not cached yet.
+
+    A stage is skipped when an output for its key already exists; its value
+    is only read back from the binary cache if a downstream stage needs it.
+    The code of a stage is its files and the project modules they import.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, force=(), keep=CACHE_KEEP):
+        self.cache_dir = cache_dir
+        self.force = set(force)
+        self.keep = keep
+        self.ran = []
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def source(self, path):
+        key = file_hash(path)
+        return StageResult(key, lambda: pd.read_csv(path))
+
+    def stage(self, name, fn, inputs, params, code):
+        key = hashlib.sha256(json.dumps({
+            'stage': name,
+            'params': params,
+            'inputs': [result.key for result in inputs],
+            'code': [file_hash(path) for path in code_files(code)],
+        }, sort_keys=True).encode()).hexdigest()
+        path = os.path.join(self.cache_dir, f"{name}-{key[:16]}.joblib")
+
+        if os.path.exists(path) and name not in self.force:
+            # Mark it as recently used, so prune() keeps it
+            os.utime(path)
+            print(f"⏭️  {name}: up to date ({key[:12]})")
+            return StageResult(key, lambda: joblib.load(path))
+
+        start = time.perf_counter()
+        value = fn(*[result.value for result in inputs], **params)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+        os.close(fd)
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+        self.prune(name)
+        self.ran.append(name)
+        print(f"✅ {name}: ran in {time.perf_counter() - start:.2f} s ({key[:12]})")
+
+        return StageResult(key, lambda: value)
+
+    def prune(self, name):
+        """Delete all but the `keep` most recently used outputs of a stage."""
+        outputs = [os.path.join(self.cache_dir, entry) for entry in os.listdir(self.cache_dir)
+                   if entry.startswith(f"{name}-") and entry.endswith(".joblib")]
+        outputs.sort(key=os.path.getmtime, reverse=True)
+        for path in outputs[self.keep:]:
+            os.remove(path)
+
+def train(data, test_size, random_state, cv, n_jobs=None):
+    best_model, scaler, model_scores, test_accuracy = model_comparison.run_comparison(
+        data, n_jobs=n_jobs, cv=cv, test_size=test_size, random_state=random_state)
+    return {'model': best_model, 'scaler': scaler, 'scores': model_scores, 'test_accuracy': test_accuracy}
+
+def run_pipeline(raw_path="data/heart_failure.csv", balance_seed=42, test_size=0.2, split_seed=42,
+                 cv=5, n_jobs=None, cache_dir=CACHE_DIR, force=(), export_csv=False, publish=False):
+    """Raw CSV -> optimized -> balanced -> trained model, re-running only stale stages."""
+    pipeline = Pipeline(cache_dir, force)
+    raw = pipeline.source(raw_path)
+    optimized = pipeline.stage('optimize', data_processing.optimize_memory, [raw], {},
+                               code=[data_processing.__file__])
+    balanced = pipeline.stage('balance', balance_data.balance, [optimized],
+                              {'random_state': balance_seed}, code=[balance_data.__file__])
+    trained = pipeline.stage('train', lambda data, **params: train(data, n_jobs=n_jobs, **params), [balanced],
+                             {'test_size': test_size, 'random_state': split_seed, 'cv': cv},
+                             code=[model_comparison.__file__])
+
+    if export_csv:
+        save_dataset(optimized.value, "data/heart_failure_optimized.csv")
+        save_dataset(balanced.value, "data/heart_failure_balanced.csv")
+        print("✅ Exported the optimized and balanced datasets (column store and CSV)")
+
+    if 'train' in pipeline.ran or publish:
+        result = trained.value
+        model_comparison.save_artifacts(result['model'], result['scaler'],
+                                        result['scores'], result['test_accuracy'])
+    return pipeline.ran
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the cached training pipeline.")
+    parser.add_argument('--raw', default="data/heart_failure.csv", help="raw dataset CSV")
+    parser.add_argument('--balance-seed', type=int, default=42)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--split-seed', type=int, default=42)
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=None, help="worker processes for model comparison")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--force', nargs='*', default=[], choices=['optimize', 'balance', 'train'],
+                        help="stages to re-run even if cached")
+    parser.add_argument('--export-csv', action='store_true', help="also write the intermediate datasets")
+    parser.add_argument('--publish', action='store_true', help="save the model artifacts even if training was cached")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ran = run_pipeline(args.raw, args.balance_seed, args.test_size, args.split_seed, args.cv, args.n_jobs,
+                       args.cache_dir, args.force, args.export_csv, args.publish)
+    print(f"\n✅ Pipeline finished in {time.perf_counter() - start:.2f} s "
+          f"({', '.join(ran) if ran else 'nothing to do'})")
+
+if __name__ == "__main__":
+    main()
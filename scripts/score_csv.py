@@ -0,0 +1,153 @@
+import argparse
+import os
+import resource
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from feature_schema import FEATURES, SCHEMA
+from inference import load_predictor
+
+warnings.filterwarnings('ignore')
+
+# Predictor of the current (worker) process
+_predictor = None
+
+def init_worker(model_path, scaler_path):
+    global _predictor
+    _predictor = load_predictor(model_path, scaler_path)
+
+def score_chunk(start, chunk, keep_columns=False):
+    """Validate and score one chunk; rows with errors get no prediction."""
+    validation = SCHEMA.validate_frame(chunk)
+    prediction = np.full(len(chunk), -1, dtype=np.int8)
+    probability = np.full(len(chunk), np.nan, dtype=np.float32)
+    valid = validation.valid
+    if valid.any():
+        labels, probabilities = _predictor.predict_risk(validation.X[valid])
+        prediction[valid] = labels
+        probability[valid] = probabilities
+
+    errors = [""] * len(chunk)
+    for row, row_errors in validation.errors.items():
+        errors[row] = "; ".join(f"{feature}: {message}" for feature, message in row_errors.items())
+
+    # reindex: a missing input column is reported by validation, not a KeyError
+    output = chunk.reindex(columns=FEATURES).reset_index(drop=True) if keep_columns else pd.DataFrame()
+    output.insert(0, 'row', np.arange(start, start + len(chunk)))
+    output['prediction'] = prediction
+    output['probability'] = probability
+    output['errors'] = errors
+    return output
+
+class CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.header = True
+
+    def write(self, df):
+        df.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+class ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise SystemExit("❌ Parquet output requires pyarrow (pip install pyarrow)")
+        self.pa = pyarrow
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def read_chunks(input_path, chunksize):
+    start = 0
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        yield start, chunk
+        start += len(chunk)
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return own / 2**20, children / 2**20
+
+def score_file(input_path, output_path, chunksize=100000, workers=1, output_format=None,
+               keep_columns=False, model_path="models/best_model.pkl", scaler_path="models/scaler.pkl"):
+    """Stream input_path through the model chunk by chunk into output_path.
+
+    At most 2 * workers chunks are in flight, so memory stays flat however
+    large the input is. Returns (rows scored, valid rows).
+    """
+    output_format = output_format or ('parquet' if output_path.endswith('.parquet') else 'csv')
+    writer = ParquetWriter(output_path) if output_format == 'parquet' else CsvWriter(output_path)
+    rows = valid = 0
+
+    def write(output):
+        nonlocal rows, valid
+        writer.write(output)
+        rows += len(output)
+        valid += int((output['prediction'] >= 0).sum())
+
+    try:
+        if workers <= 1:
+            init_worker(model_path, scaler_path)
+            for start, chunk in read_chunks(input_path, chunksize):
+                write(score_chunk(start, chunk, keep_columns))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=(model_path, scaler_path)) as pool:
+                pending = deque()
+                for start, chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(score_chunk, start, chunk, keep_columns))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        writer.close()
+    return rows, valid
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV file in the data/heart_failure.csv layout.")
+    parser.add_argument('input', help="input CSV file")
+    parser.add_argument('output', help="output file (.csv or .parquet)")
+    parser.add_argument('--chunksize', type=int, default=100000, help="rows per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="number of scoring processes")
+    parser.add_argument('--format', choices=['csv', 'parquet'], help="output format (default: from extension)")
+    parser.add_argument('--keep-columns', action='store_true', help="copy the input features to the output")
+    parser.add_argument('--model', default="models/best_model.pkl")
+    parser.add_argument('--scaler', default="models/scaler.pkl")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows, valid = score_file(args.input, args.output, args.chunksize, args.workers, args.format,
+                             args.keep_columns, args.model, args.scaler)
+    elapsed = time.perf_counter() - start
+
+    own_rss, children_rss = peak_rss_mb()
+    print(f"✅ Scored {rows} rows ({rows - valid} with validation errors) into {args.output}")
+    print(f"Elapsed: {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s)")
+    print(f"Peak RSS: {own_rss:.0f} MB" + (f" (largest worker: {children_rss:.0f} MB)" if args.workers > 1 else ""))
+
+if __name__ == "__main__":
+    main()
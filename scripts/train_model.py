@@ -1,4 +1,5 @@
-import pandas as pd
+import os
+import sys
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -7,11 +8,14 @@ from lightgbm import LGBMClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import load_dataset
+
 def train_model():
     # Load dataset
-    df = pd.read_csv("data/heart_failure_balanced.csv")
+    df = load_dataset("data/heart_failure_balanced.csv")
     X = df.drop(columns=["DEATH_EVENT"])
-    y = df["DEATH_EVENT"]
+    y = df["DEATH_EVENT"].astype(int)
 
     # Split data into train and test sets
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
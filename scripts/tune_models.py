@@ -0,0 +1,248 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import warnings
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+from lightgbm import LGBMClassifier, early_stopping
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import load_dataset
+
+warnings.filterwarnings('ignore')
+
+# Best configurations found so far, used to warm-start the next search
+RESULTS_PATH = "models/tuning.json"
+
+# Number of configurations kept per model in the results file
+KEEP_BEST = 5
+
+# Boosted models train up to MAX_BOOST_ROUNDS trees and stop once the held-out
+# log loss has not improved for EARLY_STOPPING_ROUNDS rounds
+MAX_BOOST_ROUNDS = 1000
+EARLY_STOPPING_ROUNDS = 20
+
+# Smallest number of training rows per cross-validation fold in the first rung
+MIN_ROWS_PER_FOLD = 20
+
+SEARCH_SPACES = {
+    'RandomForest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [None, 4, 6, 8, 12],
+        'min_samples_leaf': [1, 2, 4, 8],
+        'max_features': ['sqrt', 'log2', 0.5, None],
+    },
+    'XGBoost': {
+        'max_depth': [2, 3, 4, 6, 8],
+        'learning_rate': [0.01, 0.03, 0.1, 0.3],
+        'subsample': [0.6, 0.8, 1.0],
+        'colsample_bytree': [0.6, 0.8, 1.0],
+        'min_child_weight': [1, 3, 5],
+    },
+    'LightGBM': {
+        'num_leaves': [7, 15, 31, 63],
+        'learning_rate': [0.01, 0.03, 0.1, 0.3],
+        'min_child_samples': [5, 10, 20, 40],
+        'subsample': [0.6, 0.8, 1.0],
+        'colsample_bytree': [0.6, 0.8, 1.0],
+    },
+}
+
+BOOSTED = {'XGBoost', 'LightGBM'}
+
+def make_model(name, params, n_jobs=1):
+    if name == 'RandomForest':
+        return RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params)
+    if name == 'XGBoost':
+        return XGBClassifier(eval_metric="logloss", n_estimators=MAX_BOOST_ROUNDS,
+                             early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                             random_state=42, n_jobs=n_jobs, **params)
+    if name == 'LightGBM':
+        # bagging only takes effect with a non-zero subsample_freq
+        return LGBMClassifier(n_estimators=MAX_BOOST_ROUNDS, subsample_freq=1,
+                              random_state=42, verbose=-1, n_jobs=n_jobs, **params)
+    raise ValueError(f"Unknown model: {name}")
+
+def evaluate(name, params, X, y, cv=5, n_jobs=1):
+    """Cross-validated accuracy of one configuration.
+
+    Boosted models early-stop on a slice of each training fold (never on the
+    fold they are scored on). Returns (mean accuracy, mean number of boosting
+    rounds kept, or None for RandomForest).
+    """
+    scores = []
+    rounds = []
+    for train_idx, val_idx in StratifiedKFold(n_splits=cv, shuffle=True, random_state=42).split(X, y):
+        model = make_model(name, params, n_jobs)
+        if name in BOOSTED:
+            fit_idx, stop_idx = train_test_split(train_idx, test_size=0.2, stratify=y[train_idx], random_state=42)
+            eval_set = [(X[stop_idx], y[stop_idx])]
+            if name == 'XGBoost':
+                model.fit(X[fit_idx], y[fit_idx], eval_set=eval_set, verbose=False)
+                rounds.append(model.best_iteration + 1)
+            else:
+                model.fit(X[fit_idx], y[fit_idx], eval_set=eval_set,
+                          callbacks=[early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)])
+                rounds.append(model.best_iteration_ or MAX_BOOST_ROUNDS)
+        else:
+            model.fit(X[train_idx], y[train_idx])
+        scores.append(accuracy_score(y[val_idx], model.predict(X[val_idx])))
+    return float(np.mean(scores)), int(round(np.mean(rounds))) if rounds else None
+
+def sample_configs(name, n, rng, seen=()):
+    space = SEARCH_SPACES[name]
+    configs = []
+    keys = {json.dumps(params, sort_keys=True) for params in seen}
+    # A bounded number of draws: small spaces may run out of new configurations
+    for _ in range(n * 20):
+        if len(configs) >= n:
+            break
+        params = {key: values[rng.integers(len(values))] for key, values in space.items()}
+        params = {key: value.item() if hasattr(value, 'item') else value for key, value in params.items()}
+        key = json.dumps(params, sort_keys=True)
+        if key not in keys:
+            keys.add(key)
+            configs.append(params)
+    return configs
+
+def successive_halving(name, X, y, candidates, eta=3, cv=5, deadline=None, n_jobs=1):
+    """Race the candidates on growing row subsets, keeping the best 1/eta each rung.
+
+    The first rung uses about len(y) / eta**rungs rows; survivors are re-run
+    on eta times more rows until the full training set is reached. Stops
+    early, keeping what was evaluated so far, once `deadline` (a
+    time.monotonic() value) has passed.
+    Returns the list of trials as dicts (params, rows, score, n_estimators).
+    """
+    n_rows = len(y)
+    rungs = max(1, math.ceil(math.log(max(len(candidates), 2), eta)))
+    rows = min(n_rows, max(n_rows // eta ** rungs, cv * MIN_ROWS_PER_FOLD))
+    # One fixed stratified ordering, so every rung is a superset of the previous one
+    permutation = np.random.RandomState(42).permutation(n_rows)
+    position = np.empty(n_rows)
+    for label in np.unique(y):
+        members = permutation[y[permutation] == label]
+        position[members] = np.arange(len(members)) / len(members)
+    order = np.argsort(position, kind='stable')
+
+    trials = []
+    while candidates:
+        subset = order[:rows]
+        rung = []
+        for params in candidates:
+            if deadline is not None and time.monotonic() > deadline:
+                print(f"⏱️  {name}: budget exhausted after {len(trials)} trials")
+                return trials
+            score, n_estimators = evaluate(name, params, X[subset], y[subset], cv, n_jobs)
+            trial = {'params': params, 'rows': int(rows), 'score': score, 'n_estimators': n_estimators}
+            rung.append(trial)
+            trials.append(trial)
+        print(f"{name}: {len(rung)} configs on {rows} rows, best accuracy {max(t['score'] for t in rung):.3f}")
+
+        if rows >= n_rows:
+            break
+        rung.sort(key=lambda trial: trial['score'], reverse=True)
+        candidates = [trial['params'] for trial in rung[:max(1, len(rung) // eta)]]
+        rows = n_rows if len(candidates) == 1 else min(n_rows, rows * eta)
+    return trials
+
+def final_params(name, trial):
+    """Constructor parameters of a finished trial (boosted: rounds found by early stopping)."""
+    params = dict(trial['params'])
+    if name in BOOSTED:
+        params['n_estimators'] = trial['n_estimators']
+    if name == 'LightGBM':
+        params['subsample_freq'] = 1
+    return params
+
+def load_results(path=RESULTS_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'models': {}}
+
+def save_results(results, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, path)
+
+def best_params(path=RESULTS_PATH):
+    """{model name: constructor parameters} of the best configuration found per model."""
+    results = load_results(path)
+    return {name: entries[0]['final_params'] for name, entries in results['models'].items() if entries}
+
+def tune(X, y, models=tuple(SEARCH_SPACES), n_candidates=27, eta=3, cv=5, budget=300,
+         results_path=RESULTS_PATH, warm_start=True, n_jobs=1, random_state=None):
+    """Successive-halving search per model within a shared wall-clock budget (seconds).
+
+    The best configurations of previous runs are raced first, then new random
+    ones. Full-data results are merged into `results_path`.
+    Returns {name: best entry of this run}.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    rng = np.random.default_rng(random_state)
+    deadline = time.monotonic() + budget
+    results = load_results(results_path)
+    best = {}
+
+    for name in models:
+        previous = results['models'].get(name, [])
+        warm = [entry['params'] for entry in previous[:KEEP_BEST]] if warm_start else []
+        candidates = warm + sample_configs(name, max(0, n_candidates - len(warm)), rng, seen=warm)
+        print(f"\n🔎 {name}: {len(candidates)} candidates ({len(warm)} warm-started)")
+
+        trials = successive_halving(name, X, y, candidates, eta, cv, deadline, n_jobs)
+        finished = [trial for trial in trials if trial['rows'] == len(y)]
+        if not finished:
+            print(f"⚠️  {name}: no configuration reached the full training set")
+            continue
+
+        entries = {json.dumps(entry['params'], sort_keys=True): entry for entry in previous}
+        for trial in finished:
+            entries[json.dumps(trial['params'], sort_keys=True)] = dict(
+                trial, final_params=final_params(name, trial), tuned_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        ranked = sorted(entries.values(), key=lambda entry: entry['score'], reverse=True)
+        results['models'][name] = ranked[:KEEP_BEST]
+        best[name] = max(finished, key=lambda trial: trial['score'])
+        print(f"✅ {name}: best accuracy {best[name]['score']:.3f} with {final_params(name, best[name])}")
+
+    save_results(results, results_path)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the tree models with successive halving.")
+    parser.add_argument('--budget', type=float, default=300, help="wall-clock budget in seconds")
+    parser.add_argument('--candidates', type=int, default=27, help="configurations per model in the first rung")
+    parser.add_argument('--eta', type=int, default=3, help="keep 1/eta of the configurations per rung")
+    parser.add_argument('--cv', type=int, default=5, help="number of cross-validation folds")
+    parser.add_argument('--models', nargs='*', default=list(SEARCH_SPACES), choices=list(SEARCH_SPACES))
+    parser.add_argument('--results', default=RESULTS_PATH, help="results file used to warm-start")
+    parser.add_argument('--no-warm-start', action='store_true', help="ignore previous results")
+    parser.add_argument('--n-jobs', type=int, default=1, help="threads per model fit")
+    args = parser.parse_args()
+
+    # Tune on the same training split model_comparison.py uses, never on its test set
+    data = load_dataset('data/heart_failure_balanced.csv')
+    X = data.drop('DEATH_EVENT', axis=1)
+    y = data['DEATH_EVENT'].astype(int)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    start = time.perf_counter()
+    tune(X_train, y_train, args.models, args.candidates, args.eta, args.cv, args.budget,
+         args.results, not args.no_warm_start, args.n_jobs)
+    print(f"\n✅ Tuning finished in {time.perf_counter() - start:.2f} s, results saved to {args.results}")
+    print("Use them with: python scripts/model_comparison.py --tuned " + args.results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import copy
+import os
+import sys
+import time
+import warnings
+import joblib
+import numpy as np
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import model_store
+from dataset import load_dataset
+from feature_schema import FEATURES, SCHEMA
+
+warnings.filterwarnings('ignore')
+
+MODEL_PATH = "models/best_model.pkl"
+SCALER_PATH = "models/scaler.pkl"
+
+def load_current(store_dir=model_store.STORE_DIR):
+    """(model, scaler, version) currently served: the store's CURRENT version, else the legacy files."""
+    if model_store.current_version(store_dir):
+        model, scaler, metadata = model_store.load_version(store_dir=store_dir)
+        return model, scaler, metadata['version']
+    return joblib.load(MODEL_PATH), joblib.load(SCALER_PATH), None
+
+def update_model(model, scaler, X_new, y_new, trees=None, rounds=20):
+    """Extend a fitted model with new labelled rows, without revisiting the old data.
+
+    RandomForest/ExtraTrees grow `trees` extra trees (default: 10% more)
+    fitted on the new rows through warm_start; XGBoost and LightGBM boost
+    `rounds` more rounds starting from the current booster. The scaler is
+    kept frozen: every existing split and coefficient is expressed in its
+    scaled space, so moving its mean/scale would silently shift them all.
+    Returns (updated copy of the model, {'method': ..., 'added': ...}).
+    """
+    y_new = np.asarray(y_new).astype(int)
+    if len(np.unique(y_new)) < len(model.classes_):
+        raise ValueError("The new rows must contain every class the model was trained on")
+    X_scaled = scaler.transform(np.asarray(X_new, dtype=np.float64))
+    name = type(model).__name__
+
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        updated = copy.deepcopy(model)
+        added = trees or max(1, len(model.estimators_) // 10)
+        updated.set_params(warm_start=True, n_estimators=len(model.estimators_) + added)
+        # Only the new trees are fitted, on the new rows only
+        updated.fit(X_scaled, y_new)
+        updated.set_params(warm_start=False)
+        return updated, {'method': 'warm_start', 'added': added}
+
+    if name == 'XGBClassifier':
+        updated = copy.deepcopy(model)
+        updated.set_params(n_estimators=rounds)
+        updated.fit(X_scaled, y_new, xgb_model=model.get_booster(), verbose=False)
+        return updated, {'method': 'continued_boosting', 'added': rounds}
+
+    if name == 'LGBMClassifier':
+        updated = copy.deepcopy(model)
+        updated.set_params(n_estimators=rounds)
+        updated.fit(X_scaled, y_new, init_model=model.booster_)
+        return updated, {'method': 'continued_boosting', 'added': rounds}
+
+    raise ValueError(f"Incremental update is not supported for {name}; "
+                     "retrain with scripts/model_comparison.py")
+
+def scaler_drift(scaler, X_new):
+    """Shift of the new rows' feature means, in units of the frozen scaler's std."""
+    drift = (np.asarray(X_new, dtype=np.float64).mean(axis=0) - scaler.mean_) / scaler.scale_
+    return {feature: round(float(value), 3) for feature, value in zip(FEATURES, drift)}
+
+def save_update(model, scaler, metadata, store_dir=model_store.STORE_DIR):
+    # Same artifacts as a full training run: legacy files plus a new store version
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(scaler, SCALER_PATH)
+    return model_store.save_version(model, scaler, metadata, store_dir=store_dir)
+
+def main(input_path, trees=None, rounds=20, holdout=0.2, store_dir=model_store.STORE_DIR):
+    df = load_dataset(input_path)
+    result = SCHEMA.validate_frame(df)
+    if not result.valid.all():
+        print(f"⚠️  Skipping {int((~result.valid).sum())} invalid rows: "
+              f"{dict(list(result.errors.items())[:5])}")
+    X = result.X[result.valid]
+    y = df['DEATH_EVENT'].to_numpy()[result.valid].astype(int)
+
+    model, scaler, parent = load_current(store_dir)
+    X_fit, y_fit, X_eval, y_eval = X, y, X[:0], y[:0]
+    if holdout:
+        X_fit, X_eval, y_fit, y_eval = train_test_split(X, y, test_size=holdout, stratify=y, random_state=42)
+
+    start = time.perf_counter()
+    updated, info = update_model(model, scaler, X_fit, y_fit, trees=trees, rounds=rounds)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {type(model).__name__} updated with {len(y_fit)} rows in {elapsed:.2f} s "
+          f"({info['method']}, +{info['added']})")
+    before = after = None
+    if len(y_eval):
+        before = accuracy_score(y_eval, model.predict(scaler.transform(X_eval)))
+        after = accuracy_score(y_eval, updated.predict(scaler.transform(X_eval)))
+        print(f"Held-out accuracy on the new rows: {before:.3f} -> {after:.3f}")
+    drift = {feature: value for feature, value in scaler_drift(scaler, X_fit).items() if abs(value) > 0.5}
+    if drift:
+        print(f"⚠️  Feature drift beyond 0.5 std (scaler is frozen, consider a full retrain): {drift}")
+
+    version = save_update(updated, scaler, {
+        'parent_version': parent,
+        'update': dict(info, rows=len(y_fit), seconds=round(elapsed, 3), source=input_path),
+        'holdout_accuracy': {'before': before, 'after': after},
+    }, store_dir)
+    print(f"\n✅ Updated model saved! (model store version {version})")
+    return version
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extend the current model with newly labelled patients.")
+    parser.add_argument('input', help="CSV (or column store) of new rows, features plus DEATH_EVENT")
+    parser.add_argument('--trees', type=int, default=None, help="trees added to a forest (default: 10%% more)")
+    parser.add_argument('--rounds', type=int, default=20, help="boosting rounds added to XGBoost/LightGBM")
+    parser.add_argument('--holdout', type=float, default=0.2, help="share of the new rows kept for evaluation (0 to use them all)")
+    args = parser.parse_args()
+    main(args.input, args.trees, args.rounds, args.holdout)
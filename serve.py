@@ -0,0 +1,171 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import structured_logging
+
+# Production entry point: a preforking HTTP server for app.py.
+#
+# The master process imports the app, loads the model, scaler and explainer
+# and runs one warm-up prediction, then freezes the garbage collector and
+# forks the workers. The model's pages are inherited copy-on-write, so every
+# worker shares one physical copy of them instead of loading its own. All
+# workers accept connections from the same listening socket and answer them
+# on a bounded pool of threads. The master only restarts workers that die.
+#
+#   python serve.py --workers 4 --threads 8 --port 5000
+#
+# `python app.py` remains the single-process debug server for development.
+
+SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+def make_server(app, sock, threads):
+    """Werkzeug WSGI server on an already bound socket, with a fixed thread pool."""
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        multithread = True
+
+        def __init__(self):
+            # Created first: with fd= the base class closes its own socket
+            # through server_close() while initialising
+            self.pool = None
+            host, port = sock.getsockname()[:2]
+            super().__init__(host, port, app, fd=sock.fileno())
+            self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="request")
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self.process_request_thread, request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+        def server_close(self):
+            if self.pool is not None:
+                self.pool.shutdown(wait=True)
+            super().server_close()
+
+    return PooledWSGIServer()
+
+def bind_socket(host, port, backlog=1024):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app_module, sock, threads):
+    """Body of a forked worker; never returns."""
+    server = make_server(app_module.app, sock, threads)
+    # shutdown() waits for serve_forever() to return, so it cannot run in
+    # the signal handler itself (which interrupts serve_forever's thread)
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    # Per-process threads (model watcher) only exist after the fork
+    app_module.warm_up()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    # os._exit() skips atexit, which would write out the queued log records
+    structured_logging.shutdown_logging()
+    os._exit(0)
+
+def serve(host="0.0.0.0", port=5000, workers=None, threads=8, preload=True):
+    workers = workers or os.cpu_count() or 1
+    if not preload:
+        # Every worker imports the app and loads its own model after the fork
+        os.environ["LAZY_STARTUP"] = "1"
+    import app as app_module
+    # Before the fork: every worker restarts the log writer thread it inherits
+    app_module.configure_logging()
+
+    if preload:
+        app_module.warm_models()
+        # Objects that exist now are never scanned by the collector again, so
+        # collections in the workers do not write to (and un-share) their pages
+        gc.collect()
+        gc.freeze()
+
+    sock = bind_socket(host, port)
+    print(f"✅ Serving on http://{host}:{sock.getsockname()[1]} with {workers} workers x {threads} threads "
+          f"({'model preloaded in the master' if preload else 'model loaded by every worker'})", flush=True)
+
+    children = {}
+
+    def spawn():
+        # A signal arriving between the fork and run_worker() would otherwise
+        # run the master's handler in the child; blocked, it stays pending
+        # until the child has its own handlers
+        signal.pthread_sigmask(signal.SIG_BLOCK, SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, SIGNALS)
+                run_worker(app_module, sock, threads)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(1)
+        children[pid] = time.monotonic()
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, SIGNALS)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if not stopping:
+            print(f"⚠️  Worker {pid} exited with status {status}, restarting it", flush=True)
+            # A worker that dies right after starting would otherwise be
+            # restarted in a tight loop
+            if started is not None and time.monotonic() - started < 1:
+                time.sleep(1)
+            if not stopping:
+                spawn()
+    sock.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the app with preforked worker processes.")
+    parser.add_argument('--host', default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument('--port', type=int, default=int(os.environ.get("PORT", "5000")))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get("WEB_WORKERS", "0")) or None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get("WEB_THREADS", "8")),
+                        help="request threads per worker")
+    parser.add_argument('--no-preload', action='store_true',
+                        help="load the model in every worker instead of once in the master")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.threads, preload=not args.no_preload)
+    sys.exit(0)
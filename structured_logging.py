@@ -0,0 +1,143 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Non-blocking structured logging. Log calls only put the record on a
+# bounded in-memory queue; a background thread formats every record as one
+# JSON line and writes it. A request thread therefore never waits for
+# stderr (or a full pipe behind it): when the queue is full the record is
+# dropped and counted instead.
+#
+# The writer thread does not survive fork(), so it is restarted in child
+# processes (serve.py workers, multiprocessing pools).
+
+# Default level of each environment (APP_ENV); LOG_LEVEL overrides it
+LEVELS = {"development": "DEBUG", "test": "WARNING", "production": "INFO"}
+
+# Chatty third-party loggers kept at WARNING. Outside development this
+# includes werkzeug, whose access lines duplicate the per-request records;
+# in development it keeps its startup banner and access lines.
+QUIET_LOGGERS = ("matplotlib", "PIL")
+PRODUCTION_QUIET_LOGGERS = ("werkzeug",)
+
+# Longest wait at shutdown for the writer to make room for its stop marker
+STOP_TIMEOUT = 5.0
+
+_handler = None
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record. A dict passed as extra={"fields": {...}}
+    is merged into it."""
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created))
+                    + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks and leaves formatting to the listener."""
+
+    def __init__(self, log_queue, on_drop=None):
+        super().__init__(log_queue)
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener runs in this process, so the record is queued as is:
+        # the message and JSON are only built by the writer thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop()
+
+class BackgroundWriter(QueueListener):
+    """QueueListener whose stop() waits for room in a full queue."""
+
+    def enqueue_sentinel(self):
+        # The base class uses put_nowait(), which raises queue.Full when the
+        # queue is full; the writer thread is still draining it
+        self.queue.put(self._sentinel, timeout=STOP_TIMEOUT)
+
+def level_for(env=None, level=None):
+    """Log level name from LOG_LEVEL, else from the APP_ENV environment."""
+    level = level or os.environ.get("LOG_LEVEL")
+    if level:
+        return level.upper()
+    return LEVELS.get(env or os.environ.get("APP_ENV", "production"), "INFO")
+
+def setup_logging(level=None, env=None, stream=None, queue_size=10000, on_drop=None):
+    """Route the root logger through the background JSON writer; returns its handler.
+
+    Calling it again replaces the previous setup (after flushing it).
+    """
+    global _handler, _listener
+    env = env or os.environ.get("APP_ENV", "production")
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    _handler = NonBlockingQueueHandler(queue.Queue(queue_size), on_drop)
+    _listener = BackgroundWriter(_handler.queue, output)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(level_for(env, level))
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    # Reset as well as set, so a development setup undoes a production one
+    for name in PRODUCTION_QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.NOTSET if env == "development" else logging.WARNING)
+    return _handler
+
+def shutdown_logging():
+    """Write out the queued records, stop the writer thread and detach the handler.
+
+    Records logged afterwards go to logging's last-resort stderr handler.
+    """
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except queue.Full:
+            # The writer thread is stuck (e.g. on a blocked stderr); the
+            # queued records are lost with it
+            pass
+        _listener = None
+
+def _restart_in_child():
+    # The parent's queue may have been locked by its writer thread at the
+    # time of the fork, so the child starts over with a new one
+    global _listener
+    if _listener is not None:
+        _handler.queue = queue.Queue(_handler.queue.maxsize)
+        _listener = BackgroundWriter(_handler.queue, *_listener.handlers)
+        _listener.start()
+
+os.register_at_fork(after_in_child=_restart_in_child)
+atexit.register(shutdown_logging)
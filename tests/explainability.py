@@ -1,43 +1,55 @@
+import os
+import sys
+import time
 import shap
 import joblib
 import pandas as pd
 import matplotlib.pyplot as plt
 from typing import Tuple
 
-def explain_model(sample_size: int = 100) -> Tuple:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dataset import load_dataset
+from explanations import ExplanationService, make_explainer
+
+def explain_model(sample_size: int = 100, model_path: str = "models/final_model.pkl",
+                  scaler_path: str = None) -> Tuple:
     """Explain model predictions using SHAP values
-    
+
     Args:
         sample_size: Number of samples to explain
-        
+        model_path: Model to explain
+        scaler_path: Scaler the model was trained behind (None for raw features)
+
     Returns:
         Tuple containing (shap_values, X_sample)
     """
     try:
         # Load data and model
-        df = pd.read_csv("data/heart_failure_balanced.csv")
+        df = load_dataset("data/heart_failure_balanced.csv")
         X = df.drop(columns=["DEATH_EVENT"])
-        model = joblib.load("models/final_model.pkl")
+        model = joblib.load(model_path)
+        # Models trained on standardized rows are explained in that space
+        if scaler_path:
+            X = pd.DataFrame(joblib.load(scaler_path).transform(X), columns=X.columns)
 
         # Create SHAP explainer based on model type
-        if str(type(model)).endswith("XGBClassifier'>"):
-            explainer = shap.TreeExplainer(model)
-        else:
-            explainer = shap.Explainer(model, X)
+        explainer = make_explainer(model, background=X.iloc[:100])
 
         # Explain a subset of the data
         sample_size = min(sample_size, len(X))
         X_sample = X.iloc[:sample_size]
-        shap_values = explainer(X_sample)
+        start = time.perf_counter()
+        shap_values = ExplanationService(explainer, lambda rows: rows, list(X.columns)).contributions(X_sample)
+        print(f"{type(explainer).__name__}: {sample_size} rows explained in {time.perf_counter() - start:.2f} s")
 
         # Create and save SHAP summary plot
-        shap.summary_plot(shap_values, X_sample)
+        shap.summary_plot(shap_values, X_sample, show=False)
         plt.savefig("models/shap_summary.png")
         plt.close()
-        
+
         print("✅ SHAP analysis complete!")
         return shap_values, X_sample
-        
+
     except Exception as e:
         print(f"❌ Error in explain_model: {str(e)}")
         raise
@@ -0,0 +1,296 @@
+import pytest
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+import joblib
+import pandas as pd
+
+import app as app_module
+from app import app, FEATURES
+
+# A valid patient record taken from data/heart_failure.csv
+PATIENT = {
+    "age": 75, "anaemia": 0, "creatinine_phosphokinase": 582, "diabetes": 0,
+    "ejection_fraction": 20, "high_blood_pressure": 1, "platelets": 265000,
+    "serum_creatinine": 1.9, "serum_sodium": 130, "sex": 1, "smoking": 0, "time": 4
+}
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess["logged_in"] = True
+        yield client
+
+def test_api_predict_requires_login():
+    """
+    Test that the JSON API rejects anonymous requests.
+    """
+    with app.test_client() as anonymous:
+        response = anonymous.post("/api/predict", json=[PATIENT])
+    assert response.status_code == 401
+    print("✅ API login test passed!")
+
+def test_api_predict_batch(client):
+    """
+    Test that a batch is scored like the single-row form path and that
+    invalid rows report every error without failing the batch.
+    """
+    invalid = dict(PATIENT, age=150, smoking=2)
+    del invalid["time"]
+    response = client.post("/api/predict", json=[PATIENT, invalid, PATIENT])
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert len(results) == 3
+
+    model = joblib.load("models/best_model.pkl")
+    scaler = joblib.load("models/scaler.pkl")
+    expected = model.predict_proba(scaler.transform(pd.DataFrame([PATIENT], columns=FEATURES)))[0, 1]
+    for result in (results[0], results[2]):
+        assert result["errors"] == {}
+        assert result["probability"] == pytest.approx(expected)
+        assert result["prediction"] == int(expected > 0.5)
+
+    assert results[1]["prediction"] is None
+    assert set(results[1]["errors"]) == {"age", "smoking", "time"}
+    print("✅ API batch prediction test passed!")
+
+def test_api_predict_rejects_non_list(client):
+    """
+    Test that the JSON API only accepts an array of records.
+    """
+    response = client.post("/api/predict", json=PATIENT)
+    assert response.status_code == 400
+    print("✅ API payload validation test passed!")
+
+def test_svg_pie_chart_is_cached():
+    """
+    Test that the SVG chart is well-formed and cached on the rounded probability.
+    """
+    app_module._render_pie_chart_svg.cache_clear()
+    svg = app_module.generate_pie_chart_svg(0.4321)
+    assert ET.fromstring(svg).tag.endswith("svg")
+    assert "43.2%" in svg and "56.8%" in svg
+    assert app_module.generate_pie_chart_svg(0.43209) is svg
+    assert app_module._render_pie_chart_svg.cache_info().hits == 1
+    for probability in (0.0, 1.0):
+        ET.fromstring(app_module.generate_pie_chart_svg(probability))
+    print("✅ SVG pie chart test passed!")
+
+def test_predict_form_renders_svg_chart(client):
+    """
+    Test that the form handler embeds the inline SVG chart in the result page.
+    """
+    response = client.post("/predict", data={k: str(v) for k, v in PATIENT.items()})
+    html = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert "Résultat" in html and "<svg" in html
+    assert "data:image/png" not in html
+    print("✅ Form prediction test passed!")
+
+def test_prediction_cache_hits_ttl_and_invalidation(client, monkeypatch):
+    """
+    Test cache hits/misses, TTL expiry and invalidation on a new model fingerprint.
+    """
+    fingerprint = ["v1"]
+    cache = app_module.PredictionCache(maxsize=2, ttl=60)
+    monkeypatch.setattr(app_module, "prediction_cache", cache)
+    monkeypatch.setattr(app_module, "model_fingerprint", lambda: fingerprint[0])
+
+    row = [PATIENT[feature] for feature in FEATURES]
+    first = app_module.score_rows([row])
+    assert app_module.score_rows([row]) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    fingerprint[0] = "v2"
+    app_module.score_rows([row])
+    assert cache.misses == 2 and cache.invalidations == 1
+
+    cache.ttl = -1
+    app_module.score_rows([[v + 1 for v in row]])
+    app_module.score_rows([[v + 1 for v in row]])
+    assert cache.misses == 4
+
+    stats = client.get("/api/cache").get_json()
+    assert stats["enabled"] and stats["hits"] == 1 and stats["size"] <= 2
+    print("✅ Prediction cache test passed!")
+
+def test_lazy_startup_defers_heavy_imports():
+    """
+    Test that LAZY_STARTUP=1 imports app.py without loading the model stack,
+    and that warm_up() loads it.
+    """
+    probe = (
+        "import sys, app\n"
+        "assert app.bundle is None\n"
+        "assert not {'sklearn', 'joblib', 'matplotlib', 'pandas'} & set(sys.modules)\n"
+        "app.warm_up()\n"
+        "assert app.bundle is not None\n"
+    )
+    env = dict(os.environ, LAZY_STARTUP="1")
+    subprocess.run([sys.executable, "-c", probe], env=env, check=True)
+    print("✅ Lazy startup test passed!")
+
+def test_stylesheet_is_cacheable(client):
+    """
+    Test that pages link the stylesheet instead of inlining it, and that the
+    stylesheet honours its ETag.
+    """
+    html = client.get("/predict").get_data(as_text=True)
+    assert "<style>" not in html and "/assets/predict.css" in html
+
+    response = client.get("/assets/predict.css")
+    assert response.status_code == 200 and response.mimetype == "text/css"
+    assert "max-age" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    assert client.get("/assets/predict.css", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/assets/missing.css").status_code == 404
+    print("✅ Stylesheet caching test passed!")
+
+def test_predict_form_reports_all_errors(client):
+    """
+    Test that the form handler reports every invalid field at once.
+    """
+    form = {k: str(v) for k, v in PATIENT.items()}
+    form.update(age="150", serum_sodium="")
+    html = client.post("/predict", data=form).get_data(as_text=True)
+    assert "age: must be between 18 and 100 years" in html
+    assert "serum_sodium: Missing value" in html
+    print("✅ Form validation test passed!")
+
+def test_admin_reload_swaps_model_version(client, tmp_path, monkeypatch):
+    """
+    Test that a new stored version is loaded and swapped in without a restart,
+    that an older version can be re-activated and that a broken one is not.
+    """
+    import model_store
+
+    store_dir = str(tmp_path / "store")
+    model = joblib.load("models/best_model.pkl")
+    scaler = joblib.load("models/scaler.pkl")
+    first = model_store.save_version(model, scaler, {"note": "first"}, store_dir=store_dir)
+    monkeypatch.setattr(app_module, "MODEL_STORE_DIR", store_dir)
+    previous_bundle = app_module.bundle
+
+    try:
+        response = client.post("/admin/reload")
+        assert response.status_code == 200 and response.get_json()["version"] == first
+        assert app_module.bundle.metadata["note"] == "first"
+
+        second = model_store.save_version(model, scaler, {"note": "second"}, store_dir=store_dir)
+        assert app_module.model_fingerprint() == ("store", second)
+        assert client.post("/admin/reload").get_json()["version"] == second
+        assert client.post("/api/predict", json=[PATIENT]).get_json()["results"][0]["errors"] == {}
+
+        response = client.post("/admin/reload", json={"version": first})
+        assert response.get_json()["version"] == first
+        assert model_store.current_version(store_dir) == first
+
+        # A version that fails to load is neither served nor made CURRENT
+        broken = model_store.save_version(model, scaler, {"note": "broken"}, store_dir=store_dir, activate=False)
+        with open(os.path.join(store_dir, broken, "model.pkl"), "wb") as f:
+            f.write(b"not a pickle")
+        assert client.post("/admin/reload", json={"version": broken}).status_code == 500
+        assert model_store.current_version(store_dir) == first
+        assert app_module.bundle.version == first
+    finally:
+        app_module.bundle = previous_bundle
+    print("✅ Model hot reload test passed!")
+
+def test_api_predict_with_explanations(client):
+    """
+    Test that ?explain=1 adds the top SHAP contributions to every valid row,
+    and that explanation latency is reported on its own.
+    """
+    if app_module.bundle.explainer is None:
+        pytest.skip("SHAP explanations are disabled")
+    invalid = dict(PATIENT, age=150)
+    results = client.post("/api/predict?explain=1", json=[PATIENT, invalid]).get_json()["results"]
+    contributions = results[0]["explanation"]["contributions"]
+    assert len(contributions) == app_module.EXPLAIN_TOP_K
+    assert contributions[0]["feature"] in FEATURES
+    magnitudes = [abs(item["contribution"]) for item in contributions]
+    assert magnitudes == sorted(magnitudes, reverse=True)
+    assert "explanation" not in results[1]
+    assert "explanation" not in client.post("/api/predict", json=[PATIENT]).get_json()["results"][0]
+
+    html = client.post("/predict", data={k: str(v) for k, v in PATIENT.items()}).get_data(as_text=True)
+    assert "Principaux facteurs" in html
+    stats = client.get("/api/explanations").get_json()
+    assert stats["enabled"] and stats["calls"] >= 2 and stats["rows"] >= 2
+    print("✅ Prediction explanation test passed!")
+
+def test_metrics_endpoint_reports_stages(client):
+    """
+    Test that /metrics exposes per-stage latency histograms, request counts
+    and error counts after predictions.
+    """
+    client.post("/predict", data={k: str(v) for k, v in PATIENT.items()})
+    client.post("/predict", data=dict({k: str(v) for k, v in PATIENT.items()}, age="150"))
+    client.post("/api/predict", json=[PATIENT])
+
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    for stage in ("validate", "score", "chart", "render"):
+        assert f'heart_stage_seconds_count{{endpoint="predict",stage="{stage}"}}' in text
+    assert 'heart_stage_seconds_count{endpoint="api_predict",stage="score"}' in text
+    assert 'heart_requests_total{endpoint="predict",method="POST",status="200"}' in text
+    assert app_module.ERRORS.value("predict", "validation") >= 1
+    print("✅ Metrics endpoint test passed!")
+
+def test_request_log_records(client):
+    """
+    Test that every request is logged as one JSON record with its status,
+    duration and stage timings, written by the background log thread.
+    """
+    import io
+    import json
+    import structured_logging
+
+    stream = io.StringIO()
+    structured_logging.setup_logging(level="INFO", stream=stream, on_drop=app_module.LOG_DROPPED.inc)
+    try:
+        client.post("/predict", data={k: str(v) for k, v in PATIENT.items()})
+        client.post("/predict", data=dict({k: str(v) for k, v in PATIENT.items()}, age="150"))
+        client.post("/api/predict", json=[PATIENT])
+    finally:
+        structured_logging.shutdown_logging()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    requests = [record for record in records if record["logger"] == "heart.requests"]
+    assert [record["endpoint"] for record in requests] == ["predict", "predict", "api_predict"]
+    assert requests[0]["status"] == 200 and requests[0]["duration_ms"] > 0
+    assert {"validate", "score", "render"} <= set(requests[0]["stage_ms"])
+    assert requests[0]["error"] is None and requests[1]["error"] == "validation"
+    print("✅ Request log test passed!")
+
+def test_request_profiler_dumps_sampled_requests(client, tmp_path, monkeypatch):
+    """
+    Test that sampled /predict requests are dumped with their stage timings,
+    that old dumps are rotated out and that fast requests can be skipped.
+    """
+    import json
+    import pstats
+    from profiling import RequestProfiler
+
+    form = {k: str(v) for k, v in PATIENT.items()}
+    monkeypatch.setattr(app_module, "profiler", RequestProfiler(str(tmp_path), sample_rate=1.0, keep=2))
+    for _ in range(3):
+        client.post("/predict", data=form)
+    client.post("/api/predict", json=[PATIENT])
+
+    dumps = sorted(name for name in os.listdir(tmp_path) if name.endswith(".prof"))
+    assert len(dumps) == 2 and len(os.listdir(tmp_path)) == 4
+    pstats.Stats(str(tmp_path / dumps[-1]))
+    with open(tmp_path / dumps[-1].replace(".prof", ".json")) as f:
+        info = json.load(f)
+    assert info["endpoint"] == "predict" and {"validate", "score", "render"} <= set(info["stage_ms"])
+
+    slow_dir = tmp_path / "slow"
+    monkeypatch.setattr(app_module, "profiler", RequestProfiler(str(slow_dir), slow_ms=60_000))
+    client.post("/predict", data=form)
+    assert os.listdir(slow_dir) == []
+    print("✅ Request profiler test passed!")
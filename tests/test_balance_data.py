@@ -0,0 +1,78 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+
+from dataset import csv_frame, has_store, load_dataset, read_schema, save_dataset, save_view
+from scripts.balance_data import (balance, balance_data, balance_index, balanced_weights, export_csv_rows, smote,
+                                  undersample_index)
+from scripts.data_processing import optimize_memory
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure.csv"
+
+def test_balance_index_is_a_view_of_the_source(tmp_path):
+    """
+    Test that balancing only resamples row positions, keeps every majority
+    row once, and can be stored as a view without copying rows.
+    """
+    df = optimize_memory(pd.read_csv(DATASET_PATH))
+    index = balance_index(df.DEATH_EVENT)
+    y = df.DEATH_EVENT.to_numpy()
+    assert y[index].sum() == (~y[index]).sum() == (~y).sum()
+    np.testing.assert_array_equal(np.sort(index[~y[index]]), np.flatnonzero(~y))
+
+    source = str(tmp_path / "optimized.csv")
+    target = str(tmp_path / "balanced.csv")
+    save_dataset(df, source, csv=False)
+    save_view(target, source, index)
+    assert "view" in read_schema(target)
+    pd.testing.assert_frame_equal(load_dataset(target), balance(df))
+    pd.testing.assert_frame_equal(load_dataset(target, columns=["age"]), balance(df)[["age"]])
+    print("✅ Balancing index test passed!")
+
+def test_weights_and_imblearn_modes():
+    """
+    Test that balanced weights give both classes the same total weight, and
+    that the undersampling and SMOTE modes return balanced classes with
+    valid 0/1 flags.
+    """
+    df = optimize_memory(pd.read_csv(DATASET_PATH))
+    y = df.DEATH_EVENT.to_numpy()
+    weights = balanced_weights(y)
+    assert weights[y].sum() == pytest.approx(weights[~y].sum())
+
+    index = undersample_index(y)
+    assert y[index].sum() == (~y[index]).sum() == y.sum()
+
+    synthetic = smote(df)
+    assert synthetic.DEATH_EVENT.sum() == (~synthetic.DEATH_EVENT).sum()
+    assert (synthetic.dtypes == df.dtypes).all()
+    assert synthetic["ejection_fraction"].between(df["ejection_fraction"].min(), df["ejection_fraction"].max()).all()
+    print("✅ Class weights and imblearn balancing test passed!")
+
+def test_balance_data_from_csv_only(tmp_path):
+    """
+    Test that balance_data() works on a fresh checkout, where only the CSVs
+    exist, that it writes a view by default and that an exported CSV
+    (written in chunks) holds the same rows.
+    """
+    source = str(tmp_path / "heart_failure_optimized.csv")
+    target = str(tmp_path / "heart_failure_balanced.csv")
+    pd.read_csv("data/heart_failure_optimized.csv").to_csv(source, index=False)
+
+    balance_data(source=source, target=target)
+    assert has_store(source) and "view" in read_schema(target)
+    assert not os.path.exists(target)
+    balanced = load_dataset(target)
+    assert balanced.DEATH_EVENT.sum() == (~balanced.DEATH_EVENT).sum()
+
+    optimized = load_dataset(source)
+    export_csv_rows(optimized, balance_index(optimized.DEATH_EVENT), target, chunk_rows=50)
+    pd.testing.assert_frame_equal(pd.read_csv(target), csv_frame(balanced), check_dtype=False)
+
+    balance_data('undersample', export_csv=True, source=source, target=target)
+    undersampled = pd.read_csv(target)
+    assert len(undersampled) < len(balanced)
+    pd.testing.assert_frame_equal(load_dataset(target), undersampled, check_dtype=False)
+    print("✅ Balancing from CSV only test passed!")
@@ -0,0 +1,102 @@
+import pytest
+import os
+import subprocess
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+from compact_model import CompactModel
+from scripts.export_compact import export_arrays, export_model
+
+# Paths to the model, scaler and dataset
+MODEL_PATH = os.path.join("models", "best_model.pkl")
+SCALER_PATH = os.path.join("models", "scaler.pkl")
+DATASET_PATH = "data/heart_failure.csv"
+
+@pytest.fixture(scope="module")
+def data():
+    df = pd.read_csv(DATASET_PATH)
+    return df.drop(columns=["DEATH_EVENT"]).to_numpy(dtype=np.float64), df["DEATH_EVENT"].to_numpy()
+
+def test_compact_model_matches_served_model(data, tmp_path):
+    """
+    Test that the exported forest reproduces predict_proba and predict.
+    """
+    X, _ = data
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    path = str(tmp_path / "model.npz")
+    nodes, size = export_model(model, scaler, path)
+    compact = CompactModel.load(path)
+
+    X_scaled = scaler.transform(X)
+    labels, probabilities = compact.predict_risk(X)
+    np.testing.assert_allclose(probabilities, model.predict_proba(X_scaled)[:, 1], atol=1e-6)
+    np.testing.assert_array_equal(labels, model.predict(X_scaled))
+    assert compact.model_class == type(model).__name__ and size < os.path.getsize(MODEL_PATH)
+    print("✅ Compact model parity test passed!")
+
+@pytest.mark.parametrize("model", [
+    XGBClassifier(n_estimators=30, max_depth=3, random_state=42),
+    LGBMClassifier(n_estimators=30, num_leaves=8, random_state=42, verbose=-1),
+])
+def test_compact_boosted_models(data, model):
+    """
+    Test that XGBoost and LightGBM models are exported with their margins and base score.
+    """
+    X, y = data
+    scaler = StandardScaler().fit(X)
+    model.fit(scaler.transform(X), y)
+    compact = CompactModel(export_arrays(model, scaler))
+
+    expected = model.predict_proba(scaler.transform(X))[:, 1]
+    np.testing.assert_allclose(compact.predict_risk(X)[1], expected, atol=1e-5)
+    print(f"✅ Compact {type(model).__name__} parity test passed!")
+
+def test_compact_pruning_and_unsupported_models(data):
+    """
+    Test that pruning shrinks the trees and that non-tree models are refused.
+    """
+    X, y = data
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    full = export_arrays(model, scaler)
+    pruned = export_arrays(model, scaler, max_depth=4)
+    assert len(pruned["value"]) < len(full["value"]) and int(pruned["depth"]) == 4
+    probabilities = CompactModel(pruned).predict_risk(X)[1]
+    assert ((probabilities >= 0) & (probabilities <= 1)).all()
+
+    scaler = StandardScaler().fit(X)
+    with pytest.raises(ValueError):
+        export_arrays(LogisticRegression().fit(scaler.transform(X), y), scaler)
+    print("✅ Compact pruning test passed!")
+
+def test_app_serves_compact_model(tmp_path):
+    """
+    Test that MODEL_FORMAT=compact serves the exported store version without
+    importing scikit-learn.
+    """
+    import model_store
+
+    store_dir = str(tmp_path / "store")
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    version = model_store.save_version(model, scaler, store_dir=store_dir)
+    export_model(model, scaler, os.path.join(store_dir, version, "compact.npz"))
+
+    probe = (
+        "import sys, app\n"
+        "assert type(app.bundle.model).__name__ == 'CompactModel'\n"
+        f"assert app.bundle.version == {version!r}\n"
+        "labels, probabilities = app.predict_risk([[75, 0, 582, 0, 20, 1, 265000, 1.9, 130, 1, 0, 4]])\n"
+        "assert 0 <= probabilities[0] <= 1\n"
+        "assert 'sklearn' not in sys.modules\n"
+    )
+    env = dict(os.environ, MODEL_FORMAT="compact", MODEL_STORE_DIR=store_dir)
+    subprocess.run([sys.executable, "-c", probe], env=env, check=True)
+    print("✅ Compact model serving test passed!")
@@ -1,18 +1,20 @@
 import pytest
-import pandas as pd
+import numpy as np
 import os
 
+from dataset import has_store, load_dataset
+
 # Path to the dataset
 DATASET_PATH = 'data/heart_failure_balanced.csv'
 
-# Ensure the dataset file exists
-assert os.path.exists(DATASET_PATH), f"Dataset file not found at {DATASET_PATH}"
+# Ensure the dataset exists (CSV, or the column store written by scripts/balance_data.py)
+assert os.path.exists(DATASET_PATH) or has_store(DATASET_PATH), f"Dataset file not found at {DATASET_PATH}"
 
 def test_file_exists():
     """
     Test if the dataset file exists.
     """
-    assert os.path.exists(DATASET_PATH), f"Dataset file not found at {DATASET_PATH}"
+    assert os.path.exists(DATASET_PATH) or has_store(DATASET_PATH), f"Dataset file not found at {DATASET_PATH}"
     print("✅ Dataset file exists test passed!")
 
 def test_csv_format():
@@ -26,7 +28,7 @@ def test_missing_values():
     """
     Test if the dataset has missing values.
     """
-    df = pd.read_csv(DATASET_PATH)
+    df = load_dataset(DATASET_PATH)
     assert df.isnull().sum().sum() == 0, "Dataset contains missing values."
     print("✅ Missing values test passed!")
 
@@ -34,17 +36,18 @@ def test_data_types():
     """
     Test if the dataset columns have the correct data types.
     """
-    df = pd.read_csv(DATASET_PATH)
-    assert df['age'].dtype in [float, int], "Age column should be of type float or int."
-    assert df['ejection_fraction'].dtype in [float, int], "Ejection fraction column should be of type float or int."
-    assert df['serum_creatinine'].dtype in [float, int], "Serum creatinine column should be of type float or int."
+    df = load_dataset(DATASET_PATH)
+    # The column store keeps the compact dtypes chosen by optimize_memory()
+    assert np.issubdtype(df['age'].dtype, np.number), "Age column should be of type float or int."
+    assert np.issubdtype(df['ejection_fraction'].dtype, np.number), "Ejection fraction column should be of type float or int."
+    assert np.issubdtype(df['serum_creatinine'].dtype, np.number), "Serum creatinine column should be of type float or int."
     print("✅ Data types test passed!")
 
 def test_column_names():
     """
     Test if the dataset contains the required columns.
     """
-    df = pd.read_csv(DATASET_PATH)
+    df = load_dataset(DATASET_PATH)
     expected_columns = [
         'age', 'anaemia', 'creatinine_phosphokinase', 'diabetes', 'ejection_fraction',
         'high_blood_pressure', 'platelets', 'serum_creatinine', 'serum_sodium', 'sex',
@@ -58,7 +61,7 @@ def test_column_ranges():
     """
     Test if numeric columns have values within realistic ranges.
     """
-    df = pd.read_csv(DATASET_PATH)
+    df = load_dataset(DATASET_PATH)
     assert df['age'].between(18, 100).all(), "Age column contains unrealistic values."
     assert df['ejection_fraction'].between(10, 80).all(), "Ejection fraction column contains unrealistic values."
     assert df['serum_creatinine'].between(0.1, 10).all(), "Serum creatinine column contains unrealistic values."
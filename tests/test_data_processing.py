@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from dataset import load_dataset, read_schema, scaled_decimals
+from scripts.data_processing import optimize_csv, optimize_memory
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure.csv"
+
+BINARY_COLUMNS = ["anaemia", "diabetes", "high_blood_pressure", "sex", "smoking", "DEATH_EVENT"]
+
+def test_optimize_memory_packs_flags_without_losing_values():
+    """
+    Test that the binary flags become bool, that the other columns are
+    downcast, and that every value survives at the precision of the CSV.
+    """
+    df = pd.read_csv(DATASET_PATH)
+    optimized = optimize_memory(df)
+    assert (optimized[BINARY_COLUMNS].dtypes == bool).all()
+    assert optimized.memory_usage().sum() < df.memory_usage().sum() / 3
+    for column in df.columns:
+        decimals = scaled_decimals(df[column])
+        np.testing.assert_array_equal(np.round(optimized[column].to_numpy(np.float64), decimals), df[column])
+    print("✅ Memory optimization test passed!")
+
+def test_chunked_optimization_matches_in_memory(tmp_path, capsys):
+    """
+    Test that streaming the CSV in small chunks (not multiples of 8, to
+    exercise the bit packing) infers the same schema and data as the
+    in-memory version, and that a per-column report is printed.
+    """
+    raw = pd.read_csv(DATASET_PATH)
+    raw.loc[5, "platelets"] = 263358.039  # float32 cannot round-trip three decimals at this magnitude
+    input_path = str(tmp_path / "raw.csv")
+    raw.to_csv(input_path, index=False)
+    output_path = str(tmp_path / "optimized.csv")
+
+    specs = optimize_csv(input_path, output_path, chunksize=37)
+    expected = optimize_memory(pd.read_csv(input_path))
+    pd.testing.assert_frame_equal(load_dataset(output_path), expected)
+    pd.testing.assert_frame_equal(pd.read_csv(output_path), pd.read_csv(input_path))
+
+    by_name = {column["name"]: column for column in read_schema(output_path)["columns"]}
+    assert by_name["platelets"]["encoding"] == "scaled" and by_name["smoking"]["encoding"] == "bits"
+    assert len(specs) == len(raw.columns)
+    report = capsys.readouterr().out
+    assert "platelets" in report and "total" in report
+    print("✅ Chunked memory optimization test passed!")
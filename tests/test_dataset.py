@@ -0,0 +1,79 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+
+from dataset import is_current, load_columns, load_dataset, read_schema, save_dataset, save_view, store_path
+from scripts.data_processing import optimize_memory
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure.csv"
+
+def test_column_store_keeps_compact_dtypes(tmp_path):
+    """
+    Test that the column store round-trips the optimized dtypes and values,
+    and that it is preferred over the CSV copy and memory-mapped.
+    """
+    df = optimize_memory(pd.read_csv(DATASET_PATH))
+    path = str(tmp_path / "optimized.csv")
+    save_dataset(df, path)
+
+    loaded = load_dataset(path)
+    pd.testing.assert_frame_equal(loaded, df)
+    assert (loaded.dtypes == df.dtypes).all() and loaded["anaemia"].dtype == bool
+    assert pd.read_csv(path)["anaemia"].dtype == np.int64
+
+    columns = load_columns(path, ["age", "time"])
+    assert isinstance(columns["age"], np.memmap) and not columns["age"].flags.writeable
+    assert list(load_dataset(path, columns=["time", "age"]).columns) == ["time", "age"]
+
+    precise = pd.DataFrame({"platelets": [263358.03, 123456.78, 0.01], "flag": [True, False, True]})
+    save_dataset(precise, path)
+    schema_encodings = [column["encoding"] for column in read_schema(path)["columns"]]
+    assert schema_encodings == ["scaled", "bits"]
+    pd.testing.assert_frame_equal(load_dataset(path), precise)
+
+    save_dataset(df.head(10), path)
+    assert len(load_dataset(path)) == 10
+    print("✅ Column store test passed!")
+
+def test_load_dataset_falls_back_to_csv(tmp_path):
+    """
+    Test that datasets without a column store are read from their CSV, and
+    that non-numeric columns are rejected by the store.
+    """
+    df = pd.read_csv(DATASET_PATH)
+    path = str(tmp_path / "raw.csv")
+    df.to_csv(path, index=False)
+    pd.testing.assert_frame_equal(load_dataset(path), df)
+    assert store_path(path).endswith("raw.cols")
+
+    with pytest.raises(TypeError):
+        save_dataset(pd.DataFrame({"name": ["a", "b"]}), str(tmp_path / "names.csv"))
+    print("✅ CSV fallback test passed!")
+
+def test_stale_store_falls_back_to_csv(tmp_path):
+    """
+    Test that a store (or a view of it) is not used any more once the CSV it
+    was built from has changed, and that a store without a CSV still loads.
+    """
+    df = optimize_memory(pd.read_csv(DATASET_PATH))
+    source = str(tmp_path / "optimized.csv")
+    view = str(tmp_path / "balanced.csv")
+    save_dataset(df, source)
+    save_view(view, source, [0, 1, 2])
+    assert is_current(source) and is_current(view)
+
+    changed = pd.read_csv(DATASET_PATH).head(5)
+    changed.to_csv(source, index=False)
+    assert not is_current(source) and not is_current(view)
+    with pytest.warns(UserWarning):
+        pd.testing.assert_frame_equal(load_dataset(source), changed)
+    with pytest.raises(RuntimeError):
+        load_dataset(view)
+
+    save_dataset(df, source, csv=False)
+    assert is_current(source)
+    os.remove(source)
+    assert is_current(source) and len(load_dataset(source)) == len(df)
+    print("✅ Stale column store test passed!")
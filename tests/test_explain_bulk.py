@@ -0,0 +1,66 @@
+import pytest
+import json
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import shap
+
+from feature_schema import FEATURES
+from scripts.explain_bulk import META_FILE, cohort_importance, data_hash, explain_bulk, load_bulk, result_dir
+
+# Paths to the model, scaler and dataset
+MODEL_PATH = os.path.join("models", "best_model.pkl")
+SCALER_PATH = os.path.join("models", "scaler.pkl")
+DATASET_PATH = "data/heart_failure.csv"
+
+@pytest.fixture(scope="module")
+def artifacts():
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    X = pd.read_csv(DATASET_PATH)[FEATURES].to_numpy(dtype=np.float64)[:120]
+    return model, scaler, X
+
+def test_bulk_values_match_explainer(artifacts, tmp_path):
+    """
+    Test that chunked, parallel SHAP values equal a single explainer call and
+    are reloaded from disk on the next run.
+    """
+    model, scaler, X = artifacts
+    cache_dir, explainer_dir = str(tmp_path / "shap"), str(tmp_path / "explainers")
+    values = explain_bulk(model, scaler, X, "a" * 64, chunk_size=50, n_jobs=2,
+                          cache_dir=cache_dir, explainer_dir=explainer_dir)
+
+    expected = shap.TreeExplainer(model).shap_values(scaler.transform(X))[:, :, 1]
+    np.testing.assert_allclose(values, expected)
+    loaded, meta = load_bulk("a" * 64, X, cache_dir)
+    assert isinstance(loaded, np.memmap) and sorted(meta["done"]) == [0, 50, 100]
+    assert cohort_importance(loaded, np.ones(len(X), dtype=bool)).keys() == set(FEATURES)
+    print("✅ Bulk SHAP parity test passed!")
+
+def test_bulk_resumes_missing_chunks(artifacts, tmp_path):
+    """
+    Test that a rerun only computes the chunks an earlier run did not finish.
+    """
+    model, scaler, X = artifacts
+    cache_dir, explainer_dir = str(tmp_path / "shap"), str(tmp_path / "explainers")
+    first = np.array(explain_bulk(model, scaler, X, "b" * 64, chunk_size=50, n_jobs=1,
+                                  cache_dir=cache_dir, explainer_dir=explainer_dir))
+
+    # Forget one chunk and scribble over its rows, as if the run had stopped
+    directory = result_dir("b" * 64, data_hash(X), cache_dir)
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    meta["done"].remove(50)
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump(meta, f)
+    values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r+")
+    values[:] = 0
+    values.flush()
+    assert load_bulk("b" * 64, X, cache_dir) is None
+
+    resumed = explain_bulk(model, scaler, X, "b" * 64, chunk_size=50, n_jobs=1,
+                           cache_dir=cache_dir, explainer_dir=explainer_dir)
+    np.testing.assert_allclose(resumed[50:100], first[50:100])
+    assert not resumed[:50].any() and not resumed[100:].any()
+    print("✅ Bulk SHAP resume test passed!")
@@ -79,6 +79,49 @@ def test_shap_plot():
     except Exception as e:
         pytest.fail(f"SHAP plotting failed with error: {str(e)}")
 
+def test_linear_explainer_matches_shap():
+    """
+    Test that the closed-form logistic regression SHAP values equal shap's
+    LinearExplainer and add up to the decision function.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from explanations import LinearExplainer
+
+    scaler = joblib.load(SCALER_PATH)
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), '../data/heart_failure.csv'))
+    X = scaler.transform(df.drop(columns=["DEATH_EVENT"]))
+    model = LogisticRegression(max_iter=1000).fit(X, df["DEATH_EVENT"])
+
+    explainer = LinearExplainer(model, background=X)
+    values = explainer.shap_values(X)
+    reference = shap.LinearExplainer(model, shap.maskers.Independent(X, max_samples=len(X)))
+    np.testing.assert_allclose(values, reference.shap_values(X), atol=1e-8)
+    np.testing.assert_allclose(explainer.expected_value + values.sum(axis=1), model.decision_function(X))
+    # Default baseline: the standardized training mean
+    assert LinearExplainer(model).expected_value == pytest.approx(model.intercept_[0])
+    print("✅ Linear SHAP test passed!")
+
+def test_explainer_dispatch():
+    """
+    Test that every model type train.py produces gets a fast explainer.
+    """
+    from lightgbm import LGBMClassifier
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.svm import SVC
+    from xgboost import XGBClassifier
+    from explanations import LinearExplainer, make_explainer
+
+    X = np.random.RandomState(42).normal(size=(60, 4))
+    y = (X[:, 0] > 0).astype(int)
+    for model in (RandomForestClassifier(n_estimators=5), XGBClassifier(n_estimators=5),
+                  LGBMClassifier(n_estimators=5, verbose=-1)):
+        assert isinstance(make_explainer(model.fit(X, y)), shap.TreeExplainer)
+    assert isinstance(make_explainer(LogisticRegression().fit(X, y)), LinearExplainer)
+    with pytest.raises(ValueError):
+        make_explainer(SVC(probability=True).fit(X, y))
+    print("✅ Explainer dispatch test passed!")
+
 # Add a pytest hook to display a message after all tests pass
 def pytest_sessionfinish(session, exitstatus):
     """
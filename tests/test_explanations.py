@@ -0,0 +1,84 @@
+import pytest
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+from explanations import ExplanationService, load_explainer
+from feature_schema import FEATURES
+from inference import FusedPredictor
+
+# Paths to the model, scaler and dataset
+MODEL_PATH = os.path.join("models", "best_model.pkl")
+SCALER_PATH = os.path.join("models", "scaler.pkl")
+DATASET_PATH = "data/heart_failure.csv"
+
+@pytest.fixture(scope="module")
+def data():
+    df = pd.read_csv(DATASET_PATH)
+    return df[FEATURES].to_numpy(dtype=np.float64), df["DEATH_EVENT"].to_numpy()
+
+def test_contributions_add_up_to_probability(data, tmp_path):
+    """
+    Test that the SHAP contributions of a batch sum to the predicted
+    probabilities, and that the explainer is reloaded from the disk cache.
+    """
+    X, _ = data
+    model = joblib.load(MODEL_PATH)
+    predictor = FusedPredictor(model, joblib.load(SCALER_PATH))
+    cache_dir = str(tmp_path)
+    explainer = load_explainer(model, "a" * 64, cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    service = ExplanationService(load_explainer(model, "a" * 64, cache_dir), predictor.transform, FEATURES)
+
+    values = service.contributions(X[:20])
+    np.testing.assert_allclose(service.base_value + values.sum(axis=1),
+                               predictor.predict_risk(X[:20])[1], atol=1e-6)
+    np.testing.assert_allclose(values, np.asarray(explainer.shap_values(predictor.transform(X[:20])))[:, :, 1])
+
+    explanations = service.explain(X[:5])
+    assert len(explanations) == 5 and len(explanations[0]["contributions"]) == 3
+    assert explanations[0]["units"] == "probability"
+    assert service.stats()["calls"] == 1 and service.stats()["rows"] == 5
+    print("✅ SHAP contribution test passed!")
+
+def test_boosted_model_contributions_are_log_odds(data, tmp_path):
+    """
+    Test that booster contributions are reported as log-odds.
+    """
+    X, y = data
+    scaler = StandardScaler().fit(X)
+    model = XGBClassifier(n_estimators=20, max_depth=3, random_state=42).fit(scaler.transform(X), y)
+    service = ExplanationService(load_explainer(model, "b" * 64, str(tmp_path)), scaler.transform, FEATURES)
+
+    values = service.contributions(X[:10])
+    margin = service.base_value + values.sum(axis=1)
+    np.testing.assert_allclose(1 / (1 + np.exp(-margin)),
+                               model.predict_proba(scaler.transform(X[:10]))[:, 1], atol=1e-5)
+    assert service.units == "log-odds"
+    print("✅ Booster SHAP contribution test passed!")
+
+def test_per_class_list_output():
+    """
+    Test that per-class SHAP output is reduced to the positive class whether
+    shap returns a list of matrices (before 0.45) or one 3-D array.
+    """
+    negative = np.arange(6, dtype=float).reshape(2, 3)
+    positive = -negative
+
+    class ListExplainer:
+        expected_value = [0.6, 0.4]
+
+        def shap_values(self, X):
+            return [negative, positive]
+
+    class ArrayExplainer(ListExplainer):
+        def shap_values(self, X):
+            return np.stack([negative, positive], axis=-1)
+
+    for explainer in (ListExplainer(), ArrayExplainer()):
+        service = ExplanationService(explainer, lambda rows: rows, ["a", "b", "c"])
+        np.testing.assert_array_equal(service.contributions(np.zeros((2, 3))), positive)
+    print("✅ Per-class SHAP output test passed!")
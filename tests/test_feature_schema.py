@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from feature_schema import FEATURES, SCHEMA
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure.csv"
+
+def test_validate_records_reports_all_errors():
+    """
+    Test that every invalid cell of every row is reported.
+    """
+    df = pd.read_csv(DATASET_PATH)
+    good = df[FEATURES].iloc[0].to_dict()
+    bad = dict(good, age=150, sex=0.5, platelets="abc")
+    del bad["time"]
+    result = SCHEMA.validate_records([good, bad, "not a record", float("nan")])
+
+    assert result.valid.tolist() == [True, False, False, False]
+    assert result.errors[1] == {
+        "age": "must be between 18 and 100 years",
+        "sex": "must be 0 or 1",
+        "platelets": "Invalid number",
+        "time": "Missing value",
+    }
+    # Only the row-level error, not one "Missing value" per feature
+    assert result.errors[2] == result.errors[3] == {"record": "must be a JSON object"}
+    np.testing.assert_allclose(result.X[0], df[FEATURES].iloc[0].to_numpy(dtype=float))
+    print("✅ Record validation test passed!")
+
+def test_validate_frame_matches_records():
+    """
+    Test that DataFrame validation agrees with record validation.
+    """
+    df = pd.read_csv(DATASET_PATH)[FEATURES].astype(object)
+    df.loc[3, "serum_sodium"] = 90
+    df.loc[5, "smoking"] = "yes"
+    frame_result = SCHEMA.validate_frame(df)
+    records_result = SCHEMA.validate_records(df.to_dict(orient="records"))
+
+    assert frame_result.errors == records_result.errors
+    assert frame_result.errors[3] == {"serum_sodium": "must be between 110 and 150 mmol/L"}
+    assert frame_result.errors[5] == {"smoking": "Invalid number"}
+    assert frame_result.valid.sum() == len(df) - len(frame_result.errors)
+    print("✅ DataFrame validation test passed!")
+
+def test_validate_large_batch_is_vectorized():
+    """
+    Test that a large clean batch validates without per-row errors.
+    """
+    X = np.tile(pd.read_csv(DATASET_PATH)[FEATURES].to_numpy(dtype=float), (350, 1))
+    X = np.clip(X, SCHEMA.lower, SCHEMA.upper)
+    X[::1000, 0] = 200
+    result = SCHEMA.validate(X)
+    assert result.valid.sum() == len(X) - len(range(0, len(X), 1000))
+    assert set(result.errors) == set(range(0, len(X), 1000))
+    print("✅ Large batch validation test passed!")
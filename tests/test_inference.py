@@ -0,0 +1,86 @@
+import pytest
+import os
+import joblib
+import numpy as np
+
+from dataset import load_dataset
+from inference import FusedPredictor
+
+# Paths to the model, scaler and dataset
+MODEL_PATH = os.path.join("models", "best_model.pkl")
+SCALER_PATH = os.path.join("models", "scaler.pkl")
+DATASET_PATH = "data/heart_failure_balanced.csv"
+
+@pytest.fixture(scope="module")
+def artifacts():
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    # float64 like the rows the app scores (the column store keeps compact dtypes)
+    X = load_dataset(DATASET_PATH).drop(columns=["DEATH_EVENT"]).astype(np.float64)
+    return model, scaler, X
+
+def test_fused_predictor_matches_model(artifacts):
+    """
+    Test that the fused predictor reproduces scaler.transform + predict/predict_proba.
+    """
+    model, scaler, X = artifacts
+    predictor = FusedPredictor(model, scaler)
+    labels, probabilities = predictor.predict_risk(X.to_numpy())
+
+    X_scaled = scaler.transform(X)
+    np.testing.assert_allclose(probabilities, model.predict_proba(X_scaled)[:, 1])
+    np.testing.assert_array_equal(labels, model.predict(X_scaled))
+    print("✅ Fused predictor parity test passed!")
+
+def test_fused_predictor_single_row(artifacts):
+    """
+    Test that a single flat row is accepted and scored.
+    """
+    model, scaler, X = artifacts
+    predictor = FusedPredictor(model, scaler)
+    labels, probabilities = predictor.predict_risk(X.iloc[0].tolist())
+    assert labels.shape == (1,)
+    assert 0.0 <= probabilities[0] <= 1.0
+    print("✅ Fused predictor single row test passed!")
+
+def test_batcher_coalesces_concurrent_requests(artifacts):
+    """
+    Test that concurrent single-row submissions are scored in shared batches
+    and that every caller gets its own row's result back.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from inference import InferenceBatcher
+
+    model, scaler, X = artifacts
+    predictor = FusedPredictor(model, scaler)
+    rows = X.to_numpy()[:32]
+    batcher = InferenceBatcher(predictor.predict_risk, max_wait=0.05, max_rows=64)
+    try:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            results = list(pool.map(lambda row: batcher.predict_risk([row]), rows))
+    finally:
+        batcher.close()
+
+    expected_labels, expected_probabilities = predictor.predict_risk(rows)
+    for i, (labels, probabilities) in enumerate(results):
+        assert labels[0] == expected_labels[i]
+        assert probabilities[0] == pytest.approx(expected_probabilities[i])
+    assert batcher.rows == 32 and batcher.batches < 32
+    print("✅ Inference batcher test passed!")
+
+def test_batcher_propagates_errors():
+    """
+    Test that a failing batch raises in every waiting caller.
+    """
+    from inference import InferenceBatcher
+
+    def failing(X):
+        raise RuntimeError("boom")
+
+    batcher = InferenceBatcher(failing, max_wait=0.001)
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.predict_risk([[0.0] * 12])
+    finally:
+        batcher.close()
+    print("✅ Inference batcher error test passed!")
@@ -0,0 +1,29 @@
+import pytest
+
+from metrics import Registry
+
+def test_histogram_and_counter_exposition():
+    """
+    Test that histograms render cumulative buckets, sum and count, and that
+    counters and label values are rendered in the Prometheus text format.
+    """
+    registry = Registry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.01, 0.1))
+    requests = registry.counter("requests_total", "Requests", ("status",))
+    for value in (0.005, 0.05, 0.05, 3.0):
+        latency.observe(value, "score")
+    requests.inc('2"00')
+    requests.inc('2"00')
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="score",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="score",le="0.1"} 3' in text
+    assert 'stage_seconds_bucket{stage="score",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="score"} 4' in text
+    assert 'stage_seconds_sum{stage="score"} 3.105' in text
+    assert 'requests_total{status="2\\"00"} 2' in text
+    assert latency.count("score") == 4 and requests.value('2"00') == 2
+    # Registering a metric again returns the existing one
+    assert registry.counter("requests_total", "Requests", ("status",)) is requests
+    print("✅ Metrics exposition test passed!")
@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.preprocessing import StandardScaler
+
+from dataset import load_dataset
+from scripts.model_comparison import compare_models
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure_balanced.csv"
+
+def test_parallel_comparison_matches_cross_val_score():
+    """
+    Test that the parallel (model, fold) engine reproduces cross_val_score and
+    returns the winner as its best fold model, with its original n_jobs.
+    """
+    df = load_dataset(DATASET_PATH)
+    X = StandardScaler().fit_transform(df.drop(columns=["DEATH_EVENT"]))
+    y = df["DEATH_EVENT"].astype(int)
+    models = {
+        "RandomForest": RandomForestClassifier(n_estimators=10, random_state=42),
+        "LogisticRegression": LogisticRegression(max_iter=1000, random_state=42),
+    }
+
+    scores, fitted, timings = compare_models(models, X, y, cv=5, n_jobs=2)
+
+    for name, model in models.items():
+        np.testing.assert_allclose(scores[name], cross_val_score(model, X, y, cv=5, scoring="accuracy"))
+        assert timings[name][0] > 0
+    winner = max(models, key=lambda name: scores[name].mean())
+    assert list(fitted) == [winner]
+    train_idx, _ = list(StratifiedKFold(5).split(X, y))[int(np.argmax(scores[winner]))]
+    reference = models[winner].fit(X[train_idx], y.iloc[train_idx])
+    np.testing.assert_array_equal(fitted[winner].predict(X), reference.predict(X))
+    assert fitted[winner].get_params().get("n_jobs") == models[winner].get_params().get("n_jobs")
+    print("✅ Parallel model comparison test passed!")
+
+
+def test_comparison_with_sample_weights():
+    """
+    Test that sample weights reach every fit, including the returned model.
+    """
+    df = pd.read_csv("data/heart_failure.csv")
+    X = StandardScaler().fit_transform(df.drop(columns=["DEATH_EVENT"]))
+    y = df["DEATH_EVENT"].to_numpy()
+    weights = np.where(y == 1, 2.0, 1.0)
+    models = {"LogisticRegression": LogisticRegression(max_iter=1000, random_state=42)}
+
+    scores, fitted, _ = compare_models(models, X, y, cv=3, n_jobs=1, sample_weight=weights)
+    train_idx, _ = list(StratifiedKFold(3).split(X, y))[int(np.argmax(scores["LogisticRegression"]))]
+    reference = LogisticRegression(max_iter=1000, random_state=42).fit(
+        X[train_idx], y[train_idx], sample_weight=weights[train_idx])
+    np.testing.assert_allclose(fitted["LogisticRegression"].coef_, reference.coef_)
+    print("✅ Weighted model comparison test passed!")
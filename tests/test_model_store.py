@@ -0,0 +1,37 @@
+import pytest
+import os
+import joblib
+
+import model_store
+
+# Paths to the model and scaler
+MODEL_PATH = os.path.join("models", "best_model.pkl")
+SCALER_PATH = os.path.join("models", "scaler.pkl")
+
+def test_save_and_load_version(tmp_path):
+    """
+    Test that a model/scaler pair round-trips through the store with metadata.
+    """
+    store_dir = str(tmp_path)
+    model = joblib.load(MODEL_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    version = model_store.save_version(model, scaler, {"test_accuracy": 0.9}, store_dir=store_dir)
+
+    assert model_store.current_version(store_dir) == version
+    assert model_store.list_versions(store_dir) == [version]
+    loaded_model, loaded_scaler, metadata = model_store.load_version(store_dir=store_dir)
+    assert type(loaded_model) is type(model)
+    assert metadata["version"] == version
+    assert metadata["test_accuracy"] == 0.9
+    assert metadata["model_class"] == type(model).__name__
+    assert not [name for name in os.listdir(store_dir) if name.startswith(".tmp-")]
+    print("✅ Model store round-trip test passed!")
+
+def test_activate_unknown_version(tmp_path):
+    """
+    Test that activating a missing version fails and leaves CURRENT alone.
+    """
+    with pytest.raises(FileNotFoundError):
+        model_store.activate_version("missing", store_dir=str(tmp_path))
+    assert model_store.current_version(str(tmp_path)) is None
+    print("✅ Model store activation test passed!")
@@ -0,0 +1,59 @@
+import pytest
+import os
+import time
+
+from scripts import model_comparison, pipeline
+
+def test_pipeline_reruns_only_stale_stages(tmp_path, monkeypatch):
+    """
+    Test that cached stages are skipped and that a parameter change re-runs
+    only the stages downstream of it.
+    """
+    trained = []
+    published = []
+
+    def fake_run_comparison(data, n_jobs=None, cv=5, test_size=0.2, random_state=42):
+        trained.append((len(data), cv, random_state))
+        return "model", "scaler", {}, 1.0
+
+    monkeypatch.setattr(model_comparison, "run_comparison", fake_run_comparison)
+    monkeypatch.setattr(model_comparison, "save_artifacts", lambda *args: published.append(args))
+    cache_dir = str(tmp_path / "cache")
+
+    assert pipeline.run_pipeline(cache_dir=cache_dir) == ["optimize", "balance", "train"]
+    assert pipeline.run_pipeline(cache_dir=cache_dir) == []
+    assert len(trained) == 1 and len(published) == 1
+
+    assert pipeline.run_pipeline(cv=3, cache_dir=cache_dir) == ["train"]
+    assert pipeline.run_pipeline(balance_seed=7, cache_dir=cache_dir) == ["balance", "train"]
+    assert pipeline.run_pipeline(cache_dir=cache_dir, force=["optimize"]) == ["optimize"]
+    assert len(trained) == 3 and trained[-1][1] == 5
+
+    pipeline.run_pipeline(cache_dir=cache_dir, publish=True)
+    assert len(trained) == 3 and published[-1][0] == "model"
+    print("✅ Cached pipeline test passed!")
+
+def test_stage_keys_cover_imported_modules(tmp_path):
+    """
+    Test that a stage's code includes the project modules its script imports,
+    so editing one re-runs the stage, and that superseded outputs are pruned.
+    """
+    files = pipeline.code_files([pipeline.balance_data.__file__])
+    for module in ("scripts/balance_data.py", "scripts/data_processing.py", "dataset.py"):
+        assert os.path.join(pipeline.ROOT, module) in files
+
+    (tmp_path / "helper.py").write_text("VALUE = 1\n")
+    (tmp_path / "stage.py").write_text("import helper\nfrom os import path\n")
+    assert pipeline.code_files([str(tmp_path / "stage.py")], root=str(tmp_path)) == \
+        [str(tmp_path / "helper.py"), str(tmp_path / "stage.py")]
+
+    cache_dir = tmp_path / "cache"
+    stages = pipeline.Pipeline(str(cache_dir), keep=2)
+    for value in range(4):
+        stages.stage("double", lambda x: 2 * x, [], {"x": value}, code=[pipeline.__file__])
+        time.sleep(0.01)
+    assert stages.ran == ["double"] * 4
+    assert len(os.listdir(cache_dir)) == 2
+    stages.stage("double", lambda x: 2 * x, [], {"x": 3}, code=[pipeline.__file__])
+    assert len(stages.ran) == 4
+    print("✅ Pipeline cache key and pruning test passed!")
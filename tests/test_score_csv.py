@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from feature_schema import FEATURES, SCHEMA
+from inference import load_predictor
+from scripts.score_csv import score_file
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure.csv"
+
+def test_score_file_in_chunks(tmp_path):
+    """
+    Test that chunked scoring matches scoring the whole file at once.
+    """
+    output_path = str(tmp_path / "predictions.csv")
+    rows, valid = score_file(DATASET_PATH, output_path, chunksize=64, keep_columns=True)
+
+    df = pd.read_csv(DATASET_PATH)
+    output = pd.read_csv(output_path, keep_default_na=False)
+    validation = SCHEMA.validate_frame(df)
+    assert rows == len(df) == len(output)
+    assert valid == validation.valid.sum()
+    assert output["row"].tolist() == list(range(len(df)))
+
+    labels, probabilities = load_predictor().predict_risk(df[FEATURES].to_numpy(dtype=float))
+    scored = output[validation.valid]
+    np.testing.assert_array_equal(scored["prediction"], labels[validation.valid])
+    np.testing.assert_allclose(scored["probability"].astype(float), probabilities[validation.valid], rtol=1e-6)
+    assert (output.loc[~validation.valid, "prediction"] == -1).all()
+    assert (output.loc[~validation.valid, "errors"] != "").all()
+    print("✅ Chunked CSV scoring test passed!")
+
+def test_score_file_with_missing_column(tmp_path):
+    """
+    Test that an input without one of the features is reported row by row
+    instead of failing, also when the input columns are kept.
+    """
+    input_path = str(tmp_path / "no_time.csv")
+    output_path = str(tmp_path / "predictions.csv")
+    pd.read_csv(DATASET_PATH).head(10).drop(columns=["time"]).to_csv(input_path, index=False)
+
+    rows, valid = score_file(input_path, output_path, keep_columns=True)
+    output = pd.read_csv(output_path, keep_default_na=False)
+    assert rows == 10 and valid == 0
+    assert list(output.columns) == ["row"] + FEATURES + ["prediction", "probability", "errors"]
+    assert (output["prediction"] == -1).all()
+    assert output["errors"].str.contains("time: Missing value").all()
+    print("✅ Missing column scoring test passed!")
@@ -0,0 +1,55 @@
+import pytest
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from scripts.benchmark_serve import PATIENT, login, process_tree, wait_until_ready
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_preforked_server_serves_and_restarts_workers():
+    """
+    Test that serve.py answers predictions from preforked workers, replaces
+    a worker that dies and shuts down cleanly on SIGTERM.
+    """
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+                               "--workers", "2", "--threads", "2"],
+                              env=dict(os.environ, PYTHONWARNINGS="ignore"),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        wait_until_ready(base_url)
+        opener = login(base_url)
+        request = urllib.request.Request(base_url + "/api/predict", data=json.dumps([PATIENT]).encode(),
+                                         headers={"Content-Type": "application/json"})
+        result = json.loads(opener.open(request, timeout=10).read())["results"][0]
+        assert result["errors"] == {} and 0 <= result["probability"] <= 1
+
+        workers = process_tree(server.pid)[1:]
+        assert len(workers) == 2
+        os.kill(workers[0], signal.SIGKILL)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            replaced = process_tree(server.pid)[1:]
+            if len(replaced) == 2 and workers[0] not in replaced:
+                break
+            time.sleep(0.2)
+        assert len(replaced) == 2 and workers[0] not in replaced
+        wait_until_ready(base_url)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            assert server.wait(timeout=30) == 0
+        finally:
+            if server.poll() is None:
+                os.killpg(server.pid, signal.SIGKILL)
+    print("✅ Preforked server test passed!")
@@ -0,0 +1,92 @@
+import pytest
+import io
+import json
+import logging
+import queue
+import sys
+import time
+
+from structured_logging import JsonFormatter, NonBlockingQueueHandler, level_for, setup_logging, shutdown_logging
+
+def make_record(message, args=(), exc_info=None, **fields):
+    record = logging.LogRecord("heart.test", logging.INFO, __file__, 1, message, args, exc_info)
+    if fields:
+        record.fields = fields
+    return record
+
+def test_json_records_and_dropping_when_full():
+    """
+    Test that records are formatted as one JSON object with their extra
+    fields, that the queue handler leaves formatting to the writer thread and
+    that it drops records instead of blocking when the queue is full.
+    """
+    dropped = []
+    handler = NonBlockingQueueHandler(queue.Queue(1), on_drop=lambda: dropped.append(1))
+    handler.handle(make_record("scored %d rows", (3,), endpoint="api_predict", stage_ms={"score": 1.5}))
+    handler.handle(make_record("overflow"))
+    assert handler.dropped == 1 and dropped == [1]
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "scored %d rows" and queued.args == (3,)
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["message"] == "scored 3 rows" and entry["level"] == "INFO"
+    assert entry["endpoint"] == "api_predict" and entry["stage_ms"] == {"score": 1.5}
+
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        line = JsonFormatter().format(make_record("failed", exc_info=sys.exc_info()))
+    assert "\n" not in line and "ValueError: bad row" in json.loads(line)["exception"]
+    print("✅ Structured log record test passed!")
+
+def test_levels_by_environment(monkeypatch):
+    """
+    Test that the level follows APP_ENV and that LOG_LEVEL overrides it.
+    """
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    monkeypatch.delenv("APP_ENV", raising=False)
+    assert level_for() == "INFO"
+    assert level_for("development") == "DEBUG" and level_for("test") == "WARNING"
+    monkeypatch.setenv("LOG_LEVEL", "error")
+    assert level_for("development") == "ERROR"
+    print("✅ Log level test passed!")
+
+def test_development_restores_werkzeug_logs():
+    """
+    Test that switching from production to development logging brings back
+    werkzeug's messages (the debug server's banner and access lines).
+    """
+    stream = io.StringIO()
+    try:
+        setup_logging(env="production", stream=stream)
+        assert logging.getLogger("werkzeug").getEffectiveLevel() == logging.WARNING
+        setup_logging(env="development", stream=stream)
+        logging.getLogger("werkzeug").info(" * Running on http://127.0.0.1:5000")
+    finally:
+        shutdown_logging()
+    assert "Running on http://127.0.0.1:5000" in stream.getvalue()
+    print("✅ Development werkzeug logging test passed!")
+
+class SlowStream(io.StringIO):
+    def write(self, text):
+        time.sleep(0.001)
+        return super().write(text)
+
+def test_shutdown_with_full_queue():
+    """
+    Test that shutting down while the queue is full waits for the writer to
+    make room for its stop marker, writes out the queued records and detaches
+    the handler from the root logger.
+    """
+    stream = SlowStream()
+    try:
+        handler = setup_logging(env="production", stream=stream, queue_size=1)
+        log = logging.getLogger("heart.test")
+        for i in range(200):
+            log.info("record %d", i)
+    finally:
+        shutdown_logging()
+    assert handler.dropped > 0
+    assert "record 0" in stream.getvalue()
+    assert handler not in logging.getLogger().handlers
+    print("✅ Full-queue shutdown test passed!")
@@ -0,0 +1,43 @@
+import pytest
+
+from dataset import load_dataset
+from scripts.model_comparison import candidate_models
+from scripts.tune_models import best_params, load_results, successive_halving, tune
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure_balanced.csv"
+
+def load_xy():
+    df = load_dataset(DATASET_PATH)
+    return df.drop(columns=["DEATH_EVENT"]).to_numpy(dtype=float), df["DEATH_EVENT"].to_numpy(dtype=int)
+
+def test_successive_halving_and_warm_start(tmp_path):
+    """
+    Test that the search narrows down to one configuration on the full data,
+    early-stops the boosted models, persists its results and races them first
+    on the next run.
+    """
+    X, y = load_xy()
+    results_path = str(tmp_path / "tuning.json")
+
+    best = tune(X, y, models=["LightGBM"], n_candidates=4, eta=2, cv=3, results_path=results_path, random_state=0)
+    assert best["LightGBM"]["rows"] == len(y)
+    params = best_params(results_path)["LightGBM"]
+    assert 1 <= params["n_estimators"] < 1000
+    assert candidate_models(best_params(results_path))["LightGBM"].get_params()["n_estimators"] == params["n_estimators"]
+
+    trials = successive_halving("LightGBM", X, y, [load_results(results_path)["models"]["LightGBM"][0]["params"]], cv=3)
+    assert trials[-1]["rows"] == len(y)
+    assert trials[-1]["score"] == pytest.approx(best["LightGBM"]["score"])
+    print("✅ Successive halving test passed!")
+
+def test_tuning_respects_budget(tmp_path):
+    """
+    Test that an exhausted wall-clock budget stops the search without
+    overwriting previous results.
+    """
+    X, y = load_xy()
+    results_path = str(tmp_path / "tuning.json")
+    assert tune(X, y, models=["XGBoost", "RandomForest"], budget=0, results_path=results_path) == {}
+    assert load_results(results_path) == {"models": {}}
+    print("✅ Tuning budget test passed!")
@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from lightgbm import LGBMClassifier
+from xgboost import XGBClassifier
+
+import model_store
+from dataset import load_dataset
+from scripts.update_model import update_model
+
+# Path to the dataset
+DATASET_PATH = "data/heart_failure_balanced.csv"
+
+def split_old_new():
+    df = load_dataset(DATASET_PATH)
+    X = df.drop(columns=["DEATH_EVENT"]).to_numpy(dtype=float)
+    y = df["DEATH_EVENT"].to_numpy(dtype=int)
+    scaler = StandardScaler().fit(X[:300])
+    return scaler, (X[:300], y[:300]), (X[300:], y[300:])
+
+def test_forest_update_adds_trees_on_new_rows_only(tmp_path):
+    """
+    Test that a forest keeps its existing trees, grows new ones from the new
+    rows, and that the update is saved as a new store version.
+    """
+    scaler, (X_old, y_old), (X_new, y_new) = split_old_new()
+    model = RandomForestClassifier(n_estimators=50, random_state=42).fit(scaler.transform(X_old), y_old)
+
+    updated, info = update_model(model, scaler, X_new, y_new, trees=5)
+    assert info == {"method": "warm_start", "added": 5}
+    assert len(updated.estimators_) == 55 and len(model.estimators_) == 50
+    X_scaled = scaler.transform(X_new)
+    for old_tree, kept_tree in zip(model.estimators_, updated.estimators_):
+        np.testing.assert_array_equal(old_tree.predict(X_scaled), kept_tree.predict(X_scaled))
+
+    version = model_store.save_version(updated, scaler, {"parent_version": None}, store_dir=str(tmp_path))
+    reloaded, _, _ = model_store.load_version(version, store_dir=str(tmp_path))
+    assert reloaded.n_estimators == 55
+    print("✅ Forest update test passed!")
+
+@pytest.mark.parametrize("model", [XGBClassifier(n_estimators=30), LGBMClassifier(n_estimators=30, verbose=-1)])
+def test_boosted_update_continues_from_current_booster(model):
+    """
+    Test that boosted models keep their existing rounds and add new ones.
+    """
+    scaler, (X_old, y_old), (X_new, y_new) = split_old_new()
+    model.fit(scaler.transform(X_old), y_old)
+    before = model.predict_proba(scaler.transform(X_new))
+
+    updated, info = update_model(model, scaler, X_new, y_new, rounds=10)
+    assert info == {"method": "continued_boosting", "added": 10}
+    if isinstance(model, XGBClassifier):
+        assert updated.get_booster().num_boosted_rounds() == 40
+    else:
+        assert updated.booster_.num_trees() == 40
+    np.testing.assert_allclose(model.predict_proba(scaler.transform(X_new)), before)
+    print("✅ Boosted model update test passed!")
+
+def test_update_rejects_unsupported_models():
+    """
+    Test that models without an incremental path ask for a full retrain.
+    """
+    scaler, (X_old, y_old), (X_new, y_new) = split_old_new()
+    model = LogisticRegression(max_iter=1000).fit(scaler.transform(X_old), y_old)
+    with pytest.raises(ValueError, match="not supported"):
+        update_model(model, scaler, X_new, y_new)
+    with pytest.raises(ValueError, match="every class"):
+        update_model(RandomForestClassifier(n_estimators=5).fit(scaler.transform(X_old), y_old),
+                     scaler, X_new[y_new == 1], y_new[y_new == 1])
+    print("✅ Unsupported model update test passed!")
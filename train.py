@@ -1,4 +1,3 @@
-import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
@@ -6,12 +5,13 @@ from xgboost import XGBClassifier
 from lightgbm import LGBMClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
+from dataset import load_dataset
 
 def train_model(data_path="data/heart_failure_balanced.csv"):
     # Load dataset
-    df = pd.read_csv(data_path)
+    df = load_dataset(data_path)
     X = df.drop(columns=["DEATH_EVENT"])
-    y = df["DEATH_EVENT"]
+    y = df["DEATH_EVENT"].astype(int)
 
     # Split data into train and test sets
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)